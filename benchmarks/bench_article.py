@@ -0,0 +1,57 @@
+"""
+Memory benchmark: parsed articles held as the previous free-form dicts vs. slotted Article records.
+
+Both sides hold the same strings, so the difference is the per-article container overhead
+(the record dict, one dict per abstract section) against a slotted object and named tuples.
+
+Run from the repository root:
+    python -m benchmarks.bench_article [n_articles]
+"""
+import sys
+import time
+import tracemalloc
+
+from benchmarks.fixtures import make_pubmed_article_set
+from medical_agent_bot.tools.article import Article
+from medical_agent_bot.tools.pubmed_xml import iter_pubmed_articles
+
+
+def as_previous_dict(article: Article) -> dict:
+    """The record dict the parser used to return."""
+    record = article.to_dict()
+    del record["links"]
+    return record
+
+
+def measure(label: str, payload: bytes, convert) -> None:
+    tracemalloc.start()
+    records = [convert(article) for article in iter_pubmed_articles(payload)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<20} {current / 1024 / 1024:8.2f} MiB  {current / len(records):8.0f} B/article")
+
+
+def timed(label: str, func, items) -> None:
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<20} {elapsed / len(items) * 1e6:8.2f} µs/article")
+
+
+def main() -> None:
+    n_articles = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    payload = make_pubmed_article_set(n_articles)
+    print(f"articles={n_articles}")
+    measure("dict records", payload, as_previous_dict)
+    measure("Article records", payload, lambda article: article)
+
+    articles = list(iter_pubmed_articles(payload))
+    dicts = [article.to_dict() for article in articles]
+    timed("Article.to_dict", Article.to_dict, articles)
+    timed("Article.from_dict", Article.from_dict, dicts)
+    timed("Article.to_result", Article.to_result, articles)
+
+
+if __name__ == "__main__":
+    main()
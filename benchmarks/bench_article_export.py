@@ -0,0 +1,70 @@
+"""
+Export and load benchmark: CSV vs. typed JSONL, Parquet and Arrow exports of an article set.
+
+Loads produce typed columns in each case: the CSV and JSONL loaders parse every row
+back into Python values, Parquet decodes into an Arrow table, and the Arrow file is
+memory-mapped without copying.
+
+Needs pyarrow (pip install '.[export]'). Run from the repository root:
+    python -m benchmarks.bench_article_export [n_articles]
+"""
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+
+import pyarrow.parquet as pq
+
+from benchmarks.bench_csv_stream import iter_articles
+from medical_agent_bot.tools.article import parse_published_date
+from medical_agent_bot.tools.article_export import read_arrow_file
+from medical_agent_bot.tools.pubmed_tool import save_articles_file
+
+
+def load_csv(path: str) -> int:
+    """Read the CSV back with the typed fields the other formats store natively."""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = [
+            dict(row, authors=row["authors"].split(", "), published_date=parse_published_date(row["published_date"]))
+            for row in csv.DictReader(f)
+        ]
+    return len(rows)
+
+
+def load_jsonl(path: str) -> int:
+    with open(path, encoding="utf-8") as f:
+        return len([json.loads(line) for line in f])
+
+
+def load_parquet(path: str) -> int:
+    return pq.read_table(path).num_rows
+
+
+def load_arrow(path: str) -> int:
+    return read_arrow_file(path).num_rows
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    n_articles = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    loaders = {"csv": load_csv, "jsonl": load_jsonl, "parquet": load_parquet, "arrow": load_arrow}
+    print(f"articles={n_articles}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for file_format, loader in loaders.items():
+            path = os.path.join(tmp, f"articles.{file_format}")
+            write_time = timed(save_articles_file, iter_articles(n_articles), path)
+            load_time = min(timed(loader, path) for _ in range(3))
+            size = os.path.getsize(path) / 1024 / 1024
+            print(f"{file_format:<8} write {write_time * 1000:9.1f} ms  load {load_time * 1000:9.1f} ms  "
+                  f"{size:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
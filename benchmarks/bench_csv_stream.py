@@ -0,0 +1,101 @@
+"""
+Peak-memory benchmark: building CSV exports in one StringIO vs. streaming encoded chunks.
+
+Run from the repository root:
+    python -m benchmarks.bench_csv_stream [n_articles]
+"""
+import csv
+import io
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from email import encoders
+from email.mime.base import MIMEBase
+
+from benchmarks.fixtures import make_sentence
+from medical_agent_bot.tools.csv_stream import csv_attachment, iter_csv_chunks, markdown_table_rows
+from medical_agent_bot.tools.pubmed_tool import save_csv_file
+
+
+def iter_articles(n_articles: int, seed: int = 0):
+    """Generator of articles, as pubmed_bulk_search yields them."""
+    rng = random.Random(seed)
+    for i in range(n_articles):
+        yield {
+            "title": make_sentence(rng, 12),
+            "authors": [f"Author{j} F" for j in range(3)],
+            "journal": "J Synth Med",
+            "published_date": "2024 Jan",
+            "summary": " ".join(make_sentence(rng, 25) for _ in range(4)),
+            "url": f"https://pubmed.ncbi.nlm.nih.gov/{30000000 + i}/",
+            "pmid": str(30000000 + i),
+        }
+
+
+def evidence_matrix(n_rows: int) -> str:
+    rows = ["| Study Type | Population | Key Outcome(s) | PubMed Link |", "|---|---|---|---|"]
+    rows += [f"| RCT | n={i} adults | Outcome {i} improved | [PubMed](https://pubmed.ncbi.nlm.nih.gov/{i}/) |"
+             for i in range(n_rows)]
+    return "\n".join(rows)
+
+
+def save_previous(articles, path: str) -> None:
+    """The previous approach: collect the articles, build the whole CSV string, then write it."""
+    articles = list(articles)
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=["title", "authors", "journal", "published_date", "summary", "url"],
+                            extrasaction="ignore")
+    writer.writeheader()
+    for article in articles:
+        row = article.copy()
+        row["authors"] = ", ".join(row.get("authors", []))
+        writer.writerow(row)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(output.getvalue())
+
+
+def attach_previous(matrix: str) -> None:
+    """The previous approach: split into lines, collect rows, build the CSV string, encode, then base64 it."""
+    link_re = re.compile(r"\[.*?\]\((.*?)\)")
+    rows = []
+    for line in [line.strip() for line in matrix.strip().split("\n")]:
+        cells = [cell.strip() for cell in line[1:-1].split("|")]
+        if all(set(cell) <= set("-: ") for cell in cells if cell):
+            continue
+        rows.append([link_re.search(cell).group(1) if link_re.search(cell) else cell for cell in cells])
+    output = io.StringIO()
+    csv.writer(output, quoting=csv.QUOTE_ALL).writerows(rows)
+    part = MIMEBase("text", "csv")
+    part.set_payload(output.getvalue().encode("utf-8"))
+    encoders.encode_base64(part)
+
+
+def measure(label: str, func) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms  peak {peak / 1024 / 1024:8.2f} MiB")
+
+
+def main() -> None:
+    n_articles = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    matrix = evidence_matrix(n_articles)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "articles.csv")
+        print(f"articles={n_articles}")
+        measure("save_csv (previous)", lambda: save_previous(iter_articles(n_articles), path))
+        measure("save_csv_file (streaming)", lambda: save_csv_file(iter_articles(n_articles), path))
+    measure("attachment (previous)", lambda: attach_previous(matrix))
+    measure("csv_attachment (streaming)",
+            lambda: csv_attachment(iter_csv_chunks(markdown_table_rows(matrix)), "evidence_matrix.csv"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Latency benchmark for MeSH query expansion with the memory-mapped index.
+
+Builds an index from a synthetic descriptor dump of n_descriptors records (or from
+a real MeSH dump passed as the second argument) and times expand_query.
+
+Run from the repository root:
+    python -m benchmarks.bench_mesh_index [n_descriptors] [descYYYY.xml]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from xml.sax.saxutils import escape
+
+from benchmarks.fixtures import make_vocabulary
+from medical_agent_bot.tools.mesh_index import SAMPLE_MESH_XML, MeshIndex, build_mesh_index
+
+QUERIES = (
+    "metformin type 2 diabetes in elderly patients",
+    "lung cancer immunotherapy survival",
+    "heart attack OR heart failure[tiab]",
+)
+
+
+def make_descriptor_dump(path: str, n_descriptors: int, seed: int = 0) -> None:
+    """Write a descYYYY.xml-shaped file: the bundled sample plus synthetic descriptors."""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng, 20_000)
+    with open(SAMPLE_MESH_XML, encoding="utf-8") as f:
+        sample = f.read().rsplit("</DescriptorRecordSet>", 1)[0]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(sample)
+        for i in range(n_descriptors):
+            names = [" ".join(rng.sample(vocabulary, rng.randint(1, 4))).title() for _ in range(rng.randint(1, 8))]
+            terms = "".join(f"<Term><String>{escape(name)}</String></Term>" for name in names)
+            f.write(
+                f"<DescriptorRecord><DescriptorUI>D9{i:06d}</DescriptorUI>"
+                f"<DescriptorName><String>{escape(names[0])}</String></DescriptorName>"
+                f"<ConceptList><Concept><TermList>{terms}</TermList></Concept></ConceptList></DescriptorRecord>\n"
+            )
+        f.write("</DescriptorRecordSet>\n")
+
+
+def main() -> None:
+    n_descriptors = int(sys.argv[1]) if len(sys.argv) > 1 else 30_000
+    with tempfile.TemporaryDirectory() as tmp:
+        xml_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tmp, "desc.xml")
+        if len(sys.argv) <= 2:
+            make_descriptor_dump(xml_path, n_descriptors)
+        index_path = os.path.join(tmp, "mesh_index.bin")
+
+        start = time.perf_counter()
+        counts = build_mesh_index(xml_path, index_path)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = MeshIndex(index_path)
+        open_time = time.perf_counter() - start
+
+        rounds = 2_000
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for query in QUERIES:
+                index.expand_query(query)
+        expand_time = (time.perf_counter() - start) / (rounds * len(QUERIES))
+        index.close()
+
+    print(f"descriptors={counts['descriptors']} terms={counts['terms']}")
+    print(f"build_mesh_index    {build_time * 1000:9.1f} ms")
+    print(f"open (mmap)         {open_time * 1000:9.3f} ms")
+    print(f"expand_query        {expand_time * 1e6:9.1f} us/query")
+
+
+if __name__ == "__main__":
+    main()
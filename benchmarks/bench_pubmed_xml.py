@@ -0,0 +1,46 @@
+"""
+Memory/latency benchmark: whole-document efetch parsing vs. the streaming parser.
+
+Run from the repository root:
+    python -m benchmarks.bench_pubmed_xml [n_articles]
+"""
+import io
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+from benchmarks.fixtures import make_pubmed_article_set
+from medical_agent_bot.tools.pubmed_xml import iter_pubmed_articles, parse_pubmed_article
+
+
+def parse_whole_document(payload: bytes) -> int:
+    """The previous approach: decode the body, build the full DOM, then findall."""
+    root = ET.fromstring(payload.decode("utf-8"))
+    return sum(1 for article in root.findall(".//PubmedArticle") if parse_pubmed_article(article))
+
+
+def parse_streaming(payload: bytes) -> int:
+    return sum(1 for _ in iter_pubmed_articles(io.BytesIO(payload)))
+
+
+def measure(label: str, func, payload: bytes) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = func(payload)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<16} articles={count:<6} time={elapsed * 1000:8.1f} ms  peak={peak / 1024 / 1024:7.2f} MiB")
+
+
+def main() -> None:
+    n_articles = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    payload = make_pubmed_article_set(n_articles)
+    print(f"PubmedArticleSet fixture: {n_articles} articles, {len(payload) / 1024 / 1024:.2f} MiB")
+    measure("fromstring", parse_whole_document, payload)
+    measure("iterparse", parse_streaming, payload)
+
+
+if __name__ == "__main__":
+    main()
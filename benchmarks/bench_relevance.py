@@ -0,0 +1,59 @@
+"""
+Micro-benchmark for hashed TF-IDF ranking and near-duplicate removal.
+
+Run from the repository root:
+    python -m benchmarks.bench_relevance [n_abstracts]
+"""
+import random
+import sys
+import time
+from dataclasses import replace
+
+from benchmarks.fixtures import make_vocabulary
+from medical_agent_bot.tools.article import AbstractSection, Article
+from medical_agent_bot.tools.relevance import deduplicate, rank_by_similarity
+
+
+def make_records(n_records: int, duplicate_rate: float = 0.05, seed: int = 0):
+    """Synthetic records where roughly duplicate_rate of them copy an earlier abstract."""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng, 20_000)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+
+    def text(n_words: int) -> str:
+        return " ".join(rng.choices(vocabulary, weights, k=n_words))
+
+    records = []
+    for i in range(n_records):
+        if records and rng.random() < duplicate_rate:
+            original = rng.choice(records)
+            record = replace(original, pmid=str(i), title=original.title + " (reprint)")
+        else:
+            record = Article(
+                pmid=str(i),
+                title=text(12),
+                abstract_sections=[AbstractSection("", text(rng.randint(150, 250)))],
+            )
+        records.append(record)
+    return records
+
+
+def main() -> None:
+    n_records = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    records = make_records(n_records)
+
+    start = time.perf_counter()
+    ranked = rank_by_similarity("insulin therapy for diabetes mortality", records)
+    rank_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    kept = deduplicate([record for record, _ in ranked])
+    dedup_time = time.perf_counter() - start
+
+    print(f"abstracts={n_records}")
+    print(f"rank_by_similarity  {rank_time * 1000:9.1f} ms")
+    print(f"deduplicate         {dedup_time * 1000:9.1f} ms  kept={len(kept)} dropped={n_records - len(kept)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Latency benchmark: rendering a literature package email with the report templates
+vs. the previous per-article f-string builder.
+
+The previous builder did not HTML-escape anything, so "p<0.05" in an abstract broke the
+markup; the renderer escapes every field, which accounts for most of its per-article cost.
+
+Run from the repository root:
+    python -m benchmarks.bench_report_renderer [n_articles]
+"""
+import random
+import re
+import sys
+import time
+from html import escape
+
+from benchmarks.fixtures import make_sentence
+from medical_agent_bot.tools.article import Article
+from medical_agent_bot.tools.report_renderer import render
+
+SYNTHESIS = "## Key Findings & Synthesis\n" + "Evidence is consistent across trials. " * 20
+
+
+def make_articles(n_articles: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        {
+            "title": make_sentence(rng, 12),
+            "authors": [f"Author{j} F" for j in range(3)],
+            "journal": "J Synth Med",
+            "published_date": "2024 Jan",
+            "summary": " ".join(make_sentence(rng, 25) for _ in range(8)),
+            "url": f"https://pubmed.ncbi.nlm.nih.gov/{30000000 + i}/",
+            "links": [f"[PMC](https://www.ncbi.nlm.nih.gov/pmc/articles/PMC{i}/)"],
+            "pmid": str(30000000 + i),
+        }
+        for i in range(n_articles)
+    ]
+
+
+def render_previous(articles, synthesis: str) -> str:
+    """The previous approach: re.search per link item, unescaped f-strings per article, CSS rebuilt per call."""
+    parts = []
+    for idx, art in enumerate(articles):
+        authors = art.get("authors", "Unknown")
+        authors_text = ", ".join(str(a).strip() for a in authors if str(a).strip()) if isinstance(authors, list) else authors
+        links, seen = [], set()
+        for source in (art.get("links", []), [art.get("url")] if isinstance(art.get("url"), str) else art.get("url", [])):
+            for item in source:
+                match = re.search(r'\[(.*?)\]\((https?://[^\s)]+)\)', item)
+                if match:
+                    text, url = match.groups()
+                elif item.startswith("http"):
+                    text = url = item
+                else:
+                    continue
+                if url not in seen:
+                    links.append(f'<a href="{url}" target="_blank">{text}</a>')
+                    seen.add(url)
+        parts.append(f"""
+        <div class="article">
+            <h4>ARTICLE #{idx + 1}</h4>
+            <div class="article-field"><strong>Title:</strong> {art.get('title', 'Untitled')}</div>
+            <div class="article-field"><strong>Authors:</strong> {authors_text}</div>
+            <div class="article-field"><strong>Journal:</strong> {art.get('journal', 'Not specified')}</div>
+            <div class="article-field"><strong>Publication Date:</strong> {art.get('published_date', 'Not available')}</div>
+            <div class="article-field"><strong>Summary:</strong>
+                <div class="summary">{art.get('summary', 'No summary available')}</div>
+            </div>
+            <div class="article-links"><strong>Links:</strong><br>{'<br>'.join(links)}</div>
+        </div>
+        """)
+    lines = [f"<h4>{line[3:]}</h4>" if line.startswith("## ") else line for line in synthesis.splitlines()]
+    return f"""
+    <html><head><style>
+        body {{ font-family: Arial, sans-serif; line-height: 1.6; max-width: 800px; margin: 0 auto; padding: 20px; }}
+        .synthesis {{ background-color: #f7fafc; padding: 20px; border-radius: 5px; margin: 20px 0; white-space: pre-wrap; }}
+    </style></head>
+    <body><h3>Articles</h3>{''.join(parts)}<h3>Synthesis</h3><div class="synthesis">{chr(10).join(lines)}</div></body></html>
+    """
+
+
+def render_previous_escaped(articles, synthesis: str) -> str:
+    """The previous approach with every field escaped, for a like-for-like comparison."""
+    return render_previous(
+        [{key: escape(value, False) if isinstance(value, str) and key not in ("url", "links") else value
+          for key, value in article.items()} for article in articles],
+        escape(synthesis, False),
+    )
+
+
+def measure(label: str, func, articles, rounds: int) -> None:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        html = func(articles, SYNTHESIS)
+        timings.append(time.perf_counter() - start)
+    print(f"{label:<20} {min(timings) * 1000:9.2f} ms/package (best of {rounds})  {len(html) / 1024:8.0f} KiB")
+
+
+def main() -> None:
+    n_articles = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    articles = make_articles(n_articles)
+    rounds = 20
+    print(f"articles={n_articles}")
+    measure("previous", render_previous, articles, rounds)
+    measure("previous + escaping", render_previous_escaped, articles, rounds)
+    measure("report_renderer", render, [Article.from_dict(article) for article in articles], rounds)
+
+
+if __name__ == "__main__":
+    main()
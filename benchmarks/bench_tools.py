@@ -0,0 +1,177 @@
+"""
+Micro-benchmark suite for the tool-layer hot paths, at 10, 100 and 10,000 generated articles.
+
+Covers efetch XML parsing, result formatting (finalize_articles), articles_to_csv,
+generate_csv_string on a Markdown evidence table, build_articles_html and the MIME
+assembly and serialization of the literature package email.
+
+Each case is run for at least --min-time seconds (and at least 3 rounds); min, median,
+mean and standard deviation per call are reported. Results are saved as
+.benchmarks/<timestamp>_<commit>.json, and --compare loads the latest saved run of
+another commit and prints the change of every median.
+
+Run from the repository root:
+    python -m benchmarks.bench_tools [--sizes 10,100,10000] [-k csv] [--compare HEAD~1] [--no-save]
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.fixtures import make_pubmed_article_set
+from medical_agent_bot.tools.pubmed_tool import articles_to_csv, finalize_articles
+from medical_agent_bot.tools.pubmed_xml import iter_pubmed_articles
+from medical_agent_bot.tools.send_emails_tool import build_articles_html, build_literature_message, generate_csv_string
+
+RESULTS_DIR = ".benchmarks"
+DEFAULT_SIZES = (10, 100, 10_000)
+
+# A change in median beyond this share is flagged when comparing runs.
+REGRESSION_THRESHOLD = 0.10
+
+SYNTHESIS = "## Key Findings & Synthesis\n" + "The evidence is consistent across study designs. " * 20
+
+
+def evidence_table(results: List[Dict[str, Any]]) -> str:
+    """The Markdown evidence matrix the evidence builder writes, one row per article."""
+    lines = ["| Study | Design | Journal | Date | Link |", "|---|---|---|---|---|"]
+    for result in results:
+        lines.append(
+            f"| {result['title'][:60]} | RCT | {result['journal']} | {result['published_date']} "
+            f"| [PubMed]({result['url']}) |"
+        )
+    return "\n".join(lines)
+
+
+def make_cases(n_articles: int) -> Dict[str, Callable[[], Any]]:
+    """Return {case name: zero-argument callable} over fixtures of n_articles articles."""
+    payload = make_pubmed_article_set(n_articles)
+    records = list(iter_pubmed_articles(payload))
+    results = [record.to_result() for record in records]
+    table = evidence_table(results)
+
+    return {
+        "parse_efetch_xml": lambda: list(iter_pubmed_articles(io.BytesIO(payload))),
+        "finalize_articles": lambda: finalize_articles(records),
+        "articles_to_csv": lambda: articles_to_csv(records),
+        "generate_csv_string_markdown": lambda: generate_csv_string(table),
+        "build_articles_html": lambda: build_articles_html(results),
+        "build_literature_message": lambda: build_literature_message(
+            SYNTHESIS, table, records, "sender@example.com", "recipient@example.com"
+        ).as_bytes(),
+    }
+
+
+def measure(func: Callable[[], Any], min_time: float, min_rounds: int = 3, max_rounds: int = 10_000) -> Dict[str, Any]:
+    """Time func repeatedly; return per-call statistics in seconds."""
+    func()  # warm-up: imports, template compilation, caches
+    timings: List[float] = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < min_rounds or (time.perf_counter() < deadline and len(timings) < max_rounds):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {
+        "rounds": len(timings),
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+
+def git_commit() -> Tuple[str, bool]:
+    """Return (short commit hash, whether the tree has uncommitted changes)."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True)
+        return commit.stdout.strip(), bool(status.stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def resolve_commit(ref: str) -> str:
+    result = subprocess.run(["git", "rev-parse", "--short", ref], capture_output=True, text=True)
+    return result.stdout.strip() or ref
+
+
+def latest_run(commit: str) -> Dict[str, Any] | None:
+    """Load the most recent saved run for a commit, if any."""
+    paths = sorted(glob.glob(os.path.join(RESULTS_DIR, f"*_{commit}*.json")))
+    if not paths:
+        return None
+    with open(paths[-1], encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_run(run: Dict[str, Any]) -> str:
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    suffix = "-dirty" if run["dirty"] else ""
+    path = os.path.join(RESULTS_DIR, f"{stamp}_{run['commit']}{suffix}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+    return path
+
+
+def print_comparison(run: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    previous = {(b["name"], b["size"]): b["stats"] for b in baseline["benchmarks"]}
+    print(f"\ncompared with {baseline['commit']} ({baseline['datetime']}), median per call:")
+    for bench in run["benchmarks"]:
+        old = previous.get((bench["name"], bench["size"]))
+        if old is None:
+            continue
+        change = bench["stats"]["median"] / old["median"] - 1
+        flag = "  REGRESSION" if change > REGRESSION_THRESHOLD else "  faster" if change < -REGRESSION_THRESHOLD else ""
+        print(f"{bench['name']:<30} {bench['size']:>6}  {old['median'] * 1000:10.3f} -> "
+              f"{bench['stats']['median'] * 1000:10.3f} ms  {change:+7.1%}{flag}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated article counts")
+    parser.add_argument("-k", dest="keyword", default="", help="only run cases whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to spend per case")
+    parser.add_argument("--compare", metavar="REF", help="commit whose latest saved run to compare against")
+    parser.add_argument("--no-save", action="store_true", help=f"do not write the run to {RESULTS_DIR}/")
+    args = parser.parse_args()
+
+    commit, dirty = git_commit()
+    run: Dict[str, Any] = {
+        "commit": commit,
+        "dirty": dirty,
+        "datetime": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "machine": platform.platform(),
+        "benchmarks": [],
+    }
+    print(f"{'case':<30} {'size':>6} {'rounds':>7} {'min ms':>10} {'median ms':>10} {'mean ms':>10} {'stddev':>8}")
+    for size in (int(size) for size in args.sizes.split(",")):
+        for name, func in make_cases(size).items():
+            if args.keyword not in name:
+                continue
+            stats = measure(func, args.min_time)
+            run["benchmarks"].append({"name": name, "size": size, "stats": stats})
+            print(f"{name:<30} {size:>6} {stats['rounds']:>7} {stats['min'] * 1000:10.3f} "
+                  f"{stats['median'] * 1000:10.3f} {stats['mean'] * 1000:10.3f} {stats['stddev'] * 1000:8.3f}")
+
+    if not args.no_save:
+        print(f"\nsaved {save_run(run)}")
+    if args.compare:
+        baseline = latest_run(resolve_commit(args.compare))
+        if baseline is None:
+            print(f"\nno saved run for {args.compare}; run this suite on that commit first")
+        else:
+            print_comparison(run, baseline)
+
+
+if __name__ == "__main__":
+    main()
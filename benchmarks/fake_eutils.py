@@ -0,0 +1,257 @@
+"""
+Offline stand-in for the NCBI E-utilities (esearch, esummary, efetch) serving a fixture corpus.
+
+The corpus is an efetch PubmedArticleSet document: a recorded response saved from NCBI
+(curl '.../efetch.fcgi?db=pubmed&id=...&retmode=xml' > articles.xml) or, by default,
+the synthetic set from benchmarks.fixtures. esearch maps every term to a stable,
+term-dependent selection of its PMIDs; efetch and esummary replay the stored records.
+esearch with usehistory=y stores the term's matches (the whole corpus, in term-dependent
+order) on a mock History server, and efetch/esummary page through them by WebEnv,
+query_key, retstart and retmax. Each response can be delayed and a share of requests
+failed with 429/5xx statuses.
+
+Run standalone and point the app at it with NCBI_EUTILS_BASE_URL:
+    python -m benchmarks.fake_eutils [--port 8800] [--fixtures articles.xml] [--latency-ms 150] [--error-rate 0.05]
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Sequence
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.fixtures import make_pubmed_article_set
+from medical_agent_bot.tools.pubmed_xml import iter_pubmed_articles
+
+_ARTICLE_RE = re.compile(rb"<PubmedArticle>.*?</PubmedArticle>", re.DOTALL)
+_PMID_RE = re.compile(rb"<PMID[^>]*>(\d+)</PMID>")
+
+# Per-endpoint response delay in milliseconds, roughly NCBI's typical latency.
+DEFAULT_LATENCY_MS = {"esearch": 300.0, "esummary": 150.0, "efetch": 400.0}
+
+
+class FixtureCorpus:
+    """
+    PubMed records indexed by PMID, holding each record's efetch XML and esummary entry.
+
+    Args:
+        article_set (bytes): An efetch-style PubmedArticleSet document.
+    """
+
+    def __init__(self, article_set: bytes):
+        self.xml: Dict[str, bytes] = {}
+        for match in _ARTICLE_RE.finditer(article_set):
+            pmid = _PMID_RE.search(match.group())
+            if pmid:
+                self.xml[pmid.group(1).decode()] = match.group()
+        self.summaries: Dict[str, Dict[str, Any]] = {
+            article.pmid: {
+                "uid": article.pmid,
+                "title": article.title,
+                "authors": [{"name": name} for name in article.authors],
+                "source": article.journal,
+                "pubdate": article.published_date,
+                "pubtype": article.publication_types,
+                "articleids": [{"idtype": "doi", "value": article.doi}] if article.doi else [],
+            }
+            for article in iter_pubmed_articles(article_set)
+        }
+        self.pmids = sorted(self.xml)
+
+    @classmethod
+    def from_file(cls, path: str) -> "FixtureCorpus":
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    @classmethod
+    def synthetic(cls, n_articles: int = 2000, seed: int = 0) -> "FixtureCorpus":
+        return cls(make_pubmed_article_set(n_articles, seed))
+
+    def search(self, term: str, retmax: int) -> List[str]:
+        """Stable, term-dependent PMIDs: the same term always finds the same records."""
+        rng = random.Random(zlib.crc32(term.encode("utf-8")))
+        return rng.sample(self.pmids, min(retmax, len(self.pmids)))
+
+    def efetch(self, pmids: Sequence[str]) -> bytes:
+        records = b"\n".join(self.xml[pmid] for pmid in pmids if pmid in self.xml)
+        return b'<?xml version="1.0" ?>\n<PubmedArticleSet>\n' + records + b"\n</PubmedArticleSet>\n"
+
+    def esummary(self, pmids: Sequence[str]) -> Dict[str, Any]:
+        found = [pmid for pmid in pmids if pmid in self.summaries]
+        return {"result": {"uids": found, **{pmid: self.summaries[pmid] for pmid in found}}}
+
+
+class FakeEUtilsServer:
+    """
+    Threaded HTTP server answering esearch/esummary/efetch from a FixtureCorpus.
+
+    Args:
+        corpus (FixtureCorpus): Records to serve (defaults to 2000 synthetic articles).
+        host (str): Interface to bind.
+        port (int): Port to bind; 0 picks a free one.
+        latency_ms (dict | float): Mean delay per endpoint, or one delay for all.
+        jitter (float): Each delay is drawn uniformly from mean * (1 ± jitter).
+        error_rate (float): Share of requests answered with an error status instead.
+        error_statuses (sequence): Statuses to fail with, chosen at random.
+        seed (int | None): Seed for the latency and error draws.
+    """
+
+    def __init__(
+        self,
+        corpus: FixtureCorpus | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: Dict[str, float] | float | None = None,
+        jitter: float = 0.5,
+        error_rate: float = 0.0,
+        error_statuses: Sequence[int] = (429, 503),
+        seed: int | None = None,
+    ):
+        self.corpus = corpus or FixtureCorpus.synthetic()
+        if isinstance(latency_ms, (int, float)):
+            latency_ms = dict.fromkeys(DEFAULT_LATENCY_MS, float(latency_ms))
+        self.latency_ms = {**DEFAULT_LATENCY_MS, **(latency_ms or {})}
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"requests": 0, "errors": 0}
+        self._history: Dict[str, List[str]] = {}
+
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeEUtilsServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-eutils", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeEUtilsServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def _draw(self, endpoint: str) -> tuple:
+        """Return (delay in seconds, error status or None) for one request."""
+        with self._lock:
+            self._counters["requests"] += 1
+            self._counters[endpoint] = self._counters.get(endpoint, 0) + 1
+            mean = self.latency_ms.get(endpoint, 0.0) / 1000
+            delay = mean * self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+            status = None
+            if self.error_rate and self._rng.random() < self.error_rate:
+                status = self._rng.choice(self.error_statuses)
+                self._counters["errors"] += 1
+        return delay, status
+
+    def respond(self, endpoint: str, params: Dict[str, str]) -> tuple:
+        """Return (status, content type, body) for an E-utilities request."""
+        pmids = [pmid for pmid in params.get("id", "").split(",") if pmid]
+        if endpoint == "esearch":
+            term, retmax = params.get("term", ""), int(params.get("retmax", 20))
+            if params.get("usehistory") != "y":
+                idlist = self.corpus.search(term, retmax)
+                body = json.dumps({"esearchresult": {"count": str(len(idlist)), "idlist": idlist}})
+                return 200, "application/json", body.encode()
+            matches = self.corpus.search(term, len(self.corpus.pmids))
+            with self._lock:
+                webenv = f"MCID_{len(self._history) + 1}"
+                self._history[webenv] = matches
+            body = json.dumps({"esearchresult": {
+                "count": str(len(matches)),
+                "idlist": matches[:retmax],
+                "querykey": "1",
+                "webenv": webenv,
+            }})
+            return 200, "application/json", body.encode()
+        if "WebEnv" in params:
+            matches = self._history.get(params["WebEnv"])
+            if matches is None or params.get("query_key") != "1":
+                return 400, "text/plain", b"unknown WebEnv or query_key"
+            retstart = int(params.get("retstart", 0))
+            pmids = matches[retstart:retstart + int(params.get("retmax", 20))]
+        if endpoint == "esummary":
+            return 200, "application/json", json.dumps(self.corpus.esummary(pmids)).encode()
+        if endpoint == "efetch":
+            return 200, "text/xml", self.corpus.efetch(pmids)
+        return 404, "text/plain", b"unknown endpoint"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def _serve(self, query: str) -> None:
+                path = urlsplit(self.path)
+                endpoint = path.path.rstrip("/").rsplit("/", 1)[-1].removesuffix(".fcgi")
+                params = {key: values[-1] for key, values in parse_qs(path.query + "&" + query).items()}
+                delay, error = server._draw(endpoint)
+                time.sleep(delay)
+                if error is not None:
+                    status, content_type, body = error, "text/plain", b"injected failure"
+                else:
+                    status, content_type, body = server.respond(endpoint, params)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                self._serve("")
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                self._serve(self.rfile.read(length).decode("utf-8"))
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--fixtures", help="efetch PubmedArticleSet XML to serve (default: synthetic)")
+    parser.add_argument("--articles", type=int, default=2000, help="size of the synthetic corpus")
+    parser.add_argument("--latency-ms", type=float, help="delay for every endpoint (default: per-endpoint)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    corpus = FixtureCorpus.from_file(args.fixtures) if args.fixtures else FixtureCorpus.synthetic(args.articles)
+    server = FakeEUtilsServer(corpus, args.host, args.port, args.latency_ms, error_rate=args.error_rate)
+    print(f"Serving {len(corpus.pmids)} articles at {server.base_url} (Ctrl+C to stop)")
+    print(f"  export NCBI_EUTILS_BASE_URL={server.base_url}")
+    with server:
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
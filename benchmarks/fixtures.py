@@ -0,0 +1,51 @@
+"""Synthetic PubMed data for the benchmarks."""
+import random
+from typing import List
+from xml.sax.saxutils import escape
+
+_WORDS = (
+    "patients randomized trial placebo outcome mortality cohort treatment dose efficacy "
+    "safety adverse events diabetes insulin hypertension cancer immunotherapy survival "
+    "inflammation biomarker cardiovascular risk reduction follow-up months years baseline "
+    "significant improvement compared control group analysis clinical study evidence"
+).split()
+
+
+def make_vocabulary(rng: random.Random, size: int) -> List[str]:
+    """Return size distinct pseudo-words for corpora that need a realistic vocabulary."""
+    syllables = ["ka", "lo", "mi", "ne", "ru", "ta", "zo", "vi", "pe", "su", "dra", "gen", "cor", "ost", "ix"]
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def make_sentence(rng: random.Random, n_words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n_words)).capitalize() + "."
+
+
+def make_pubmed_article_set(n_articles: int, seed: int = 0) -> bytes:
+    """Return an efetch-style PubmedArticleSet document with n_articles records."""
+    rng = random.Random(seed)
+    parts: List[str] = ['<?xml version="1.0" ?>\n<PubmedArticleSet>\n']
+    for i in range(n_articles):
+        pmid = 30000000 + i
+        authors = "".join(
+            f"<Author><LastName>Author{j}</LastName><ForeName>F</ForeName><Initials>F</Initials></Author>"
+            for j in range(rng.randint(1, 8))
+        )
+        sections = "".join(
+            f'<AbstractText Label="{label}">{escape(make_sentence(rng, rng.randint(30, 60)))}</AbstractText>'
+            for label in ("BACKGROUND", "METHODS", "RESULTS", "CONCLUSIONS")
+        )
+        parts.append(
+            f"<PubmedArticle><MedlineCitation><PMID>{pmid}</PMID><Article>"
+            f"<Journal><Title>Journal of Synthetic Medicine</Title>"
+            f"<JournalIssue><PubDate><Year>{2000 + i % 25}</Year><Month>Jan</Month></PubDate></JournalIssue></Journal>"
+            f"<ArticleTitle>{escape(make_sentence(rng, 12))}</ArticleTitle>"
+            f"<Abstract>{sections}</Abstract><AuthorList>{authors}</AuthorList>"
+            f"<PublicationTypeList><PublicationType>Randomized Controlled Trial</PublicationType></PublicationTypeList>"
+            f"</Article></MedlineCitation></PubmedArticle>\n"
+        )
+    parts.append("</PubmedArticleSet>\n")
+    return "".join(parts).encode("utf-8")
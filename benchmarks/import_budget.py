@@ -0,0 +1,104 @@
+"""
+Import-time budget check: profiles imports with `python -X importtime` and fails when over budget.
+
+Each target module is imported in a fresh interpreter (best of --runs), and the
+cumulative import time of everything it loads beyond interpreter startup is compared
+with its budget. Targets also list modules they must not load: importing the package
+or the tools should not pull in google.adk, requests, smtplib or dotenv until they are
+actually used.
+
+Run from the repository root (exits with status 1 if any target fails):
+    python -m benchmarks.import_budget [--runs 5] [--scale 1.5] [-v]
+"""
+import argparse
+import re
+import subprocess
+import sys
+from typing import List, NamedTuple, Sequence, Tuple
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+class Target(NamedTuple):
+    module: str
+    budget_ms: float
+    forbidden: Tuple[str, ...] = ()
+
+
+# Budgets leave roughly 2x headroom over the measured times; scale them with --scale on slower machines.
+# The tools still load httpx and numpy eagerly: every search needs both. Most of config's
+# time is spent creating the settings dataclasses.
+TARGETS: Sequence[Target] = (
+    Target("medical_agent_bot", 20, ("google", "requests", "smtplib", "dotenv", "numpy", "httpx", "email.mime")),
+    Target("medical_agent_bot.config", 40, ("dotenv",)),
+    Target("medical_agent_bot.tools.pubmed_tool", 600, ("google", "requests", "smtplib", "dotenv", "email.mime")),
+    Target("medical_agent_bot.tools.send_emails_tool", 100, ("google", "requests", "smtplib", "dotenv", "email.mime")),
+    Target("medical_agent_bot.agent", 3500),
+)
+
+
+def profile(statement: str) -> List[Tuple[str, int, int]]:
+    """Run statement under -X importtime; return (module, depth, cumulative µs) per import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            rows.append((match.group(4), len(match.group(3)) // 2, int(match.group(2))))
+    return rows
+
+
+def measure(module: str, startup: set) -> Tuple[float, List[str], List[Tuple[str, int]]]:
+    """Return (import ms, modules loaded, slowest direct imports) for one fresh import."""
+    rows = [row for row in profile(f"import {module}") if row[0] not in startup]
+    total_ms = sum(cumulative for _, depth, cumulative in rows if depth == 0) / 1000
+    direct = [(name, cumulative) for name, depth, cumulative in rows if depth == 1]
+    return total_ms, [name for name, _, _ in rows], sorted(direct, key=lambda item: -item[1])
+
+
+def forbidden_loaded(loaded: Sequence[str], forbidden: Sequence[str]) -> List[str]:
+    return sorted({
+        name for name in loaded
+        if any(name == prefix or name.startswith(prefix + ".") for prefix in forbidden)
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per target; the fastest counts")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show the slowest imports of each target")
+    args = parser.parse_args()
+
+    startup = {name for name, _, _ in profile("pass")}
+    failures = 0
+    print(f"{'module':<45} {'import ms':>10} {'budget ms':>10}  result")
+    for target in TARGETS:
+        runs = [measure(target.module, startup) for _ in range(args.runs)]
+        total_ms, loaded, slowest = min(runs, key=lambda run: run[0])
+        budget_ms = target.budget_ms * args.scale
+        problems: List[str] = []
+        if total_ms > budget_ms:
+            problems.append("over budget")
+        leaked = forbidden_loaded(loaded, target.forbidden)
+        if leaked:
+            prefixes = [prefix for prefix in target.forbidden if forbidden_loaded(leaked, (prefix,))]
+            problems.append("loads " + ", ".join(prefixes))
+        failures += bool(problems)
+        print(f"{target.module:<45} {total_ms:10.1f} {budget_ms:10.0f}  {'; '.join(problems) or 'ok'}")
+        if args.verbose or problems:
+            for name, cumulative in slowest[:4]:
+                print(f"    {cumulative / 1000:8.1f} ms  {name}")
+            if leaked:
+                print(f"    unexpected: {', '.join(leaked[:8])}{' ...' if len(leaked) > 8 else ''}")
+
+    if failures:
+        print(f"\n{failures} target(s) failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
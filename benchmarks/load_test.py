@@ -0,0 +1,185 @@
+"""
+End-to-end load test: concurrent sessions through root_agent with NCBI, Gemini and SMTP replaced by local stand-ins.
+
+Starts the fake E-utilities server (benchmarks.fake_eutils), an SMTP sink
+(benchmarks.smtp_sink) and gives every LLM agent a stub model (benchmarks.stub_llm),
+then runs the sessions, at most --concurrency at a time. Each session is one user turn
+("<topic> - send to userN@example.com") through the full pipeline: ingestor, concurrent
+PubMed fetchers, merge, evidence builder and email dispatcher.
+
+Reports p50/p95/p99 turn latency, throughput, the emails the sink received, the
+per-stage latencies recorded by the tracer and how often the resilience paths fired
+(circuit breakers, hedged efetches, stale or abstract-less fallbacks). Caches and indexes live in a temporary
+directory, so every run starts cold; topics repeat once --sessions exceeds --topics.
+
+Run from the repository root:
+    python -m benchmarks.load_test [--sessions 50] [--concurrency 10] [--llm-latency-ms 800]
+        [--eutils-latency-ms 300] [--error-rate 0.02] [--fixtures articles.xml]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import warnings
+from typing import Any, Dict, List, Sequence
+
+from benchmarks.fake_eutils import FakeEUtilsServer, FixtureCorpus
+from benchmarks.smtp_sink import SmtpSink
+
+APP_NAME = "medsearchpro_load_test"
+
+TOPICS = (
+    "metformin type 2 diabetes", "statins cardiovascular prevention", "immunotherapy melanoma",
+    "hypertension salt reduction", "vitamin D fractures", "SGLT2 inhibitors heart failure",
+    "aspirin colorectal cancer", "exercise depression", "probiotics antibiotic diarrhea",
+    "GLP-1 agonists obesity", "anticoagulation atrial fibrillation", "asthma inhaled corticosteroids",
+    "sepsis early antibiotics", "cognitive behavioural therapy insomnia", "HPV vaccination cervical cancer",
+    "smoking cessation varenicline", "knee osteoarthritis physiotherapy", "migraine CGRP antibodies",
+    "iron deficiency anemia pregnancy", "COVID-19 dexamethasone",
+)
+
+# LLM agent name -> StubLlm role.
+STUB_ROLES = {"med_query_variant_writer": "ingestor", "med_evidence_builder": "evidence", "email_agent": "email"}
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Linearly interpolated q-th percentile (0-100) of an ascending sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def configure_environment(eutils: FakeEUtilsServer, sink: SmtpSink, workdir: str) -> None:
+    """Point the app's clients at the stand-ins and its caches at workdir (before first use)."""
+    host, port = sink.address
+    os.environ.update(
+        NCBI_EUTILS_BASE_URL=eutils.base_url,
+        NCBI_API_KEY="load-test",
+        NCBI_RATE_LIMIT=os.getenv("NCBI_RATE_LIMIT", "1000"),
+        PUBMED_CACHE_PATH=os.path.join(workdir, "pubmed_cache.sqlite3"),
+        ARTICLE_INDEX_PATH=os.path.join(workdir, "article_index.sqlite3"),
+        MESH_INDEX_PATH=os.path.join(workdir, "mesh_index.bin"),
+        SMTP_HOST=host,
+        SMTP_PORT=str(port),
+        SMTP_USER="load-test@example.com",
+        SMTP_PASSWORD="load-test",
+        SMTP_STARTTLS="0",
+        EMAIL_QUEUE_SIZE=os.getenv("EMAIL_QUEUE_SIZE", "1000"),
+    )
+
+
+def install_stub_llms(agent, latency_ms: float) -> None:
+    """Replace the model of every LLM agent under agent with a StubLlm for its role."""
+    from benchmarks.stub_llm import StubLlm
+
+    role = STUB_ROLES.get(agent.name)
+    if role is not None:
+        agent.model = StubLlm(role=role, latency_ms=latency_ms)
+    for sub_agent in agent.sub_agents:
+        install_stub_llms(sub_agent, latency_ms)
+
+
+async def run_session(runner, user_id: str, message: str) -> str:
+    """Run one user turn to completion and return the final text reply."""
+    from google.genai import types
+
+    session = await runner.session_service.create_session(app_name=APP_NAME, user_id=user_id)
+    reply = ""
+    async for event in runner.run_async(
+        user_id=user_id,
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text=message)]),
+    ):
+        if event.content and event.content.parts and event.content.parts[0].text:
+            reply = event.content.parts[0].text
+    return reply
+
+
+async def run_load(runner, sessions: int, concurrency: int, topics: Sequence[str]) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                reply = await run_session(runner, f"user{i}", f"{topics[i % len(topics)]} - send to user{i}@example.com")
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+                return
+            latencies.append(time.perf_counter() - start)
+            if "Delivery ID" not in reply:
+                errors.append(f"unexpected reply: {reply[:120]!r}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(sessions)))
+    return {"latencies": sorted(latencies), "errors": errors, "elapsed": time.perf_counter() - start}
+
+
+def report(result: Dict[str, Any], eutils: FakeEUtilsServer, sink: SmtpSink, sessions: int) -> None:
+    from medical_agent_bot.tools.eutils_client import get_eutils_client
+    from medical_agent_bot.tools.telemetry import get_tracer
+
+    latencies, elapsed = result["latencies"], result["elapsed"]
+    print(f"sessions={sessions} completed={len(latencies)} errors={len(result['errors'])} wall={elapsed:.2f}s")
+    print(f"throughput   {len(latencies) / elapsed:8.2f} sessions/s")
+    for q in (50, 95, 99):
+        print(f"p{q:<11} {percentile(latencies, q) * 1000:8.0f} ms")
+    print(f"max          {(latencies[-1] if latencies else 0) * 1000:8.0f} ms")
+    print(f"eutils       {eutils.stats()}")
+    print(f"smtp sink    {sink.stats()}")
+    for error in result["errors"][:5]:
+        print(f"  error: {error}")
+
+    print(f"\n{'stage':<40} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stage in sorted(get_tracer().stats().items(), key=lambda item: -item[1]["p95_ms"]):
+        print(f"{name:<40} {stage['count']:>6} {stage['p50_ms']:>9.1f} {stage['p95_ms']:>9.1f} {stage['p99_ms']:>9.1f}")
+
+    counters = get_tracer().counters()
+    if counters:
+        print(f"\n{'counter':<40} {'count':>6}")
+        for name, count in counters.items():
+            print(f"{name:<40} {count:>6}")
+    for endpoint, breaker in get_eutils_client().stats()["breakers"].items():
+        print(f"breaker {endpoint:<10} {breaker}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--topics", type=int, default=len(TOPICS), help="distinct topics to cycle through")
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0, help="mean delay per stub LLM turn")
+    parser.add_argument("--eutils-latency-ms", type=float, help="delay for every endpoint (default: per-endpoint)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of E-utilities requests failed")
+    parser.add_argument("--smtp-latency-ms", type=float, default=50.0)
+    parser.add_argument("--fixtures", help="efetch PubmedArticleSet XML to serve (default: synthetic)")
+    parser.add_argument("--articles", type=int, default=2000, help="size of the synthetic corpus")
+    args = parser.parse_args()
+
+    corpus = FixtureCorpus.from_file(args.fixtures) if args.fixtures else FixtureCorpus.synthetic(args.articles)
+    eutils = FakeEUtilsServer(corpus, latency_ms=args.eutils_latency_ms, error_rate=args.error_rate, seed=0)
+    sink = SmtpSink(latency_ms=args.smtp_latency_ms)
+    with eutils, sink, tempfile.TemporaryDirectory() as workdir:
+        configure_environment(eutils, sink, workdir)
+        warnings.filterwarnings("ignore", category=DeprecationWarning)
+        warnings.filterwarnings("ignore", category=UserWarning)
+
+        from google.adk.runners import InMemoryRunner
+        from medical_agent_bot.agent import root_agent
+        from medical_agent_bot.tools.smtp_delivery import get_email_delivery_queue
+
+        install_stub_llms(root_agent, args.llm_latency_ms)
+        runner = InMemoryRunner(agent=root_agent, app_name=APP_NAME)
+        result = asyncio.run(run_load(runner, args.sessions, args.concurrency, TOPICS[:args.topics]))
+        get_email_delivery_queue().close(timeout=60)
+        report(result, eutils, sink, args.sessions)
+
+
+if __name__ == "__main__":
+    main()
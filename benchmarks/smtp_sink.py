@@ -0,0 +1,180 @@
+"""
+Local SMTP sink: accepts and counts every message, for running the email path offline.
+
+It speaks the subset of SMTP that smtplib and the delivery pool use (EHLO/HELO,
+AUTH PLAIN/LOGIN with any credentials, MAIL, RCPT, DATA, RSET, NOOP, QUIT), without
+STARTTLS, so point the app at it with SMTP_STARTTLS=0.
+
+Run standalone:
+    python -m benchmarks.smtp_sink [--port 8025] [--latency-ms 50]
+"""
+import argparse
+import random
+import socketserver
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Tuple
+
+
+class SmtpSink:
+    """
+    Threaded SMTP server that stores received messages in memory.
+
+    Args:
+        host (str): Interface to bind.
+        port (int): Port to bind; 0 picks a free one.
+        latency_ms (float): Delay before acknowledging each message, like a remote relay.
+        reject_rate (float): Share of recipients refused with a transient 451 reply.
+        keep_messages (int): Most recent messages kept for inspection.
+        seed (int | None): Seed for the reject draws.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        reject_rate: float = 0.0,
+        keep_messages: int = 100,
+        seed: int | None = None,
+    ):
+        self.latency_ms = latency_ms
+        self.reject_rate = reject_rate
+        self.messages: deque = deque(maxlen=keep_messages)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counters = {"sessions": 0, "messages": 0, "bytes": 0, "rejected": 0}
+
+        self._server = socketserver.ThreadingTCPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    def start(self) -> "SmtpSink":
+        threading.Thread(target=self._server.serve_forever, name="smtp-sink", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "SmtpSink":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[key] += amount
+
+    def _reject(self) -> bool:
+        with self._lock:
+            return bool(self.reject_rate) and self._rng.random() < self.reject_rate
+
+    def _handler(self):
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str) -> None:
+                self.wfile.write(line.encode("ascii") + b"\r\n")
+
+            def read_line(self) -> str | None:
+                """Return the next command line, or None once the client disconnects."""
+                data = self.rfile.readline()
+                return data.decode("utf-8", "replace").rstrip("\r\n") if data else None
+
+            def handle(self) -> None:
+                sink._count("sessions")
+                self.reply("220 localhost SMTP sink ready")
+                recipients: List[str] = []
+                while True:
+                    line = self.read_line()
+                    if line is None:
+                        return
+                    verb, _, arg = line.partition(" ")
+                    verb = verb.upper()
+                    if verb == "EHLO":
+                        self.reply("250-localhost")
+                        self.reply("250-AUTH PLAIN LOGIN")
+                        self.reply("250 8BITMIME")
+                    elif verb == "HELO":
+                        self.reply("250 localhost")
+                    elif verb == "AUTH":
+                        mechanism, _, initial = arg.partition(" ")
+                        if mechanism.upper() == "LOGIN":
+                            self.reply("334 VXNlcm5hbWU6")
+                            self.read_line()
+                            self.reply("334 UGFzc3dvcmQ6")
+                            self.read_line()
+                        elif not initial:
+                            self.reply("334 ")
+                            self.read_line()
+                        self.reply("235 2.7.0 Authentication successful")
+                    elif verb == "MAIL":
+                        recipients = []
+                        self.reply("250 OK")
+                    elif verb == "RCPT":
+                        if sink._reject():
+                            sink._count("rejected")
+                            self.reply("451 4.3.0 Try again later")
+                        else:
+                            recipients.append(arg)
+                            self.reply("250 OK")
+                    elif verb == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        body = []
+                        while True:
+                            data = self.rfile.readline()
+                            if data in (b".\r\n", b".\n", b""):
+                                break
+                            body.append(data[1:] if data.startswith(b"..") else data)
+                        message = b"".join(body)
+                        if sink.latency_ms:
+                            time.sleep(sink.latency_ms / 1000)
+                        sink.messages.append((recipients, message))
+                        sink._count("messages")
+                        sink._count("bytes", len(message))
+                        self.reply("250 OK: queued")
+                    elif verb in ("RSET", "NOOP"):
+                        if verb == "RSET":
+                            recipients = []
+                        self.reply("250 OK")
+                    elif verb == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 Command not implemented")
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    sink = SmtpSink(args.host, args.port, args.latency_ms)
+    host, port = sink.address
+    print(f"SMTP sink listening on {host}:{port} (Ctrl+C to stop)")
+    print(f"  export SMTP_HOST={host} SMTP_PORT={port} SMTP_STARTTLS=0 SMTP_USER=sink SMTP_PASSWORD=sink")
+    with sink:
+        try:
+            while True:
+                time.sleep(10)
+                print(sink.stats())
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Stub LLM for running root_agent offline: canned, instantly parseable replies for each LLM agent.
+
+Each agent gets its own StubLlm with a role:
+
+- "ingestor" (med_query_variant_writer): a JSON array of query variants built from the user message.
+- "evidence" (med_evidence_builder): a fixed Markdown evidence table and synthesis.
+- "email" (med_email_dispatcher): a send_email call with that table and the address from
+  the user message, then the queued-delivery reply once the tool has answered.
+
+Replies are delayed by a configurable latency and carry token counts estimated from the
+prompt, so traces and load tests see realistic LLM turns without calling Gemini.
+"""
+import asyncio
+import json
+import random
+import re
+from typing import AsyncGenerator, List
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from medical_agent_bot.tools.compaction import estimate_tokens
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+
+DEFAULT_RECIPIENT = "loadtest@example.com"
+
+EVIDENCE_TABLE = """| Study | Design | Population | Intervention | Outcome | Link |
+|---|---|---|---|---|---|
+| Author0 et al. 2021 | RCT | 240 adults | Drug A vs placebo | Reduced HbA1c | [PubMed](https://pubmed.ncbi.nlm.nih.gov/30000001/) |
+| Author1 et al. 2019 | Cohort | 1,200 patients | Drug A | Lower mortality | [PubMed](https://pubmed.ncbi.nlm.nih.gov/30000002/) |
+| Author2 et al. 2023 | Meta-analysis | 14 trials | Drug A | Consistent benefit | [PubMed](https://pubmed.ncbi.nlm.nih.gov/30000003/) |"""
+
+SYNTHESIS = """## Key Findings & Synthesis
+Across a randomized trial, a large cohort and a meta-analysis, the intervention was associated
+with improved outcomes and an acceptable safety profile.
+
+### Consistent Results & Strengths
+  - Effects point in the same direction across designs.
+
+### Discrepancies & Limitations
+  - Follow-up was short and populations were heterogeneous.
+
+### Evidence Gaps & Future Research
+  - Longer trials in under-represented populations are needed."""
+
+def _text(content: types.Content | None) -> str:
+    if content is None or not content.parts:
+        return ""
+    return "".join(part.text for part in content.parts if part.text)
+
+
+class StubLlm(BaseLlm):
+    """
+    Canned model for one agent role (see the module docstring).
+
+    Attributes:
+        role (str): "ingestor", "evidence" or "email".
+        latency_ms (float): Mean delay per turn.
+        jitter (float): Each delay is drawn uniformly from latency * (1 ± jitter).
+    """
+
+    model: str = "stub"
+    role: str = "ingestor"
+    latency_ms: float = 0.0
+    jitter: float = 0.5
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000 * random.uniform(1 - self.jitter, 1 + self.jitter))
+        parts = self._reply(llm_request.contents)
+        prompt = sum(estimate_tokens(_text(content)) for content in llm_request.contents)
+        output = sum(estimate_tokens(part.text or json.dumps(part.function_call.args)) for part in parts)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=parts),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt, candidates_token_count=output, total_token_count=prompt + output
+            ),
+        )
+
+    def _reply(self, contents: List[types.Content]) -> List[types.Part]:
+        user_text = next((_text(c) for c in contents if c.role == "user" and _text(c)), "")
+        if self.role == "ingestor":
+            topic = _EMAIL_RE.sub("", user_text).strip(" .,") or "metformin type 2 diabetes"
+            return [types.Part(text=json.dumps([topic, f"{topic}[tiab]", f"({topic}) AND review[pt]"]))]
+        if self.role == "evidence":
+            return [types.Part(text=f"{EVIDENCE_TABLE}\n\n{SYNTHESIS}")]
+
+        last = (contents[-1].parts or []) if contents else []
+        response = next((part.function_response for part in last if part.function_response), None)
+        if response is not None:
+            return [types.Part(text=f"**Status:** {response.response.get('result', response.response)}")]
+        match = _EMAIL_RE.search(user_text)
+        return [types.Part(function_call=types.FunctionCall(
+            name="send_email",
+            args={
+                "synthesis": SYNTHESIS,
+                "csv_data": EVIDENCE_TABLE,
+                "recipient_email": match.group() if match else DEFAULT_RECIPIENT,
+            },
+        ))]
@@ -1,13 +1,14 @@
 import os
 
 import vertexai
-from dotenv import load_dotenv
 from vertexai import agent_engines
 
+from medical_agent_bot.config import load_config
+
 
 def cleanup_deployment():
     """Clean up any failed deployments."""
-    load_dotenv()
+    load_config()
 
     project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
     location = os.getenv("GOOGLE_CLOUD_LOCATION")
@@ -2,15 +2,14 @@ import os
 import sys
 
 import vertexai
-from dotenv import load_dotenv
 from vertexai.preview import reasoning_engines
 
-from medical_agent_bot import root_agent
+from medical_agent_bot.config import load_config
 
 
 def main():
     # Load environment variables
-    load_dotenv()
+    load_config()
 
     project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
     location = os.getenv("GOOGLE_CLOUD_LOCATION")
@@ -29,7 +28,9 @@ def main():
         location=location,
     )
 
-    # Create the app
+    # Create the app (the agent is built on first access, after the config is loaded)
+    from medical_agent_bot import root_agent
+
     print("Creating local app instance...")
     app = reasoning_engines.AdkApp(
         agent=root_agent,
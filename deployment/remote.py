@@ -3,11 +3,10 @@ import sys
 
 import vertexai
 from absl import app, flags
-from dotenv import load_dotenv
 from vertexai import agent_engines
 from vertexai.preview import reasoning_engines
 
-from medical_agent_bot.agent import root_agent
+from medical_agent_bot.config import load_config
 
 FLAGS = flags.FLAGS
 flags.DEFINE_string("project_id", None, "GCP project ID.")
@@ -43,6 +42,8 @@ flags.mark_bool_flags_as_mutual_exclusive(
 
 def create() -> None:
     """Creates a new deployment."""
+    from medical_agent_bot import root_agent
+
     # First wrap the agent in AdkApp
     app = reasoning_engines.AdkApp(
         agent=root_agent,
@@ -133,7 +134,7 @@ def main(argv=None):
     else:
         argv = flags.FLAGS(argv)
 
-    load_dotenv()
+    load_config()
 
     # Now we can safely access the flags
     project_id = (
@@ -1,4 +1,8 @@
 """Main entry point for the agent module."""
+from medical_agent_bot.config import get_settings
+
+get_settings()
+
 from medical_agent_bot.agent import root_agent as agent
 
 # Make the agent available at the top level
@@ -1,13 +1,15 @@
 """Agent module for scholarly article search and summarization."""
 
-# Import and expose the root agent
-from .agent import root_agent
-
-# Explicitly declare what should be importable
+# root_agent is built on first access, so importing the package (or only its tools)
+# does not pull in google.adk and google.genai until the agent is actually needed.
 __all__ = ['root_agent']
 
-# For compatibility with older versions of Python
-from . import agent  # This ensures the module is loaded
 
-# This is required for ADK to find the root_agent
-agent = root_agent
\ No newline at end of file
+def __getattr__(name):
+    # ADK looks up `root_agent`; `agent` is kept as an alias for older loaders.
+    if name in ("root_agent", "agent"):
+        from .agent import root_agent
+
+        globals().update(root_agent=root_agent, agent=root_agent)
+        return root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
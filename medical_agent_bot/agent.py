@@ -1,18 +1,23 @@
-from google.adk.agents import LlmAgent, SequentialAgent
-from google.genai import types
+from medical_agent_bot.config import get_settings
+
+# Load .env and validate the settings up front, so a bad value fails at startup
+# rather than on the first tool call.
+get_settings()
+
 from medical_agent_bot.sub_agents.query_ingestor_agent import med_query_ingestor
+from medical_agent_bot.sub_agents.literature_fetcher_agent import med_literature_fetcher, med_article_merger
 from medical_agent_bot.sub_agents.evidence_builder_agent import med_evidence_builder
 from medical_agent_bot.sub_agents.email_dispatcher_agent import med_email_dispatcher
+from medical_agent_bot.sub_agents.traced_agents import TracedSequentialAgent
 
 
 
 
 # Create the sequential agent
-medsearchpro_orchestrator = SequentialAgent(
+medsearchpro_orchestrator = TracedSequentialAgent(
     name="article_fetcher_and_summarizer",
-    sub_agents=[med_query_ingestor, med_evidence_builder, med_email_dispatcher],
+    sub_agents=[med_query_ingestor, med_literature_fetcher, med_article_merger, med_evidence_builder, med_email_dispatcher],
     description="Executes a sequence of article fetching, summarization, and email delivery.",
-    
 )
 
 root_agent = medsearchpro_orchestrator
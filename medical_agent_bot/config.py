@@ -0,0 +1,387 @@
+"""Explicit, one-time configuration loading for the agent and its tools."""
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+_loaded = False
+_lock = threading.Lock()
+
+_TRUE = ("1", "true", "yes", "on")
+_FALSE = ("0", "false", "no", "off")
+
+RETRIEVAL_MODES = ("efetch", "esummary")
+TELEMETRY_EXPORTERS = ("memory", "json")
+EUTILS_ENDPOINTS = ("esearch", "esummary", "efetch")
+
+
+def load_config(dotenv_path: str | None = None, override: bool = False) -> bool:
+    """
+    Load settings from a .env file into the environment, once per process.
+
+    Nothing is read from .env at import time: entry points (the agent module,
+    main.py, the deployment scripts) call this, directly or through get_settings(),
+    before building clients. Library users of the tools call it themselves, set the
+    environment directly, or pass their own Settings to configure().
+
+    Args:
+        dotenv_path (str | None): .env file to read; by default the nearest one
+            found from the package directory upwards.
+        override (bool): Whether .env values replace variables already set.
+
+    Returns:
+        bool: True if this call loaded the file, False if config was already loaded
+            or no .env file was found.
+    """
+    global _loaded
+    if _loaded:
+        return False
+    with _lock:
+        if _loaded:
+            return False
+        from dotenv import find_dotenv, load_dotenv
+
+        found = load_dotenv(dotenv_path or find_dotenv(), override=override)
+        _loaded = True
+        return found
+
+
+@dataclass(frozen=True, slots=True)
+class NcbiSettings:
+    """
+    E-utilities client settings.
+
+    Attributes:
+        api_key (str | None): NCBI API key (NCBI_API_KEY).
+        base_url (str | None): E-utilities endpoint override (NCBI_EUTILS_BASE_URL).
+        rate_limit (float | None): Requests per second (NCBI_RATE_LIMIT); None picks
+            NCBI's quota for the key.
+        timeouts (dict): Per-endpoint timeout overrides in seconds (NCBI_TIMEOUTS,
+            e.g. "esearch=45,efetch=20").
+        pool_size (int): Pooled connections to E-utilities (NCBI_POOL_SIZE).
+        max_retries (int): Retries for transient failures (NCBI_MAX_RETRIES).
+        max_backoff (float): Longest wait between retries in seconds, capping Retry-After
+            (NCBI_MAX_BACKOFF).
+        breaker_failures (int): Consecutive failed calls after which an endpoint fails
+            fast (NCBI_BREAKER_FAILURES).
+        breaker_reset (float): Seconds it fails fast before a trial call (NCBI_BREAKER_RESET).
+    """
+
+    api_key: str | None = field(default=None, repr=False)
+    base_url: str | None = None
+    rate_limit: float | None = None
+    timeouts: Dict[str, float] = field(default_factory=dict)
+    pool_size: int = 10
+    max_retries: int = 3
+    max_backoff: float = 30.0
+    breaker_failures: int = 5
+    breaker_reset: float = 30.0
+
+
+@dataclass(frozen=True, slots=True)
+class SearchSettings:
+    """
+    PubMed search behaviour.
+
+    Attributes:
+        retrieval_mode (str): "efetch" or "esummary" (PUBMED_RETRIEVAL_MODE).
+        local_first (bool): Answer from the local index when it has enough matches
+            (PUBMED_LOCAL_FIRST).
+        token_budget (int | None): Token budget for the abstracts of one search
+            (PUBMED_TOKEN_BUDGET); None keeps the compaction default.
+        hedge_efetch (bool): Send a second efetch when the first is slow (PUBMED_EFETCH_HEDGE).
+        efetch_hedge_after (float | None): Seconds before the second efetch is sent
+            (PUBMED_EFETCH_HEDGE_AFTER); None uses the observed 95th percentile.
+    """
+
+    retrieval_mode: str = "efetch"
+    local_first: bool = False
+    token_budget: int | None = None
+    hedge_efetch: bool = True
+    efetch_hedge_after: float | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class CacheSettings:
+    """
+    Locations and sizes of the local caches and indexes; None paths keep each component's default.
+
+    Attributes:
+        pubmed_path (str | None): PubMed cache database (PUBMED_CACHE_PATH).
+        pubmed_memory_entries (int): In-memory LRU entries (PUBMED_CACHE_MEMORY_ENTRIES).
+        pubmed_max_disk_bytes (int): Disk cache size limit (PUBMED_CACHE_MAX_BYTES).
+        pubmed_stale_grace (int): Seconds expired entries are kept as a fallback for when
+            PubMed is unreachable (PUBMED_CACHE_STALE_GRACE).
+        article_index_path (str | None): Local BM25 index (ARTICLE_INDEX_PATH).
+        mesh_index_path (str | None): MeSH index file (MESH_INDEX_PATH).
+        mesh_xml_path (str | None): MeSH descriptor dump it is built from (MESH_XML_PATH).
+    """
+
+    pubmed_path: str | None = None
+    pubmed_memory_entries: int = 2048
+    pubmed_max_disk_bytes: int = 64 * 1024 * 1024
+    pubmed_stale_grace: int = 7 * 24 * 60 * 60
+    article_index_path: str | None = None
+    mesh_index_path: str | None = None
+    mesh_xml_path: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class SmtpSettings:
+    """
+    Outgoing mail settings.
+
+    Attributes:
+        host (str): SMTP server (SMTP_HOST).
+        port (int): SMTP port (SMTP_PORT).
+        user (str | None): Login and sender address (SMTP_USER).
+        password (str | None): Login password (SMTP_PASSWORD).
+        starttls (bool): Upgrade connections with STARTTLS (SMTP_STARTTLS).
+        pool_size (int): Pooled connections (SMTP_POOL_SIZE).
+        timeout (float): Socket timeout in seconds (SMTP_TIMEOUT).
+        queue_size (int): Undelivered messages allowed at once (EMAIL_QUEUE_SIZE).
+        flush_timeout (float): Seconds to keep delivering pending messages at exit
+            (EMAIL_FLUSH_TIMEOUT).
+    """
+
+    host: str = "smtp.gmail.com"
+    port: int = 587
+    user: str | None = None
+    password: str | None = field(default=None, repr=False)
+    starttls: bool = True
+    pool_size: int = 2
+    timeout: float = 30.0
+    queue_size: int = 100
+    flush_timeout: float = 30.0
+
+    @property
+    def has_credentials(self) -> bool:
+        return bool(self.user and self.password)
+
+
+@dataclass(frozen=True, slots=True)
+class ConcurrencySettings:
+    """
+    Concurrency limits.
+
+    Attributes:
+        query_variants (int): Query variants searched in parallel per request, 1 to 3
+            (PUBMED_QUERY_VARIANTS).
+        email_workers (int | None): Email delivery threads (EMAIL_WORKERS); None uses
+            one per pooled SMTP connection.
+    """
+
+    query_variants: int = 3
+    email_workers: int | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class TelemetrySettings:
+    """
+    Tracing settings.
+
+    Attributes:
+        exporters (tuple): Span exporters, "memory" and/or "json" (TELEMETRY_EXPORTERS).
+        json_path (str | None): File the json exporter appends to (TELEMETRY_JSON_PATH).
+    """
+
+    exporters: Tuple[str, ...] = ()
+    json_path: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """
+    Typed runtime configuration for the agent and its tools, validated when built.
+
+    Build it once with get_settings() (from the environment and .env) or pass your
+    own to configure() before the first tool call; clients, caches and the email
+    queue are created from it, so no hot path reads the environment.
+    """
+
+    ncbi: NcbiSettings = field(default_factory=NcbiSettings)
+    search: SearchSettings = field(default_factory=SearchSettings)
+    cache: CacheSettings = field(default_factory=CacheSettings)
+    smtp: SmtpSettings = field(default_factory=SmtpSettings)
+    concurrency: ConcurrencySettings = field(default_factory=ConcurrencySettings)
+    telemetry: TelemetrySettings = field(default_factory=TelemetrySettings)
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] | None = None) -> "Settings":
+        """
+        Build settings from environment variables (see .env.example).
+
+        Args:
+            environ (Mapping | None): Variables to read; defaults to os.environ.
+
+        Raises:
+            ValueError: Listing every variable with an invalid value.
+        """
+        env = _EnvReader(os.environ if environ is None else environ)
+        settings = cls(
+            ncbi=NcbiSettings(
+                api_key=env.text("NCBI_API_KEY"),
+                base_url=env.text("NCBI_EUTILS_BASE_URL"),
+                rate_limit=env.number("NCBI_RATE_LIMIT", None),
+                timeouts=env.timeouts("NCBI_TIMEOUTS"),
+                pool_size=env.integer("NCBI_POOL_SIZE", 10),
+                max_retries=env.integer("NCBI_MAX_RETRIES", 3, minimum=0),
+                max_backoff=env.number("NCBI_MAX_BACKOFF", 30.0),
+                breaker_failures=env.integer("NCBI_BREAKER_FAILURES", 5),
+                breaker_reset=env.number("NCBI_BREAKER_RESET", 30.0),
+            ),
+            search=SearchSettings(
+                retrieval_mode=env.choice("PUBMED_RETRIEVAL_MODE", "efetch", RETRIEVAL_MODES),
+                local_first=env.flag("PUBMED_LOCAL_FIRST", False),
+                token_budget=env.integer("PUBMED_TOKEN_BUDGET", None),
+                hedge_efetch=env.flag("PUBMED_EFETCH_HEDGE", True),
+                efetch_hedge_after=env.number("PUBMED_EFETCH_HEDGE_AFTER", None),
+            ),
+            cache=CacheSettings(
+                pubmed_path=env.path("PUBMED_CACHE_PATH"),
+                pubmed_memory_entries=env.integer("PUBMED_CACHE_MEMORY_ENTRIES", 2048),
+                pubmed_max_disk_bytes=env.integer("PUBMED_CACHE_MAX_BYTES", 64 * 1024 * 1024),
+                pubmed_stale_grace=env.integer("PUBMED_CACHE_STALE_GRACE", 7 * 24 * 60 * 60, minimum=0),
+                article_index_path=env.path("ARTICLE_INDEX_PATH"),
+                mesh_index_path=env.path("MESH_INDEX_PATH"),
+                mesh_xml_path=env.path("MESH_XML_PATH"),
+            ),
+            smtp=SmtpSettings(
+                host=env.text("SMTP_HOST") or "smtp.gmail.com",
+                port=env.integer("SMTP_PORT", 587, maximum=65535),
+                user=env.text("SMTP_USER"),
+                password=env.text("SMTP_PASSWORD"),
+                starttls=env.flag("SMTP_STARTTLS", True),
+                pool_size=env.integer("SMTP_POOL_SIZE", 2),
+                timeout=env.number("SMTP_TIMEOUT", 30.0),
+                queue_size=env.integer("EMAIL_QUEUE_SIZE", 100),
+                flush_timeout=env.number("EMAIL_FLUSH_TIMEOUT", 30.0),
+            ),
+            concurrency=ConcurrencySettings(
+                query_variants=env.integer("PUBMED_QUERY_VARIANTS", 3, maximum=3),
+                email_workers=env.integer("EMAIL_WORKERS", None),
+            ),
+            telemetry=TelemetrySettings(
+                exporters=env.names("TELEMETRY_EXPORTERS", TELEMETRY_EXPORTERS),
+                json_path=env.path("TELEMETRY_JSON_PATH"),
+            ),
+        )
+        if env.errors:
+            raise ValueError("Invalid configuration:\n  " + "\n  ".join(env.errors))
+        return settings
+
+
+class _EnvReader:
+    """Parses environment values, collecting one error per invalid variable."""
+
+    def __init__(self, environ: Mapping[str, str]):
+        self.environ = environ
+        self.errors: List[str] = []
+
+    def text(self, name: str) -> str | None:
+        return self.environ.get(name, "").strip() or None
+
+    def path(self, name: str) -> str | None:
+        value = self.text(name)
+        return os.path.expanduser(value) if value else None
+
+    def _parse(self, name: str, default: Any, parse: Callable[[str], Any], expected: str) -> Any:
+        value = self.text(name)
+        if value is None:
+            return default
+        try:
+            return parse(value)
+        except ValueError:
+            self.errors.append(f"{name}={value!r}: expected {expected}")
+            return default
+
+    def integer(self, name: str, default: int | None, minimum: int = 1, maximum: int | None = None) -> int | None:
+        def parse(value: str) -> int:
+            number = int(value)
+            if number < minimum or (maximum is not None and number > maximum):
+                raise ValueError
+            return number
+
+        bounds = f"between {minimum} and {maximum}" if maximum is not None else f"at least {minimum}"
+        return self._parse(name, default, parse, f"an integer {bounds}")
+
+    def number(self, name: str, default: float | None) -> float | None:
+        def parse(value: str) -> float:
+            number = float(value)
+            if not number > 0 or number == float("inf"):
+                raise ValueError
+            return number
+
+        return self._parse(name, default, parse, "a positive number")
+
+    def flag(self, name: str, default: bool) -> bool:
+        def parse(value: str) -> bool:
+            if value.lower() not in _TRUE + _FALSE:
+                raise ValueError
+            return value.lower() in _TRUE
+
+        return self._parse(name, default, parse, "one of " + "/".join(_TRUE + _FALSE))
+
+    def choice(self, name: str, default: str, choices: Tuple[str, ...]) -> str:
+        def parse(value: str) -> str:
+            if value.lower() not in choices:
+                raise ValueError
+            return value.lower()
+
+        return self._parse(name, default, parse, "one of " + ", ".join(choices))
+
+    def names(self, name: str, choices: Tuple[str, ...]) -> Tuple[str, ...]:
+        def parse(value: str) -> Tuple[str, ...]:
+            names = tuple(dict.fromkeys(part.strip().lower() for part in value.split(",") if part.strip()))
+            if any(item not in choices for item in names):
+                raise ValueError
+            return names
+
+        return self._parse(name, (), parse, "a comma-separated list of " + ", ".join(choices))
+
+    def timeouts(self, name: str) -> Dict[str, float]:
+        def parse(value: str) -> Dict[str, float]:
+            timeouts = {}
+            for part in filter(None, (part.strip() for part in value.split(","))):
+                endpoint, _, seconds = part.partition("=")
+                endpoint = endpoint.strip().lower()
+                if endpoint not in EUTILS_ENDPOINTS or not float(seconds) > 0:
+                    raise ValueError
+                timeouts[endpoint] = float(seconds)
+            return timeouts
+
+        return self._parse(
+            name, {}, parse, "endpoint=seconds pairs for " + ", ".join(EUTILS_ENDPOINTS) + ", e.g. 'efetch=20'"
+        )
+
+
+_settings: Settings | None = None
+_settings_lock = threading.Lock()
+
+
+def get_settings() -> Settings:
+    """
+    Return the process-wide settings, loading .env and validating them on first use.
+
+    Raises:
+        ValueError: If any configured value is invalid.
+    """
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                load_config()
+                _settings = Settings.from_env()
+    return _settings
+
+
+def configure(settings: Settings) -> None:
+    """
+    Use these settings instead of the environment.
+
+    Call this before the first tool call: clients, caches and the email queue read
+    the settings once, when they are created.
+    """
+    global _settings
+    with _settings_lock:
+        _settings = settings
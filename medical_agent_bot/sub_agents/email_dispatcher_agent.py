@@ -1,14 +1,15 @@
 
-from google.adk.agents import LlmAgent
-from ..tools.send_emails_tool import send_email
+from ..tools.send_emails_tool import send_email, get_email_delivery_status
 from ..tools.collect_user_email import collect_email_tool
+from ..tools.telemetry import LLM_CALLBACKS
+from .traced_agents import TracedLlmAgent
 
 
 
 
 
 # Create the email agent
-med_email_dispatcher= LlmAgent(
+med_email_dispatcher= TracedLlmAgent(
     name="email_agent",
     model="gemini-2.0-flash",
     instruction="""
@@ -31,22 +32,27 @@ Step 4: Send Literature Package
 Use the send_email tool with the following arguments:
 
 synthesis: 
-csv: The evidence matrix as a CSV string
+csv_data: The evidence matrix as a CSV string
 from  the {evidence_matrix_package}
-fetched_articles: A list of article dictionaries (from state['fetched_articles'])
-
 recipient_email: The email obtained from the send_email tool
 
+Do not pass the articles: send_email attaches the full records of the latest search itself.
+
 Step 4: Response Handling
-If the email is sent successfully, return:
-**Email sent successfully.**
+If the email is queued successfully, return:
+**Email queued for delivery.** Delivery ID: <the delivery ID returned by send_email>
 
 If there is an error, return:
 The error description.
 
+Step 5: Delivery Status
+If the user asks whether the email was sent, call get_email_delivery_status with the Delivery ID
+and report its status ("sent", "queued", "sending", "retrying" or "failed", with the error if any).
+
 Example Output
-**Status:** Email sent successfully.
+**Status:** Email queued for delivery. Delivery ID: 3f2a9c...
     """,
-    tools=[collect_email_tool, send_email],
+    tools=[collect_email_tool, send_email, get_email_delivery_status],
     output_key="email_status",
+    **LLM_CALLBACKS,
 ) 
\ No newline at end of file
@@ -0,0 +1,217 @@
+import json
+import re
+from typing import Any, AsyncGenerator, Dict, List
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from ..config import get_settings
+from ..tools.compaction import estimate_tokens
+from ..tools.evidence_extractor import build_evidence_matrix
+from ..tools.mesh_index import get_mesh_index
+from ..tools.pubmed_tool import (
+    EVIDENCE_MATRIX_STATE_KEY,
+    finalize_articles,
+    load_pubmed_records,
+    search_pubmed_records,
+)
+from ..tools.relevance import deduplicate
+from ..tools.result_sets import RESULT_SET_STATE_KEY, save_result_set
+from ..tools.telemetry import traced_agent
+from .traced_agents import TracedParallelAgent
+
+QUERY_VARIANTS_STATE_KEY = "query_variants"
+FETCHED_ARTICLES_STATE_KEY = "fetched_articles"
+
+# One fetcher per variant slot; the ingestor is asked for at most 3 queries, and
+# PUBMED_QUERY_VARIANTS can lower that to put fewer concurrent searches on NCBI.
+MAX_QUERY_VARIANTS = get_settings().concurrency.query_variants
+
+# Cap on the article digest kept in state and shown in the conversation: the compacted
+# abstracts (PUBMED_TOKEN_BUDGET, 3000 tokens by default) plus their Markdown framing.
+# Articles past the cap are only counted; send_email reads them from the result set.
+DIGEST_TOKEN_BUDGET = 4000
+
+_JSON_ARRAY_RE = re.compile(r"\[.*\]", re.DOTALL)
+
+_NO_RESULTS_MESSAGE = (
+    "No articles were found for this topic. Try more specific medical/clinical terms, "
+    "related MeSH terms (e.g. 'cancer[mesh] AND treatment[mesh]'), or alternative keywords. "
+    "Only PMC articles provide full text; PubMed-only articles include abstract/metadata."
+)
+
+
+def parse_query_variants(text: Any) -> List[str]:
+    """
+    Extract the list of PubMed query strings from the ingestor's output.
+
+    The ingestor answers with a JSON array of queries; anything else (a greeting, the
+    human-in-the-loop confirmation, an off-topic refusal) yields an empty list.
+    """
+    if isinstance(text, list):
+        candidates = text
+    else:
+        match = _JSON_ARRAY_RE.search(str(text or ""))
+        if not match:
+            return []
+        try:
+            candidates = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return []
+        if not isinstance(candidates, list):
+            return []
+    variants: List[str] = []
+    for candidate in candidates:
+        if isinstance(candidate, str) and candidate.strip() and candidate.strip() not in variants:
+            variants.append(candidate.strip())
+    return variants[:MAX_QUERY_VARIANTS]
+
+
+def _slot_state_key(slot: int) -> str:
+    return f"query_variant_pmids_{slot}"
+
+
+def _render_articles(articles: List[Dict[str, Any]], budget_tokens: int = DIGEST_TOKEN_BUDGET) -> str:
+    """
+    Markdown rendering of the merged articles, in the format the ingestor used to print.
+
+    Articles are rendered in order until the next one would exceed budget_tokens; the
+    rest are summarised in a closing line, so the digest is bounded however many
+    articles were fetched.
+    """
+    blocks = []
+    used = 0
+    for index, article in enumerate(articles, start=1):
+        block = (
+            f"### Article #{index}\n\n"
+            f"**Title:**  \n{article['title']}\n\n"
+            f"**Authors:**  \n{', '.join(article['authors'])}\n\n"
+            f"**Journal:**  \n{article['journal']}\n\n"
+            f"**Publication Date:**  \n{article['published_date']}\n\n"
+            f"**Summary:**  \n{article['summary']}\n\n"
+            f"**Links:**  \n- [PubMed]({article['url']})\n---"
+        )
+        used += estimate_tokens(block)
+        if blocks and used > budget_tokens:
+            break
+        blocks.append(block)
+    if len(blocks) < len(articles):
+        blocks.append(f"_…and {len(articles) - len(blocks)} more articles, included in full in the emailed package._")
+    return "\n\n".join(blocks)
+
+
+@traced_agent
+class QueryVariantFetcher(BaseAgent):
+    """
+    Runs the PubMed search for one of the ingestor's query variants.
+
+    Several of these run side by side under a ParallelAgent, one per variant slot, so
+    the variants are searched concurrently. Each stores only the ranked PMIDs it found
+    in state; the records themselves are already in the PubMed cache, where the merge
+    step picks them up.
+
+    Plain words in the variant are first mapped to MeSH headings and entry-term
+    synonyms with the local MeSH index; terms with a field tag are searched as written.
+    """
+
+    slot: int
+    max_results: int = 10
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        variants = parse_query_variants(ctx.session.state.get(QUERY_VARIANTS_STATE_KEY))
+        if self.slot >= len(variants):
+            return
+        query = variants[self.slot]
+        try:
+            query = get_mesh_index().expand_query(query)
+            records = await search_pubmed_records(query, self.max_results)
+        except Exception as e:
+            print(f"Error searching PubMed for query variant {query!r}: {e}")
+            records = []
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={_slot_state_key(self.slot): [r.pmid for r in records]}),
+        )
+
+
+@traced_agent
+class ArticleMergeAgent(BaseAgent):
+    """
+    Merges the per-variant results into the single article list the evidence builder reads.
+
+    Results are interleaved round-robin across variants, so each variant's best hits
+    come first, then deduplicated by PMID and by near-duplicate text, and capped at
+    max_results. The merged records are saved as a result set in the PubMed cache and
+    only its ID goes into state['result_set_id'], where send_email resolves it; the
+    downstream prompts get a token-bounded Markdown digest in state['fetched_articles']
+    together with the pre-extracted evidence matrix.
+
+    When the ingestor produced no query variants (a greeting, the email confirmation
+    prompt, a non-medical query) its reply is passed through unchanged so that the
+    downstream agents keep handling those cases as before, and the previous result set
+    stays in place for the email turn. The ingestor's own replies are hidden, so the
+    passed-through reply is shown to the user from here.
+    """
+
+    max_results: int = 10
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        raw_output = state.get(QUERY_VARIANTS_STATE_KEY, "")
+        variants = parse_query_variants(raw_output)
+        if not variants:
+            yield self._event(ctx, {FETCHED_ARTICLES_STATE_KEY: raw_output}, raw_output)
+            return
+
+        per_variant = [state.get(_slot_state_key(slot)) or [] for slot in range(len(variants))]
+        pmids: List[str] = []
+        for rank in range(max((len(found) for found in per_variant), default=0)):
+            for found in per_variant:
+                if rank < len(found) and found[rank] not in pmids:
+                    pmids.append(found[rank])
+
+        records, metadata_only = await load_pubmed_records(pmids) if pmids else ({}, set())
+        merged = deduplicate([records[pmid] for pmid in pmids if pmid in records])[:self.max_results]
+        if not merged:
+            yield self._event(
+                ctx,
+                {FETCHED_ARTICLES_STATE_KEY: _NO_RESULTS_MESSAGE, EVIDENCE_MATRIX_STATE_KEY: "", RESULT_SET_STATE_KEY: ""},
+                _NO_RESULTS_MESSAGE,
+            )
+            return
+
+        digest = _render_articles(finalize_articles(merged))
+        yield self._event(
+            ctx,
+            {
+                FETCHED_ARTICLES_STATE_KEY: digest,
+                EVIDENCE_MATRIX_STATE_KEY: build_evidence_matrix(merged),
+                RESULT_SET_STATE_KEY: save_result_set(merged, metadata_only),
+            },
+            digest,
+        )
+
+    def _event(self, ctx: InvocationContext, state_delta: Dict[str, Any], text: str | None = None) -> Event:
+        return Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]) if text else None,
+            actions=EventActions(state_delta=state_delta),
+        )
+
+
+med_literature_fetcher = TracedParallelAgent(
+    name="med_literature_fetcher",
+    sub_agents=[QueryVariantFetcher(name=f"query_variant_fetcher_{slot}", slot=slot) for slot in range(MAX_QUERY_VARIANTS)],
+    description="Searches PubMed for every enhanced query variant concurrently.",
+)
+
+med_article_merger = ArticleMergeAgent(
+    name="med_article_merger",
+    description="Merges and deduplicates the per-variant PubMed results.",
+)
@@ -1,8 +1,35 @@
-from google.adk.agents import LlmAgent
-from ..tools.pubmed_tool import pubmed_to_pmc_full_text_search # Uncomment if you plan to use this tool
-
-med_query_ingestor = LlmAgent(
-    name="med_query_ingestor",
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from ..tools.telemetry import LLM_CALLBACKS, traced_agent
+from .traced_agents import TracedLlmAgent
+
+
+@traced_agent
+class InternalOutputAgent(BaseAgent):
+    """
+    Runs its single sub-agent without showing that agent's text replies to the user.
+
+    The events are passed on with their state changes (such as the sub-agent's
+    output_key), but text parts are removed from their content, so the reply stays
+    internal to the pipeline and out of the conversation history. The query ingestor's
+    JSON array of queries is only for the fetch stage; the article merger shows the
+    user whatever should be seen.
+    """
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        agent = self.sub_agents[0]
+        async for event in agent.run_async(ctx):
+            if event.author == agent.name and event.content and event.content.parts:
+                parts = [part for part in event.content.parts if part.text is None]
+                event.content = event.content.model_copy(update={"parts": parts}) if parts else None
+            yield event
+
+
+_query_variant_writer = TracedLlmAgent(
+    name="med_query_variant_writer",
     model="gemini-2.0-flash", # Or your preferred model
     instruction="""You are a biomedical literature search assistant. Your goal is to understand user queries related to biomedical topics and initiate searches.
 
@@ -37,51 +64,29 @@ Do not continue.
 2. Query Enhancement
 If a valid medical/clinical topic is present:
 Enhance the extracted topic with relevant synonyms, related terms, and MeSH (Medical Subject Headings) terms to optimize PubMed search.
-Use only the enhanced medical topic string as the query parameter for PubMed search.
-Do not output anything else at this stage.
-
-3. Article Retrieval & Output Formatting
-Pass the enhanced topic string to the function:
-pubmed_to_pmc_full_text_search(query, max_results=10)
-This function fetches the latest articles related to the provided topic from PubMed Central, ensuring the most up-to-date biomedical information is retrieved.
-The output will then be formatted for downstream processing and presentation.
-
-
-
-For each article retrieved, output using the following format, and nothing else:
-
-### Article #[index]
-
-**Title:**  
-[article["title"]]
-
-**Authors:**  
-[article["authors"]]
-
-**Journal:**  
-[article["journal"]]
-
-**Publication Date:**  
-[article["published_date"]]
-
-**Summary:**  
-[article["summary"]]
-
-**Links:**  
-- [PubMed]([article["url"]])
----
-
-4. If No Results
-If no articles are found, respond:
-Suggest more specific medical/clinical terms, related MeSH terms, or alternative search keywords.
-Explain that only PMC articles provide full text; PubMed-only articles include abstract/metadata.
-
-5. General Rules
+Write 2 or 3 PubMed query variants that together cover the topic:
+- the main query: the extracted medical topic in plain words (e.g. "metformin type 2 diabetes"); plain words are mapped to MeSH headings and synonyms automatically by a local MeSH lookup;
+- one or two variants built around different MeSH headings, synonyms, or related concepts of the same topic.
+Each variant must be a complete PubMed query string on its own (keywords, phrases, MeSH, Boolean, field tags). Terms you tag yourself (e.g. [mesh], [tiab]) are searched exactly as written.
+
+3. Output
+Output *only* a JSON array of the query strings, for example:
+["type 2 diabetes mellitus[mesh] AND metformin[mesh]", "metformin AND glycemic control[tiab]"]
+Do not add any other text, code fences, or explanation. The queries are searched on PubMed concurrently by the next step,
+which merges, deduplicates, and presents the articles; the array itself is not shown to the user.
+
+4. General Rules
 Never process or respond to non-medical queries or non-medical parts of mixed queries.
 Always extract and enhance only biomedical/clinical concepts.
 Never output explanations, disclaimers, or extra text—only follow the exact steps and formatting above.
 
-"""# Keep tools and output_key commented if they were in the original, or adjust as needed
-   , tools=[pubmed_to_pmc_full_text_search],
-    output_key="fetched_articles"
-)
\ No newline at end of file
+"""
+   , output_key="query_variants",
+    **LLM_CALLBACKS,
+)
+
+med_query_ingestor = InternalOutputAgent(
+    name="med_query_ingestor",
+    sub_agents=[_query_variant_writer],
+    description="Turns the user's message into PubMed query variants in state['query_variants'].",
+)
@@ -0,0 +1,19 @@
+"""ADK's built-in agent classes with every run traced as an agent.<name> span."""
+from google.adk.agents import LlmAgent, ParallelAgent, SequentialAgent
+
+from ..tools.telemetry import traced_agent
+
+
+@traced_agent
+class TracedLlmAgent(LlmAgent):
+    """LlmAgent traced per run; pass LLM_CALLBACKS too for its model and tool spans."""
+
+
+@traced_agent
+class TracedSequentialAgent(SequentialAgent):
+    """SequentialAgent traced per run."""
+
+
+@traced_agent
+class TracedParallelAgent(ParallelAgent):
+    """ParallelAgent traced per run."""
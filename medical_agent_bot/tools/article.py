@@ -0,0 +1,325 @@
+"""The Article record shared by the PubMed, ranking, export and email tools."""
+import datetime
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+PUBMED_URL = "https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
+
+_MONTHS = {
+    name: number
+    for number, names in enumerate(
+        [("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"), ("may",),
+         ("jun", "june"), ("jul", "july"), ("aug", "august"), ("sep", "sept", "september"),
+         ("oct", "october"), ("nov", "november"), ("dec", "december")],
+        start=1,
+    )
+    for name in names
+}
+_SEASONS = {"winter": 1, "spring": 3, "summer": 6, "fall": 9, "autumn": 9}
+_DATE_RE = re.compile(r"(\d{4})(?:[-/ ]+([A-Za-z]+|\d{1,2}))?(?:[-/ ]+(\d{1,2}))?")
+_PMID_URL_RE = re.compile(r"pubmed\.ncbi\.nlm\.nih\.gov/(\d+)/?$")
+_MARKDOWN_LINK_RE = re.compile(r"\[(.*?)\]\((https?://[^\s)]+)\)")
+
+
+def parse_published_date(text: str) -> datetime.date | None:
+    """
+    Parse a PubMed publication date such as "2024 Jan 15", "2023 Nov-Dec", "2022 Spring" or "2021".
+
+    Missing month or day parts default to the first; unparseable dates give None.
+    """
+    match = _DATE_RE.search(text or "")
+    if not match:
+        return None
+    year, month_part, day_part = match.groups()
+    month = 1
+    if month_part:
+        if month_part.isdigit():
+            month = int(month_part)
+        else:
+            month = _MONTHS.get(month_part.lower()) or _SEASONS.get(month_part.lower()) or 1
+    for candidate in ((month, int(day_part) if day_part else 1), (month, 1), (1, 1)):
+        try:
+            return datetime.date(int(year), *candidate)
+        except ValueError:
+            continue
+    return None
+
+
+def _strip(elem: ET.Element | None) -> str:
+    """Flatten nested XML text, return '' if elem is None."""
+    return "".join(elem.itertext()).strip() if elem is not None else ""
+
+
+def _author_name(author: ET.Element) -> str:
+    """Format an <Author> the way esummary does ('Smith J'), or its CollectiveName."""
+    collective = _strip(author.find("CollectiveName"))
+    if collective:
+        return collective
+    return " ".join(part for part in (_strip(author.find("LastName")), _strip(author.find("Initials"))) if part)
+
+
+def _xml_pub_date(journal: ET.Element | None) -> str:
+    """Return the journal issue date as 'YYYY Mon DD' (parts optional) or the raw MedlineDate."""
+    return _xml_date(journal.find("JournalIssue/PubDate") if journal is not None else None)
+
+
+def _xml_date(pub_date: ET.Element | None) -> str:
+    """Return a <PubDate>-style element as 'YYYY Mon DD' (parts optional) or its raw MedlineDate."""
+    if pub_date is None:
+        return ""
+    medline_date = _strip(pub_date.find("MedlineDate"))
+    if medline_date:
+        return medline_date
+    return " ".join(
+        part for part in (_strip(pub_date.find(tag)) for tag in ("Year", "Season", "Month", "Day")) if part
+    )
+
+
+def normalize_links(items: Iterable[Any]) -> List[Tuple[str, str]]:
+    """
+    Return (text, url) pairs for link items, without duplicate URLs.
+
+    Items may be Markdown links "[text](url)", plain http(s) URLs (which use the URL
+    as their text) or (text, url) pairs; anything else is skipped.
+    """
+    seen = set()
+    links = []
+    for item in items:
+        if isinstance(item, (list, tuple)) and len(item) == 2:
+            text, url = item
+        elif not isinstance(item, str):
+            continue
+        elif "](" in item and (match := _MARKDOWN_LINK_RE.search(item)):
+            text, url = match.groups()
+        elif item.startswith("http"):
+            text = url = item
+        else:
+            continue
+        if url not in seen:
+            seen.add(url)
+            links.append((text, url))
+    return links
+
+
+class AbstractSection(NamedTuple):
+    label: str
+    text: str
+
+
+@dataclass(slots=True)
+class Article:
+    """
+    One PubMed article with a fixed schema.
+
+    published_date keeps PubMed's text ("2023 Nov-Dec"), pub_date parses it. links holds
+    (text, url) pairs such as PMC full text; the PubMed page is always available as url.
+    """
+
+    pmid: str
+    title: str = ""
+    authors: List[str] = field(default_factory=list)
+    journal: str = ""
+    published_date: str = ""
+    abstract_sections: List[AbstractSection] = field(default_factory=list)
+    publication_types: List[str] = field(default_factory=list)
+    doi: str = ""
+    links: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def pub_date(self) -> datetime.date | None:
+        """The publication date as a date, None when it cannot be parsed."""
+        return parse_published_date(self.published_date)
+
+    @property
+    def url(self) -> str:
+        """The PubMed page of the article, or its first link when it has no PMID."""
+        if self.pmid:
+            return PUBMED_URL.format(pmid=self.pmid)
+        return self.links[0][1] if self.links else ""
+
+    @property
+    def abstract(self) -> str:
+        """The abstract sections joined into one string, labelled sections prefixed."""
+        return "\n".join(
+            f"{section.label}: {section.text}" if section.label else section.text
+            for section in self.abstract_sections
+        )
+
+    @property
+    def display_links(self) -> List[Tuple[str, str]]:
+        """The (text, url) links to show for the article: its links, then its PubMed URL if not among them."""
+        url = self.url
+        if not url or any(link_url == url for _, link_url in self.links):
+            return self.links
+        return [*self.links, (url, url)]
+
+    @classmethod
+    def from_pubmed_xml(cls, article: ET.Element) -> "Article":
+        """
+        Build an article from one efetch <PubmedArticle> or <PubmedBookArticle> element.
+
+        Every author and abstract section is kept; the journal is its ISO abbreviation
+        when available. NCBI Bookshelf entries (PubmedBookArticle) take the book title
+        as journal.
+        """
+        if article.tag == "PubmedBookArticle":
+            return cls._from_book_document(article)
+        citation = article.find("MedlineCitation")
+        art = citation.find("Article") if citation is not None else None
+        if art is None:
+            return cls(pmid=_strip(article.find(".//PMID")))
+
+        journal = art.find("Journal")
+        doi = ""
+        for elocation in art.findall("ELocationID"):
+            if elocation.get("EIdType") == "doi":
+                doi = _strip(elocation)
+                break
+        if not doi:
+            doi = _strip(article.find("PubmedData/ArticleIdList/ArticleId[@IdType='doi']"))
+
+        sections = []
+        for section in art.findall("Abstract/AbstractText"):
+            text = _strip(section)
+            if text:
+                sections.append(AbstractSection(section.get("Label", ""), text))
+
+        return cls(
+            pmid=_strip(citation.find("PMID")),
+            title=_strip(art.find("ArticleTitle")),
+            authors=[name for name in (_author_name(author) for author in art.findall("AuthorList/Author")) if name],
+            journal=(_strip(journal.find("ISOAbbreviation")) or _strip(journal.find("Title"))) if journal is not None else "",
+            published_date=_xml_pub_date(journal),
+            abstract_sections=sections,
+            publication_types=[_strip(pt) for pt in art.findall("PublicationTypeList/PublicationType")],
+            doi=doi,
+        )
+
+    @classmethod
+    def _from_book_document(cls, article: ET.Element) -> "Article":
+        """Build an article from a <PubmedBookArticle>: a Bookshelf chapter or whole book."""
+        document = article.find("BookDocument")
+        if document is None:
+            return cls(pmid=_strip(article.find(".//PMID")))
+        book = document.find("Book")
+        book_title = _strip(book.find("BookTitle")) if book is not None else ""
+        authors = document.findall("AuthorList/Author")
+        if not authors and book is not None:
+            authors = book.findall("AuthorList/Author")  # a whole book lists its editors
+        sections = []
+        for section in document.findall("Abstract/AbstractText"):
+            text = _strip(section)
+            if text:
+                sections.append(AbstractSection(section.get("Label", ""), text))
+
+        return cls(
+            pmid=_strip(document.find("PMID")),
+            title=_strip(document.find("ArticleTitle")) or book_title,
+            authors=[name for name in (_author_name(author) for author in authors) if name],
+            journal=book_title,
+            published_date=_xml_date(book.find("PubDate") if book is not None else None)
+            or _xml_date(document.find("ContributionDate")),
+            abstract_sections=sections,
+            publication_types=[_strip(pt) for pt in document.findall("PublicationType")],
+            doi=_strip(document.find("ArticleIdList/ArticleId[@IdType='doi']")),
+        )
+
+    @classmethod
+    def from_esummary(cls, summary: Dict[str, Any]) -> "Article":
+        """Build an article (without abstract) from one esummary JSON result entry."""
+        doi = next(
+            (article_id.get("value", "") for article_id in summary.get("articleids", [])
+             if article_id.get("idtype") == "doi"),
+            "",
+        )
+        return cls(
+            pmid=str(summary.get("uid", "")),
+            title=summary.get("title", ""),
+            authors=[author["name"] for author in summary.get("authors", []) if author.get("name")],
+            journal=summary.get("source", ""),
+            published_date=summary.get("pubdate", ""),
+            publication_types=list(summary.get("pubtype", [])),
+            doi=doi,
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Article":
+        """
+        Build an article from a dict produced by to_dict or to_result, or written by hand.
+
+        Authors may be a list or a comma-separated string, a 'summary' stands in for
+        missing abstract sections, and 'url' and 'links' entries (Markdown links or
+        plain URLs) become links, with a PubMed URL supplying the PMID when none is given.
+        """
+        sections = data.get("abstract_sections")
+        if sections is not None:
+            sections = [AbstractSection(section.get("label", ""), section.get("text", "")) for section in sections]
+        else:
+            summary = data.get("summary")
+            sections = [AbstractSection("", str(summary))] if summary else []
+
+        authors = data.get("authors") or []
+        if isinstance(authors, str):
+            authors = authors.split(",")
+        authors = [name for name in (str(author).strip() for author in authors) if name]
+
+        items = data.get("links") or []
+        items = list(items) if isinstance(items, list) else []
+        url = data.get("url")
+        if isinstance(url, str):
+            items.append(url)
+        elif isinstance(url, list):
+            items.extend(url)
+
+        pmid = str(data.get("pmid", "")).strip()
+        if not pmid and isinstance(url, str) and (match := _PMID_URL_RE.search(url)):
+            pmid = match.group(1)
+
+        return cls(
+            pmid=pmid,
+            title=str(data.get("title", "")),
+            authors=authors,
+            journal=str(data.get("journal", "")),
+            published_date=str(data.get("published_date", "")),
+            abstract_sections=sections,
+            publication_types=list(data.get("publication_types", [])),
+            doi=str(data.get("doi", "")),
+            links=normalize_links(items),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The full record as a JSON-compatible dict; from_dict restores it."""
+        return {
+            "pmid": self.pmid,
+            "title": self.title,
+            "authors": list(self.authors),
+            "journal": self.journal,
+            "published_date": self.published_date,
+            "abstract_sections": [{"label": label, "text": text} for label, text in self.abstract_sections],
+            "publication_types": list(self.publication_types),
+            "doi": self.doi,
+            "links": [list(link) for link in self.links],
+        }
+
+    def to_result(self, max_authors: int = 3) -> Dict[str, Any]:
+        """The article in the schema the search tools return to the agents."""
+        return {
+            "title": self.title.rstrip("."),
+            "authors": self.authors[:max_authors],
+            "journal": self.journal,
+            "published_date": self.published_date,
+            "summary": self.abstract or "No abstract available",
+            "url": self.url,
+            "pmid": self.pmid,
+        }
+
+
+def as_articles(items: Iterable[Any]) -> Iterator[Article]:
+    """Yield items as Articles, converting dicts with Article.from_dict and skipping anything else."""
+    for item in items:
+        if isinstance(item, Article):
+            yield item
+        elif isinstance(item, dict):
+            yield Article.from_dict(item)
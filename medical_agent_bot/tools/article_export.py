@@ -0,0 +1,126 @@
+"""Typed article exports: newline-delimited JSON and Apache Arrow / Parquet, written in batches."""
+import importlib
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, List
+
+from .article import Article, as_articles
+
+DEFAULT_BATCH_SIZE = 10_000
+
+# Column order of every typed export.
+EXPORT_FIELDS = ("pmid", "title", "authors", "journal", "published_date", "published_date_text", "summary", "url")
+
+
+def typed_article(article: Article) -> Dict[str, Any]:
+    """Convert an Article to the typed export record (int PMID, list authors, parsed date)."""
+    return {
+        "pmid": int(article.pmid) if article.pmid.isdigit() else None,
+        "title": article.title,
+        "authors": article.authors,
+        "journal": article.journal,
+        "published_date": article.pub_date,
+        "published_date_text": article.published_date,
+        "summary": article.abstract,
+        "url": article.url,
+    }
+
+
+def iter_jsonl_lines(articles: Iterable[Article | Dict[str, Any]]) -> Iterator[str]:
+    """Yield one JSON line per article, with the typed fields (dates as ISO strings)."""
+    for article in as_articles(articles):
+        record = typed_article(article)
+        if record["published_date"] is not None:
+            record["published_date"] = record["published_date"].isoformat()
+        yield json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def save_jsonl_file(articles: Iterable[Article | Dict[str, Any]], filename: str, batch_size: int = DEFAULT_BATCH_SIZE) -> str:
+    """Write articles as newline-delimited JSON, batch_size lines per write; return the path."""
+    with open(filename, "w", encoding="utf-8") as f:
+        batch: List[str] = []
+        for line in iter_jsonl_lines(articles):
+            batch.append(line)
+            if len(batch) >= batch_size:
+                f.write("".join(batch))
+                batch.clear()
+        f.write("".join(batch))
+    return os.path.abspath(filename)
+
+
+def _pyarrow(module: str = "pyarrow"):
+    """Import pyarrow (or one of its submodules), explaining how to install it if missing."""
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise ImportError(
+            "Arrow and Parquet export need pyarrow: pip install 'Medical_Search_Pro_Agent[export]'"
+        ) from e
+
+
+def article_schema():
+    """The Arrow schema of exported articles."""
+    pa = _pyarrow()
+    return pa.schema([
+        pa.field("pmid", pa.int64()),
+        pa.field("title", pa.string()),
+        pa.field("authors", pa.list_(pa.string())),
+        pa.field("journal", pa.string()),
+        pa.field("published_date", pa.date32()),
+        pa.field("published_date_text", pa.string()),
+        pa.field("summary", pa.string()),
+        pa.field("url", pa.string()),
+    ])
+
+
+def iter_record_batches(articles: Iterable[Article | Dict[str, Any]], batch_size: int = DEFAULT_BATCH_SIZE):
+    """Yield pyarrow.RecordBatch objects of up to batch_size typed articles each."""
+    pa = _pyarrow()
+    schema = article_schema()
+    columns: Dict[str, List[Any]] = {field: [] for field in EXPORT_FIELDS}
+    count = 0
+    for article in as_articles(articles):
+        for field, value in typed_article(article).items():
+            columns[field].append(value)
+        count += 1
+        if count >= batch_size:
+            yield pa.RecordBatch.from_pydict(columns, schema=schema)
+            columns = {field: [] for field in EXPORT_FIELDS}
+            count = 0
+    if count:
+        yield pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+def save_parquet_file(
+    articles: Iterable[Article | Dict[str, Any]],
+    filename: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    compression: str = "zstd",
+) -> str:
+    """Write articles to a Parquet file, one row group per batch; return the path."""
+    pq = _pyarrow("pyarrow.parquet")
+
+    with pq.ParquetWriter(filename, article_schema(), compression=compression) as writer:
+        for batch in iter_record_batches(articles, batch_size):
+            writer.write_batch(batch)
+    return os.path.abspath(filename)
+
+
+def save_arrow_file(articles: Iterable[Article | Dict[str, Any]], filename: str, batch_size: int = DEFAULT_BATCH_SIZE) -> str:
+    """
+    Write articles to an Arrow IPC (Feather v2) file; return the path.
+
+    The file is uncompressed so that pyarrow.memory_map readers load it without copying.
+    """
+    pa = _pyarrow()
+    with pa.OSFile(filename, "wb") as sink, pa.ipc.new_file(sink, article_schema()) as writer:
+        for batch in iter_record_batches(articles, batch_size):
+            writer.write_batch(batch)
+    return os.path.abspath(filename)
+
+
+def read_arrow_file(filename: str):
+    """Load an Arrow file written by save_arrow_file as a pyarrow.Table backed by a memory map."""
+    pa = _pyarrow()
+    with pa.memory_map(filename, "r") as source:
+        return pa.ipc.open_file(source).read_all()
@@ -0,0 +1,212 @@
+"""Persistent BM25 inverted index over every article the PubMed tool has fetched."""
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Tuple
+
+from ..config import get_settings
+from .article import Article
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".cache", "medical_search_pro", "article_index.sqlite3")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# English stopwords plus PubMed query syntax (boolean operators and field tags), so
+# enhanced queries such as 'diabetes[mesh] OR "insulin"[tiab]' tokenize cleanly.
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be by for from has have in is it its of on or that the this to was
+    were which with not we our these those than been also but into after before between
+    mesh majr tiab ti ab pt au dp la sh mh
+    """.split()
+)
+
+# Title terms count twice: a match in the title says more than one in the abstract.
+TITLE_WEIGHT = 2
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case alphanumeric tokens of text, without stopwords or 1-character tokens."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in _STOPWORDS]
+
+
+def _record_terms(record: Article) -> Counter:
+    terms = Counter()
+    for _ in range(TITLE_WEIGHT):
+        terms.update(tokenize(record.title))
+    for section in record.abstract_sections:
+        terms.update(tokenize(section.text))
+    return terms
+
+
+class ArticleIndex:
+    """
+    BM25 index over article titles and abstracts, stored in SQLite.
+
+    Records are added as the PubMed tool fetches them, so the index grows into a local
+    corpus of everything seen so far. It can answer a query from that corpus alone
+    (search) or order a freshly fetched result list by relevance (rerank).
+
+    Args:
+        path (str): SQLite file path, or ":memory:" for a process-local index.
+        k1 (float): BM25 term-frequency saturation.
+        b (float): BM25 document-length normalisation.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS docs (pmid TEXT PRIMARY KEY, length INTEGER NOT NULL, record TEXT NOT NULL)"
+        )
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                pmid TEXT NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, pmid)
+            ) WITHOUT ROWID
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS postings_pmid ON postings (pmid)")
+        self._doc_count, self._total_length = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs"
+        ).fetchone()
+
+    def add_records(self, records: Iterable[Article]) -> int:
+        """Index (or re-index) records keyed by their pmid; return how many were added."""
+        added = 0
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for record in records:
+                    pmid = record.pmid
+                    if not pmid:
+                        continue
+                    terms = _record_terms(record)
+                    length = sum(terms.values())
+                    old = self._db.execute("SELECT length FROM docs WHERE pmid = ?", (pmid,)).fetchone()
+                    if old is not None:
+                        self._db.execute("DELETE FROM postings WHERE pmid = ?", (pmid,))
+                        self._doc_count -= 1
+                        self._total_length -= old[0]
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO docs VALUES (?, ?, ?)",
+                        (pmid, length, json.dumps(record.to_dict(), separators=(",", ":"))),
+                    )
+                    self._db.executemany(
+                        "INSERT INTO postings VALUES (?, ?, ?)",
+                        [(term, pmid, tf) for term, tf in terms.items()],
+                    )
+                    self._doc_count += 1
+                    self._total_length += length
+                    added += 1
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return added
+
+    def contains(self, pmids: Iterable[str]) -> set:
+        pmids = list(pmids)
+        if not pmids:
+            return set()
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT pmid FROM docs WHERE pmid IN ({','.join('?' * len(pmids))})", pmids
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def _scores(self, query: str, pmids: List[str] | None = None) -> Dict[str, float]:
+        """BM25 score of every matching document, optionally restricted to pmids."""
+        terms = sorted(set(tokenize(query)))
+        if not terms or not self._doc_count:
+            return {}
+        avg_length = self._total_length / self._doc_count
+        sql = (
+            "SELECT p.term, p.pmid, p.tf, d.length, "
+            "(SELECT COUNT(*) FROM postings WHERE term = p.term) "
+            f"FROM postings p JOIN docs d ON d.pmid = p.pmid WHERE p.term IN ({','.join('?' * len(terms))})"
+        )
+        params: List[Any] = list(terms)
+        if pmids is not None:
+            sql += f" AND p.pmid IN ({','.join('?' * len(pmids))})"
+            params.extend(pmids)
+
+        scores: Dict[str, float] = {}
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        for _, pmid, tf, length, df in rows:
+            idf = math.log((self._doc_count - df + 0.5) / (df + 0.5) + 1)
+            norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+            scores[pmid] = scores.get(pmid, 0.0) + idf * tf * (self.k1 + 1) / norm
+        return scores
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[Article, float]]:
+        """Return the top (record, score) pairs for a query from the local corpus."""
+        ranked = sorted(self._scores(query).items(), key=lambda item: (-item[1], item[0]))[:limit]
+        if not ranked:
+            return []
+        records = self.get_records(pmid for pmid, _ in ranked)
+        return [(records[pmid], score) for pmid, score in ranked if pmid in records]
+
+    def rerank(self, query: str, records: List[Article]) -> List[Article]:
+        """
+        Order records by BM25 relevance to the query, most relevant first.
+
+        Scores use the statistics of the whole local corpus. Records the index has
+        not seen score 0; ties keep their incoming (NCBI date) order.
+        """
+        pmids = [r.pmid for r in records if r.pmid]
+        scores = self._scores(query, pmids) if pmids else {}
+        order = sorted(range(len(records)), key=lambda i: (-scores.get(records[i].pmid, 0.0), i))
+        return [records[i] for i in order]
+
+    def get_records(self, pmids: Iterable[str]) -> Dict[str, Article]:
+        pmids = list(pmids)
+        if not pmids:
+            return {}
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT pmid, record FROM docs WHERE pmid IN ({','.join('?' * len(pmids))})", pmids
+            ).fetchall()
+        return {pmid: Article.from_dict(json.loads(raw)) for pmid, raw in rows}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            terms = self._db.execute("SELECT COUNT(DISTINCT term) FROM postings").fetchone()[0]
+            return {
+                "documents": self._doc_count,
+                "terms": terms,
+                "average_length": self._total_length / self._doc_count if self._doc_count else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_index: ArticleIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_article_index() -> ArticleIndex:
+    """Return the process-wide index, stored at ARTICLE_INDEX_PATH when set."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ArticleIndex(path=get_settings().cache.article_index_path or DEFAULT_INDEX_PATH)
+    return _index
@@ -0,0 +1,131 @@
+"""Circuit breakers that fail fast while a remote endpoint keeps failing."""
+import threading
+import time
+from typing import Any, Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the endpoint's circuit is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} is unavailable (circuit open, next try in {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Failure counter for one endpoint that rejects calls while the endpoint is down.
+
+    The circuit starts closed. After failure_threshold consecutive failed calls it
+    opens, and every call is rejected at once with CircuitOpenError instead of waiting
+    for timeouts and retries. Once reset_timeout seconds have passed it is half-open:
+    a single trial call goes through, and its outcome closes the circuit again or
+    reopens it for another reset_timeout. A trial that never reports back (e.g. a
+    cancelled request) stops blocking others after reset_timeout.
+
+    Callers call before_call() before each request and then exactly one of
+    record_success() or record_failure(). A trial call that ends with neither (it
+    was cancelled, or failed for a reason unrelated to the endpoint) hands its slot
+    back with release().
+
+    Args:
+        name (str): Endpoint name, used in errors and stats.
+        failure_threshold (int): Consecutive failures that open the circuit.
+        reset_timeout (float): Seconds the circuit stays open before a trial call.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_started: float | None = None
+        self._counters = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._trial_started = None
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are being rejected right now (a half-open circuit is not open)."""
+        return self.state == OPEN
+
+    def before_call(self) -> float | None:
+        """
+        Admit a call, or reject it while the circuit is open.
+
+        Returns:
+            float | None: The trial token to pass to release() if the call is the
+                half-open trial, otherwise None.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a trial in flight.
+        """
+        now = time.monotonic()
+        with self._lock:
+            state = self._current_state(now)
+            if state == CLOSED:
+                return None
+            if state == HALF_OPEN and (
+                self._trial_started is None or now - self._trial_started >= self.reset_timeout
+            ):
+                self._trial_started = now
+                return now
+            self._counters["rejected"] += 1
+            retry_in = max(self.reset_timeout - (now - self._opened_at), 0.0)
+        raise CircuitOpenError(self.name, retry_in)
+
+    def release(self, trial: float) -> None:
+        """Free the half-open trial slot taken by the before_call() that returned trial, if it still holds it."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._trial_started == trial:
+                self._trial_started = None
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._counters["successes"] += 1
+            self._failures = 0
+            self._state = CLOSED
+            self._trial_started = None
+
+    def record_failure(self) -> bool:
+        """Count a failed call; return True if it opened the circuit."""
+        now = time.monotonic()
+        with self._lock:
+            self._counters["failures"] += 1
+            self._failures += 1
+            state = self._current_state(now)
+            if state == HALF_OPEN or (state == CLOSED and self._failures >= self.failure_threshold):
+                self._state = OPEN
+                self._opened_at = now
+                self._trial_started = None
+                self._counters["opened"] += 1
+                return True
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the state, consecutive failures and call counters."""
+        with self._lock:
+            return {
+                "state": self._current_state(time.monotonic()),
+                "consecutive_failures": self._failures,
+                **self._counters,
+            }
@@ -0,0 +1,165 @@
+"""Token-budgeted compaction of article abstracts before they are handed to the LLM agents."""
+import threading
+from dataclasses import replace
+from typing import Any, Dict, List, Tuple
+
+from .article import AbstractSection, Article
+
+# Sections most useful for evidence synthesis come first; unlisted labels rank after
+# these, and unlabelled abstracts are treated as a single section.
+SECTION_PRIORITY = (
+    "RESULTS",
+    "FINDINGS",
+    "CONCLUSIONS",
+    "CONCLUSION",
+    "INTERPRETATION",
+    "OBJECTIVE",
+    "OBJECTIVES",
+    "AIMS",
+    "METHODS",
+    "DESIGN",
+    "PARTICIPANTS",
+    "BACKGROUND",
+    "INTRODUCTION",
+)
+
+DEFAULT_TOKEN_BUDGET = 3000
+
+# Rough chars-per-token ratio for English biomedical text with the Gemini tokenizer.
+_CHARS_PER_TOKEN = 4
+
+_ELLIPSIS = " …"
+
+# A cut section shorter than this carries no information and is dropped instead.
+_MIN_FRAGMENT_TOKENS = 16
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate; good enough to budget prompts without a tokenizer call."""
+    return (len(text) + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
+
+
+def _truncate_to_tokens(text: str, tokens: int) -> str:
+    """Cut text at a word boundary so that it fits in roughly `tokens` tokens."""
+    limit = tokens * _CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] if " " in text[:limit] else ""
+
+
+def _section_rank(label: str) -> int:
+    label = label.upper().strip()
+    return SECTION_PRIORITY.index(label) if label in SECTION_PRIORITY else len(SECTION_PRIORITY)
+
+
+def _section_tokens(section: AbstractSection) -> int:
+    return estimate_tokens(f"{section.label}: {section.text}" if section.label else section.text)
+
+
+def _fixed_tokens(record: Article) -> int:
+    """Tokens for the fields that are never trimmed: title, authors, journal, date, PMID/URL."""
+    return estimate_tokens(
+        " ".join([
+            record.title,
+            ", ".join(record.authors[:3]),
+            record.journal,
+            record.published_date,
+            f"PMID {record.pmid} https://pubmed.ncbi.nlm.nih.gov/{record.pmid}/",
+        ])
+    )
+
+
+def _trim_sections(sections: List[AbstractSection], allowance: int) -> List[AbstractSection]:
+    """
+    Keep the highest-priority sections that fit in allowance tokens.
+
+    Sections are taken whole in priority order; the first one that does not fit is cut
+    at a word boundary to the remaining allowance (or dropped if that would leave only a
+    fragment). Kept sections are returned in their original order.
+    """
+    kept: Dict[int, AbstractSection] = {}
+    remaining = allowance
+    for position in sorted(range(len(sections)), key=lambda i: (_section_rank(sections[i].label), i)):
+        if remaining <= 0:
+            break
+        section = sections[position]
+        cost = _section_tokens(section)
+        if cost <= remaining:
+            kept[position] = section
+            remaining -= cost
+            continue
+        # Leave room for the label and the ellipsis marking the cut.
+        room = remaining - estimate_tokens(f"{section.label}: {_ELLIPSIS}")
+        if room >= _MIN_FRAGMENT_TOKENS:
+            kept[position] = section._replace(text=_truncate_to_tokens(section.text, room) + _ELLIPSIS)
+        break
+    return [kept[i] for i in sorted(kept)]
+
+
+def compact_records(
+    records: List[Article],
+    budget_tokens: int = DEFAULT_TOKEN_BUDGET,
+) -> Tuple[List[Article], Dict[str, Any]]:
+    """
+    Trim abstracts so that a whole result set fits in budget_tokens.
+
+    Citation fields, PMID and URL are always kept. The remaining budget is shared
+    between abstracts: short abstracts are kept whole and the tokens they leave
+    unused go to longer ones, which are cut by section priority (Results and
+    Conclusions first, Background last). Input records are not modified.
+
+    Returns:
+        (records, report): the compacted records, in the same order, and a dict with
+        budget_tokens, original_tokens, compacted_tokens, tokens_saved and
+        articles_trimmed.
+    """
+    fixed = [_fixed_tokens(r) for r in records]
+    needs = [sum(_section_tokens(s) for s in r.abstract_sections) for r in records]
+    original_tokens = sum(fixed) + sum(needs)
+
+    remaining = max(0, budget_tokens - sum(fixed))
+    allowances = [0] * len(records)
+    # Smallest abstracts first, so each gets an equal share of what is left or less.
+    order = sorted(range(len(records)), key=lambda i: needs[i])
+    for left, i in zip(range(len(order), 0, -1), order):
+        allowances[i] = min(needs[i], remaining // left)
+        remaining -= allowances[i]
+
+    compacted = []
+    trimmed = 0
+    for record, need, allowance in zip(records, needs, allowances):
+        if allowance >= need:
+            compacted.append(record)
+            continue
+        compacted.append(replace(record, abstract_sections=_trim_sections(record.abstract_sections, allowance)))
+        trimmed += 1
+
+    compacted_tokens = sum(fixed) + sum(
+        sum(_section_tokens(s) for s in r.abstract_sections) for r in compacted
+    )
+    report = {
+        "budget_tokens": budget_tokens,
+        "original_tokens": original_tokens,
+        "compacted_tokens": compacted_tokens,
+        "tokens_saved": original_tokens - compacted_tokens,
+        "articles_trimmed": trimmed,
+    }
+    _record_report(report)
+    return compacted, report
+
+
+_totals = {"calls": 0, "original_tokens": 0, "compacted_tokens": 0, "tokens_saved": 0, "articles_trimmed": 0}
+_totals_lock = threading.Lock()
+
+
+def _record_report(report: Dict[str, Any]) -> None:
+    with _totals_lock:
+        _totals["calls"] += 1
+        for key in ("original_tokens", "compacted_tokens", "tokens_saved", "articles_trimmed"):
+            _totals[key] += report[key]
+
+
+def compaction_stats() -> Dict[str, int]:
+    """Return token savings accumulated over every compact_records call in the process."""
+    with _totals_lock:
+        return dict(_totals)
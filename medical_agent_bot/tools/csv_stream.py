@@ -0,0 +1,178 @@
+"""Streaming CSV generation: rows in, encoded chunks out, for exports and email attachments."""
+import base64
+import csv
+import os
+import re
+from itertools import chain
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Sequence
+
+from .article import Article
+
+if TYPE_CHECKING:
+    from email.mime.base import MIMEBase
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+ARTICLE_CSV_FIELDS = ("title", "authors", "journal", "published_date", "summary", "url")
+
+# CSV columns that are not plain Article attributes.
+_ARTICLE_CSV_VALUES: Dict[str, Callable[[Article], Any]] = {
+    "authors": lambda article: ", ".join(article.authors),
+    "summary": attrgetter("abstract"),
+}
+
+_MARKDOWN_LINK_URL_RE = re.compile(r"\[.*?\]\((.*?)\)")
+_SEPARATOR_CHARS = frozenset("-: ")
+
+# base64 encodes 57 input bytes to one 76-character MIME line, so encoding in
+# multiples of 57 bytes lets chunks be encoded independently.
+_BASE64_LINE_BYTES = 57
+
+
+class _ChunkBuffer:
+    """Minimal file-like target for csv.writer that hands its contents back in pieces."""
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self.size = 0
+
+    def write(self, text: str) -> int:
+        self._parts.append(text)
+        self.size += len(text)
+        return len(text)
+
+    def drain(self) -> str:
+        text = "".join(self._parts)
+        self._parts.clear()
+        self.size = 0
+        return text
+
+
+def iter_csv_chunks(
+    rows: Iterable[Sequence[Any]],
+    quoting: int = csv.QUOTE_ALL,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = "utf-8",
+) -> Iterator[bytes]:
+    """
+    Write rows as CSV and yield the output as encoded chunks of about chunk_size characters.
+
+    Rows are consumed lazily, so memory stays bounded by one chunk no matter how many
+    rows the iterable produces.
+    """
+    buffer = _ChunkBuffer()
+    writer = csv.writer(buffer, quoting=quoting)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.size >= chunk_size:
+            yield buffer.drain().encode(encoding)
+    if buffer.size:
+        yield buffer.drain().encode(encoding)
+
+
+def iter_lines(text: str) -> Iterator[str]:
+    """Yield the stripped lines of text without splitting it into a list first."""
+    start = 0
+    while start <= len(text):
+        end = text.find("\n", start)
+        if end == -1:
+            end = len(text)
+        yield text[start:end].strip()
+        start = end + 1
+
+
+def is_markdown_table(text: str) -> bool:
+    """True if the first non-blank line of text is a Markdown table row."""
+    for line in iter_lines(text):
+        if line:
+            return line.startswith("|") and line.endswith("|")
+    return False
+
+
+def markdown_table_rows(text: str) -> Iterator[List[str]]:
+    """
+    Yield the cells of each row of a Markdown table, header included.
+
+    Separator lines and non-table lines are skipped, and a cell holding a Markdown
+    link is replaced by the link's URL.
+    """
+    for line in iter_lines(text):
+        if not (line.startswith("|") and line.endswith("|")) or len(line) < 2:
+            continue
+        cells = [cell.strip() for cell in line[1:-1].split("|")]
+        if all(set(cell) <= _SEPARATOR_CHARS for cell in cells if cell):
+            continue
+        row = []
+        for cell in cells:
+            match = _MARKDOWN_LINK_URL_RE.search(cell) if "](" in cell else None
+            row.append(match.group(1) if match else cell)
+        yield row
+
+
+def dict_rows(records: Iterable[Dict[str, Any]], fields: Sequence[str] | None = None) -> Iterator[List[Any]]:
+    """
+    Yield a header row, then one row per dict.
+
+    Without fields, a list of dicts uses every key in order of first appearance and
+    any other iterable uses the keys of its first dict.
+    """
+    if fields is None and isinstance(records, list):
+        fields = list(dict.fromkeys(key for record in records for key in record))
+    iterator = iter(records)
+    if fields is None:
+        first = next(iterator, None)
+        if first is None:
+            return
+        fields = list(first)
+        iterator = chain([first], iterator)
+    yield list(fields)
+    for record in iterator:
+        yield [record.get(field, "") for field in fields]
+
+
+def article_rows(articles: Iterable[Article], fields: Sequence[str] = ARTICLE_CSV_FIELDS) -> Iterator[List[Any]]:
+    """Yield a header row and one row per article, with authors joined; nothing for no articles."""
+    getters = [_ARTICLE_CSV_VALUES.get(field) or attrgetter(field) for field in fields]
+    header_written = False
+    for article in articles:
+        if not header_written:
+            yield list(fields)
+            header_written = True
+        yield [getter(article) for getter in getters]
+
+
+def write_csv(path: str, rows: Iterable[Sequence[Any]], **options: Any) -> str:
+    """Stream rows to a CSV file chunk by chunk and return its absolute path."""
+    with open(path, "wb") as f:
+        for chunk in iter_csv_chunks(rows, **options):
+            f.write(chunk)
+    return os.path.abspath(path)
+
+
+def csv_attachment(chunks: Iterable[bytes], filename: str) -> "MIMEBase | None":
+    """
+    Build a base64 text/csv MIME attachment from CSV chunks, or None if there are none.
+
+    Chunks are base64-encoded as they arrive instead of first being joined into one
+    CSV string, so only the encoded payload the message needs is ever held in full.
+    """
+    lines: List[bytes] = []
+    carry = b""
+    for chunk in chunks:
+        data = carry + chunk
+        cut = len(data) - len(data) % _BASE64_LINE_BYTES
+        lines.append(base64.encodebytes(data[:cut]))
+        carry = data[cut:]
+    if carry:
+        lines.append(base64.encodebytes(carry))
+    if not any(lines):
+        return None
+
+    from email.mime.base import MIMEBase
+
+    part = MIMEBase("text", "csv")
+    part.set_payload(b"".join(lines).decode("ascii"))
+    part["Content-Transfer-Encoding"] = "base64"
+    part.add_header("Content-Disposition", "attachment", filename=filename)
+    return part
@@ -0,0 +1,380 @@
+"""Shared, pooled HTTP client for the NCBI E-utilities endpoints."""
+import asyncio
+import threading
+import time
+import weakref
+from typing import TYPE_CHECKING, Any, Dict, Tuple
+
+import httpx
+
+from ..config import get_settings
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .rate_limiter import TokenBucketRateLimiter, get_ncbi_rate_limiter
+from .telemetry import Span, get_tracer
+
+if TYPE_CHECKING:
+    import requests
+
+EUTILS_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+
+# Seconds to wait for each endpoint; esearch can be slow on complex queries.
+DEFAULT_TIMEOUTS: Dict[str, float] = {
+    "esearch": 30,
+    "esummary": 10,
+    "efetch": 10,
+}
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class EUtilsClient:
+    """
+    Thread-safe client that keeps one pooled keep-alive session for all E-utilities calls.
+
+    Connections to eutils.ncbi.nlm.nih.gov are reused across calls and threads, responses
+    are negotiated with gzip, and transient failures (429/5xx, connection resets) are
+    retried with exponential backoff. Every attempt, retries included, first takes a
+    token from the rate limiter so the client never exceeds NCBI's request quota.
+    Each call is traced as one `eutils.<endpoint>` span with its attempt count,
+    status and response size.
+
+    Each endpoint has a circuit breaker: after breaker_failures consecutive calls end
+    in a transport error or a 429/5xx, calls to that endpoint fail at once with
+    CircuitOpenError for breaker_reset seconds, and then a single trial call decides
+    whether it is back. Rejections and openings are counted on the tracer as
+    `eutils.<endpoint>.circuit_rejected` and `eutils.<endpoint>.circuit_opened`.
+
+    The `a`-prefixed coroutine methods mirror the blocking ones on a pooled
+    httpx.AsyncClient, one per running event loop, sharing the same limiter. The
+    blocking methods' requests.Session is only created (and requests imported) on
+    first use, since the agent itself only makes async calls.
+
+    Args:
+        base_url (str): E-utilities base URL (override to point at a local stub).
+        api_key (str | None): NCBI API key, injected into every request when set.
+        timeouts (dict): Per-endpoint timeouts in seconds, merged over DEFAULT_TIMEOUTS.
+        pool_maxsize (int): Maximum number of pooled connections kept open.
+        max_retries (int): Retries per request for transient failures.
+        backoff_factor (float): Base for the exponential backoff between retries.
+        max_backoff (float): Longest wait in seconds between retries, also capping a
+            server's Retry-After.
+        rate_limiter (TokenBucketRateLimiter | None): Limiter gating every attempt;
+            defaults to the process-wide NCBI limiter.
+        breaker_failures (int): Consecutive failed calls that open an endpoint's circuit.
+        breaker_reset (float): Seconds an open circuit rejects calls before a trial call.
+    """
+
+    HEADERS = {
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    }
+
+    def __init__(
+        self,
+        base_url: str = EUTILS_BASE_URL,
+        api_key: str | None = None,
+        timeouts: Dict[str, float] | None = None,
+        pool_maxsize: int = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        rate_limiter: TokenBucketRateLimiter | None = None,
+        breaker_failures: int = 5,
+        breaker_reset: float = 30.0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.rate_limiter = rate_limiter or get_ncbi_rate_limiter()
+        self.pool_maxsize = pool_maxsize
+        self.breaker_failures = breaker_failures
+        self.breaker_reset = breaker_reset
+
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+        self._session: "requests.Session | None" = None
+        self._session_lock = threading.Lock()
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._async_lock = threading.Lock()
+
+    def url_for(self, endpoint: str) -> str:
+        """Return the full URL for an endpoint name such as 'esearch'."""
+        return f"{self.base_url}/{endpoint}.fcgi"
+
+    def timeout_for(self, endpoint: str) -> float:
+        return self.timeouts.get(endpoint, max(self.timeouts.values()))
+
+    def backoff_delay(self, attempt: int, resp: "requests.Response | httpx.Response | None" = None) -> float:
+        """Seconds to wait before retry number `attempt`, honouring Retry-After up to max_backoff."""
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = float(retry_after)
+        else:
+            delay = self.backoff_factor * (2 ** attempt)
+        return min(delay, self.max_backoff)
+
+    def breaker_for(self, endpoint: str) -> CircuitBreaker:
+        """Return the circuit breaker guarding an endpoint."""
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            with self._breakers_lock:
+                breaker = self._breakers.setdefault(
+                    endpoint, CircuitBreaker(endpoint, self.breaker_failures, self.breaker_reset)
+                )
+        return breaker
+
+    def _admit(self, endpoint: str) -> Tuple[CircuitBreaker, float | None]:
+        """
+        Pass the endpoint's circuit breaker, counting the call if it is rejected.
+
+        Returns:
+            tuple: (the breaker, its trial token if this call is the half-open trial).
+        """
+        breaker = self.breaker_for(endpoint)
+        try:
+            trial = breaker.before_call()
+        except CircuitOpenError:
+            get_tracer().increment(f"eutils.{endpoint}.circuit_rejected")
+            raise
+        return breaker, trial
+
+    def _record_outcome(self, endpoint: str, breaker: CircuitBreaker, failed: bool) -> None:
+        if not failed:
+            breaker.record_success()
+        elif breaker.record_failure():
+            get_tracer().increment(f"eutils.{endpoint}.circuit_opened")
+            print(f"E-utilities {endpoint} keeps failing; failing fast for {self.breaker_reset:.0f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the circuit breaker state and counters per endpoint."""
+        with self._breakers_lock:
+            breakers = dict(self._breakers)
+        return {"breakers": {endpoint: breaker.stats() for endpoint, breaker in sorted(breakers.items())}}
+
+    def _with_api_key(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Inject api_key only when present."""
+        return {**params, "api_key": self.api_key} if self.api_key else dict(params)
+
+    def _sync_session(self) -> "requests.Session":
+        """Return the pooled blocking session, creating it on first use."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    # Retries are handled in request() so that each attempt passes the rate limiter.
+                    adapter = HTTPAdapter(
+                        pool_connections=1,
+                        pool_maxsize=self.pool_maxsize,
+                        pool_block=True,
+                    )
+                    session = requests.Session()
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers.update(self.HEADERS)
+                    self._session = session
+        return self._session
+
+    def request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Dict[str, Any],
+        stream: bool = False,
+    ) -> "requests.Response":
+        """
+        Send a request to an E-utilities endpoint and return the checked response.
+
+        GET requests carry params in the query string; POST requests send them as a
+        form body, which keeps long id lists out of the URL.
+
+        Raises:
+            requests.exceptions.RequestException: On connection errors or a non-2xx
+                status once retries are exhausted.
+            CircuitOpenError: If the endpoint's circuit is open.
+        """
+        import requests
+
+        breaker, trial = self._admit(endpoint)
+        try:
+            session = self._sync_session()
+            params = self._with_api_key(params)
+            kwargs: Dict[str, Any] = {"params": params} if method == "GET" else {"data": params}
+            with get_tracer().span(f"eutils.{endpoint}", method=method, stream=stream) as span:
+                for attempt in range(self.max_retries + 1):
+                    last_attempt = attempt == self.max_retries
+                    span.set_attribute("attempts", attempt + 1)
+                    if attempt and breaker.is_open:
+                        # Other calls opened the circuit meanwhile: stop retrying.
+                        raise CircuitOpenError(endpoint, self.breaker_reset)
+                    self.rate_limiter.acquire()
+                    try:
+                        resp = session.request(
+                            method,
+                            self.url_for(endpoint),
+                            timeout=self.timeout_for(endpoint),
+                            stream=stream,
+                            **kwargs,
+                        )
+                    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                        if last_attempt:
+                            self._record_outcome(endpoint, breaker, failed=True)
+                            raise
+                        time.sleep(self.backoff_delay(attempt))
+                        continue
+
+                    if resp.status_code in RETRY_STATUS_CODES and not last_attempt:
+                        resp.close()
+                        time.sleep(self.backoff_delay(attempt, resp))
+                        continue
+                    if not resp.ok:
+                        # Keep the error body for the exception, but release the connection.
+                        resp.content
+                        resp.close()
+                    _record_response(span, resp, stream)
+                    self._record_outcome(endpoint, breaker, failed=resp.status_code in RETRY_STATUS_CODES)
+                    resp.raise_for_status()
+                    return resp
+        finally:
+            if trial is not None:
+                # Cancelled, or failed before an outcome was recorded: let the next call try.
+                breaker.release(trial)
+
+    def get(self, endpoint: str, params: Dict[str, Any], stream: bool = False) -> "requests.Response":
+        return self.request("GET", endpoint, params, stream=stream)
+
+    def post(self, endpoint: str, params: Dict[str, Any], stream: bool = False) -> "requests.Response":
+        return self.request("POST", endpoint, params, stream=stream)
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+
+    def _async_client(self) -> httpx.AsyncClient:
+        """Return the pooled async client bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            client = self._async_clients.get(loop)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    headers=self.HEADERS,
+                    limits=httpx.Limits(
+                        max_connections=self.pool_maxsize,
+                        max_keepalive_connections=self.pool_maxsize,
+                    ),
+                )
+                self._async_clients[loop] = client
+        return client
+
+    async def arequest(
+        self,
+        method: str,
+        endpoint: str,
+        params: Dict[str, Any],
+        stream: bool = False,
+    ) -> httpx.Response:
+        """
+        Coroutine version of request() on the shared async client.
+
+        With stream=True the body is left unread; iterate it with `aiter_bytes()` and
+        release the connection with `aclose()`.
+
+        Raises:
+            httpx.HTTPError: On transport errors or a non-2xx status once retries
+                are exhausted.
+            CircuitOpenError: If the endpoint's circuit is open.
+        """
+        breaker, trial = self._admit(endpoint)
+        try:
+            client = self._async_client()
+            params = self._with_api_key(params)
+            kwargs: Dict[str, Any] = {"params": params} if method == "GET" else {"data": params}
+            with get_tracer().span(f"eutils.{endpoint}", method=method, stream=stream) as span:
+                for attempt in range(self.max_retries + 1):
+                    last_attempt = attempt == self.max_retries
+                    span.set_attribute("attempts", attempt + 1)
+                    if attempt and breaker.is_open:
+                        raise CircuitOpenError(endpoint, self.breaker_reset)
+                    await self.rate_limiter.acquire_async()
+                    request = client.build_request(
+                        method,
+                        self.url_for(endpoint),
+                        timeout=self.timeout_for(endpoint),
+                        **kwargs,
+                    )
+                    try:
+                        resp = await client.send(request, stream=stream)
+                    except httpx.TransportError:
+                        if last_attempt:
+                            self._record_outcome(endpoint, breaker, failed=True)
+                            raise
+                        await asyncio.sleep(self.backoff_delay(attempt))
+                        continue
+
+                    if resp.status_code in RETRY_STATUS_CODES and not last_attempt:
+                        await resp.aclose()
+                        await asyncio.sleep(self.backoff_delay(attempt, resp))
+                        continue
+                    if resp.is_error:
+                        await resp.aread()
+                        await resp.aclose()
+                    _record_response(span, resp, stream)
+                    self._record_outcome(endpoint, breaker, failed=resp.status_code in RETRY_STATUS_CODES)
+                    resp.raise_for_status()
+                    return resp
+        finally:
+            if trial is not None:
+                # Cancelled, or failed before an outcome was recorded: let the next call try.
+                breaker.release(trial)
+
+    async def aget(self, endpoint: str, params: Dict[str, Any], stream: bool = False) -> httpx.Response:
+        return await self.arequest("GET", endpoint, params, stream=stream)
+
+    async def apost(self, endpoint: str, params: Dict[str, Any], stream: bool = False) -> httpx.Response:
+        return await self.arequest("POST", endpoint, params, stream=stream)
+
+    async def aclose(self) -> None:
+        """Close the async client bound to the running event loop, if any."""
+        with self._async_lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+def _record_response(span: Span, resp: "requests.Response | httpx.Response", stream: bool) -> None:
+    """Record status and body size on a request span; streamed bodies report Content-Length if sent."""
+    span.set_attribute("status_code", resp.status_code)
+    if not stream:
+        span.set_attribute("bytes", len(resp.content))
+    elif resp.headers.get("Content-Length", "").isdigit():
+        span.set_attribute("bytes", int(resp.headers["Content-Length"]))
+
+
+_client: EUtilsClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_eutils_client() -> EUtilsClient:
+    """Return the process-wide E-utilities client, created from the NCBI settings on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                ncbi = get_settings().ncbi
+                _client = EUtilsClient(
+                    base_url=ncbi.base_url or EUTILS_BASE_URL,
+                    api_key=ncbi.api_key,
+                    timeouts=ncbi.timeouts,
+                    pool_maxsize=ncbi.pool_size,
+                    max_retries=ncbi.max_retries,
+                    max_backoff=ncbi.max_backoff,
+                    breaker_failures=ncbi.breaker_failures,
+                    breaker_reset=ncbi.breaker_reset,
+                )
+    return _client
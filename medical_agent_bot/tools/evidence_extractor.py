@@ -0,0 +1,202 @@
+"""Rule-based pre-extraction of evidence-matrix columns from parsed PubMed records."""
+import re
+from typing import Dict, Iterable, List
+
+from .article import Article
+
+NOT_REPORTED = "NR"
+
+MATRIX_COLUMNS = (
+    "Study Type",
+    "Population",
+    "Treatment / Intervention",
+    "Control / Comparator",
+    "Key Outcome(s)",
+    "PubMed Link",
+)
+
+# PubMed PublicationType values mapped to matrix labels, strongest design first.
+_PUBLICATION_TYPES = (
+    ("Meta-Analysis", "Meta-analysis"),
+    ("Systematic Review", "Systematic review"),
+    ("Randomized Controlled Trial", "RCT"),
+    ("Pragmatic Clinical Trial", "Pragmatic trial"),
+    ("Controlled Clinical Trial", "Controlled clinical trial"),
+    ("Clinical Trial, Phase IV", "Phase IV trial"),
+    ("Clinical Trial, Phase III", "Phase III trial"),
+    ("Clinical Trial, Phase II", "Phase II trial"),
+    ("Clinical Trial, Phase I", "Phase I trial"),
+    ("Clinical Trial", "Clinical trial"),
+    ("Observational Study", "Observational study"),
+    ("Multicenter Study", "Multicenter study"),
+    ("Comparative Study", "Comparative study"),
+    ("Case Reports", "Case report"),
+    ("Practice Guideline", "Guideline"),
+    ("Guideline", "Guideline"),
+    ("Review", "Review"),
+)
+
+# Fallback when PublicationType is only "Journal Article": design words in title/abstract.
+_DESIGN_PATTERNS = (
+    (re.compile(r"\bmeta-?analys[ie]s\b", re.I), "Meta-analysis"),
+    (re.compile(r"\bsystematic review\b", re.I), "Systematic review"),
+    (re.compile(r"\brandomi[sz]ed\b.*?\b(?:trial|study)\b", re.I), "RCT"),
+    (re.compile(r"\bprospective cohort\b", re.I), "Prospective cohort"),
+    (re.compile(r"\bretrospective cohort\b", re.I), "Retrospective cohort"),
+    (re.compile(r"\bcohort study\b", re.I), "Cohort study"),
+    (re.compile(r"\bcase[- ]control\b", re.I), "Case-control study"),
+    (re.compile(r"\bcross-sectional\b", re.I), "Cross-sectional study"),
+    (re.compile(r"\bcase (?:report|series)\b", re.I), "Case report/series"),
+)
+
+_SAMPLE_SIZE_RE = re.compile(
+    r"\b(?:n\s*=\s*)?(\d{1,3}(?:,\d{3})+|\d+)\s+"
+    r"((?:\w+[- ]){0,3}?(?:patients|participants|subjects|adults|children|adolescents|infants|"
+    r"neonates|women|men|individuals|volunteers|cases|persons|people|residents|respondents))\b",
+    re.I,
+)
+_N_EQUALS_RE = re.compile(r"\bn\s*=\s*(\d{1,3}(?:,\d{3})+|\d+)", re.I)
+
+_RANDOMIZED_ARMS_RE = re.compile(
+    r"\brandomi[sz]ed\s+(?:\([^)]*\)\s+)?(?:\w+\s+){0,3}?to\s+(?:receive\s+)?(.+?)\s+"
+    r"(?:or|versus|vs\.?|and)\s+(.+?)(?:[.;,(]|\bfor\b|$)",
+    re.I,
+)
+_COMPARATOR_RE = re.compile(
+    r"\b(?:versus|vs\.?|compared (?:with|to)|relative to)\s+([\w/-]+(?:\s+[\w/-]+){0,5}?)"
+    r"(?=\s+(?:had|has|have|was|were|is|are|showed|in|for|among|at|on|during|after|with)\b|[.;,()]|$)",
+    re.I,
+)
+_PLACEBO_RE = re.compile(r"\b(?:matching\s+)?placebo\b", re.I)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9])")
+
+_POPULATION_LABELS = ("PARTICIPANTS", "PATIENTS", "POPULATION", "SETTING AND PARTICIPANTS", "SUBJECTS")
+_INTERVENTION_LABELS = ("INTERVENTION", "INTERVENTIONS", "EXPOSURE", "EXPOSURES")
+_COMPARATOR_LABELS = ("COMPARATOR", "COMPARISON", "CONTROL", "CONTROLS")
+_OUTCOME_LABELS = ("MAIN OUTCOMES AND MEASURES", "MAIN OUTCOME MEASURES", "MAIN OUTCOME MEASURE",
+                   "OUTCOMES", "OUTCOME MEASURES", "PRIMARY OUTCOME")
+_RESULT_LABELS = ("RESULTS", "FINDINGS", "CONCLUSIONS", "CONCLUSION", "INTERPRETATION")
+
+_MAX_CELL_WORDS = 25
+
+
+def _cell(text: str) -> str:
+    """Make text safe for a Markdown table cell and keep it short."""
+    text = " ".join(text.replace("|", "/").split()).strip(" .;,")
+    words = text.split()
+    if len(words) > _MAX_CELL_WORDS:
+        text = " ".join(words[:_MAX_CELL_WORDS]) + " …"
+    return text or NOT_REPORTED
+
+
+def _first_sentence(text: str) -> str:
+    return _SENTENCE_RE.split(text.strip(), maxsplit=1)[0]
+
+
+def _sections_by_label(record: Article) -> Dict[str, str]:
+    return {
+        section.label.upper().strip(): section.text
+        for section in record.abstract_sections
+        if section.label
+    }
+
+
+def _labelled(sections: Dict[str, str], labels: Iterable[str]) -> str:
+    for label in labels:
+        if sections.get(label):
+            return sections[label]
+    return ""
+
+
+def _abstract(record: Article) -> str:
+    return " ".join(section.text for section in record.abstract_sections)
+
+
+def study_type(record: Article) -> str:
+    types = set(record.publication_types)
+    for publication_type, label in _PUBLICATION_TYPES:
+        if publication_type in types:
+            return label
+    text = f"{record.title} {_abstract(record)}"
+    for pattern, label in _DESIGN_PATTERNS:
+        if pattern.search(text):
+            return label
+    return NOT_REPORTED
+
+
+def population(record: Article, sections: Dict[str, str]) -> str:
+    labelled = _labelled(sections, _POPULATION_LABELS)
+    if labelled:
+        return _cell(_first_sentence(labelled))
+    abstract = _abstract(record)
+    match = _SAMPLE_SIZE_RE.search(abstract)
+    if match:
+        return _cell(f"n={match.group(1)} {match.group(2)}")
+    match = _N_EQUALS_RE.search(abstract)
+    if match:
+        return _cell(f"n={match.group(1)}")
+    return NOT_REPORTED
+
+
+def intervention_and_comparator(record: Article, sections: Dict[str, str]) -> tuple:
+    intervention = _labelled(sections, _INTERVENTION_LABELS)
+    comparator = _labelled(sections, _COMPARATOR_LABELS)
+    text = f"{record.title}. {_abstract(record)}"
+
+    arms = _RANDOMIZED_ARMS_RE.search(text)
+    if arms:
+        intervention = intervention or arms.group(1)
+        comparator = comparator or arms.group(2)
+    if not comparator:
+        match = _COMPARATOR_RE.search(text)
+        if match:
+            comparator = match.group(1)
+        elif _PLACEBO_RE.search(text):
+            comparator = "Placebo"
+    return (
+        _cell(_first_sentence(intervention)) if intervention else NOT_REPORTED,
+        _cell(comparator) if comparator else NOT_REPORTED,
+    )
+
+
+def key_outcomes(record: Article, sections: Dict[str, str]) -> str:
+    text = _labelled(sections, _OUTCOME_LABELS) or _labelled(sections, _RESULT_LABELS)
+    if text:
+        return _cell(_first_sentence(text))
+    # Unstructured abstracts usually end with their main finding.
+    sentences = _SENTENCE_RE.split(_abstract(record).strip())
+    return _cell(sentences[-1]) if sentences[-1] else NOT_REPORTED
+
+
+def extract_evidence_row(record: Article) -> Dict[str, str]:
+    """
+    Fill the evidence-matrix columns for one parsed record using deterministic rules.
+
+    Study type comes from PubMed PublicationType (falling back to design words in the
+    text), population from labelled sections or sample-size patterns, intervention and
+    comparator from labelled sections or "randomized to X or Y" / "versus" phrasing,
+    and outcomes from the outcome or results sections (or the closing sentence of an
+    unstructured abstract). Anything not found is "NR".
+    """
+    sections = _sections_by_label(record)
+    intervention, comparator = intervention_and_comparator(record, sections)
+    return {
+        "Study Type": study_type(record),
+        "Population": population(record, sections),
+        "Treatment / Intervention": intervention,
+        "Control / Comparator": comparator,
+        "Key Outcome(s)": key_outcomes(record, sections),
+        "PubMed Link": f"[PubMed]({record.url})",
+    }
+
+
+def build_evidence_matrix(records: List[Article]) -> str:
+    """Return the pre-filled evidence matrix for records as a Markdown table string."""
+    lines = [
+        "| " + " | ".join(MATRIX_COLUMNS) + " |",
+        "|" + "|".join("---" for _ in MATRIX_COLUMNS) + "|",
+    ]
+    for record in records:
+        row = extract_evidence_row(record)
+        lines.append("| " + " | ".join(row[column] for column in MATRIX_COLUMNS) + " |")
+    return "\n".join(lines)
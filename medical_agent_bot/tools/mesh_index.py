@@ -0,0 +1,382 @@
+"""Memory-mapped MeSH descriptor / entry-term index for deterministic PubMed query expansion."""
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import threading
+import xml.etree.ElementTree as ET
+from array import array
+from typing import Any, Dict, Iterator, List, Tuple
+
+from ..config import get_settings
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".cache", "medical_search_pro", "mesh_index.bin")
+
+# Small excerpt of the MeSH descriptor dump, used when no full dump is configured.
+SAMPLE_MESH_XML = os.path.join(os.path.dirname(__file__), "data", "mesh_sample.xml")
+
+# magic, term count, descriptor count, longest term in words, term blob bytes,
+# source dump mtime (ns), source dump path bytes; the path follows, padded to 4 bytes
+_HEADER = struct.Struct("<8sIIIIqI")
+_MAGIC = b"MESHIDX2"
+_FIELD_SEP = "\x1f"
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Query pieces: parentheses, quoted phrases (with or without a tag), tagged words,
+# boolean operators and bare words. A tag applies to the whole phrase before it, so
+# _expand joins the bare words preceding a tagged word into one field-tagged phrase.
+_QUERY_TOKEN_RE = re.compile(
+    r'[()]|"[^"]*"(?:\[[^\]]*\])?|[^\s()"\[]+\[[^\]]*\]|\b(?:AND|OR|NOT)\b|[^\s()"]+'
+)
+
+DEFAULT_MAX_SYNONYMS = 3
+
+
+def normalize_term(text: str) -> str:
+    """Lower-case alphanumeric words joined by single spaces; the index's lookup key."""
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def iter_mesh_descriptors(path: str) -> Iterator[Tuple[str, str, List[str]]]:
+    """
+    Yield (descriptor UI, preferred name, entry terms) from a MeSH descriptor XML dump.
+
+    Entry terms are the term strings of every concept of the descriptor, in file
+    order, without the preferred name. The dump is parsed incrementally and each
+    record is cleared once read, so the full ~300 MB descYYYY.xml streams in flat memory.
+    """
+    context = ET.iterparse(path, events=("start", "end"))
+    _, root = next(context)
+    for event, elem in context:
+        if event != "end" or elem.tag != "DescriptorRecord":
+            continue
+        ui = (elem.findtext("DescriptorUI") or "").strip()
+        name = (elem.findtext("DescriptorName/String") or "").strip()
+        entry_terms: List[str] = []
+        for term in elem.iterfind("ConceptList/Concept/TermList/Term/String"):
+            text = (term.text or "").strip()
+            if text and text != name and text not in entry_terms:
+                entry_terms.append(text)
+        if ui and name:
+            yield ui, name, entry_terms
+        elem.clear()
+        root.clear()
+
+
+def _source_stamp(xml_path: str) -> Tuple[str, int]:
+    """(absolute path, mtime in ns) of a MeSH dump, recorded in the index built from it."""
+    path = os.path.abspath(xml_path)
+    return path, os.stat(path).st_mtime_ns
+
+
+def build_mesh_index(xml_path: str, index_path: str) -> Dict[str, int]:
+    """
+    Build the binary MeSH index at index_path from a MeSH descriptor XML dump.
+
+    The file holds a sorted table of normalized terms (preferred names and entry
+    terms), each pointing at its descriptor, followed by the descriptor table. Offsets
+    are native-endian uint32 arrays, so the file is meant to be built on the machine
+    that reads it. The header records the dump's path and mtime, so a stale index
+    can be detected. The file is written to a unique temporary file and renamed into
+    place, so concurrent builds never see each other's partial output.
+
+    Returns:
+        dict: term and descriptor counts of the new index.
+    """
+    source_path, source_mtime_ns = _source_stamp(xml_path)
+    descriptors: List[str] = []
+    terms: Dict[str, Tuple[int, int]] = {}
+    for ui, name, entry_terms in iter_mesh_descriptors(xml_path):
+        index = len(descriptors)
+        descriptors.append(_FIELD_SEP.join([ui, name, *entry_terms]))
+        for rank, term in enumerate([name, *entry_terms]):
+            key = normalize_term(term)
+            # A string shared by several descriptors maps to the one it is the name of.
+            if key and (key not in terms or (rank == 0 and terms[key][1] > 0)):
+                terms[key] = (index, rank)
+
+    sorted_terms = sorted(terms)
+    term_blob = bytearray()
+    term_offsets = array("I", [0])
+    for term in sorted_terms:
+        term_blob += term.encode("utf-8")
+        term_offsets.append(len(term_blob))
+    term_descriptors = array("I", (terms[term][0] for term in sorted_terms))
+
+    desc_blob = bytearray()
+    desc_offsets = array("I", [0])
+    for descriptor in descriptors:
+        desc_blob += descriptor.encode("utf-8")
+        desc_offsets.append(len(desc_blob))
+
+    max_words = max((term.count(" ") + 1 for term in sorted_terms), default=0)
+    source = source_path.encode("utf-8")
+    index_dir = os.path.dirname(os.path.abspath(index_path))
+    os.makedirs(index_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=index_dir, prefix=os.path.basename(index_path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(
+                _MAGIC, len(sorted_terms), len(descriptors), max_words, len(term_blob),
+                source_mtime_ns, len(source),
+            ))
+            f.write(source.ljust(-(-len(source) // 4) * 4, b"\0"))
+            for table in (term_offsets, term_descriptors, desc_offsets):
+                f.write(table.tobytes())
+            f.write(term_blob)
+            f.write(desc_blob)
+        os.replace(tmp_path, index_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return {"terms": len(sorted_terms), "descriptors": len(descriptors)}
+
+
+class MeshIndex:
+    """
+    Read-only MeSH lookup table, memory-mapped from a file written by build_mesh_index.
+
+    Lookups binary-search the sorted term table directly in the mapping, so opening
+    the full MeSH vocabulary costs no parsing and pages are loaded on demand.
+
+    Args:
+        path (str): Index file built by build_mesh_index.
+        max_synonyms (int): Entry terms OR-ed into each expanded clause.
+    """
+
+    def __init__(self, path: str, max_synonyms: int = DEFAULT_MAX_SYNONYMS):
+        self.path = path
+        self.max_synonyms = max_synonyms
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < _HEADER.size or self._mm[:len(_MAGIC)] != _MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a MeSH index file (or was built by an older version)")
+        (_, self._n_terms, self._n_descriptors, self._max_words, term_blob_len,
+         self.source_mtime_ns, source_len) = _HEADER.unpack_from(self._mm)
+        self.source_path = self._mm[_HEADER.size:_HEADER.size + source_len].decode("utf-8")
+
+        view = memoryview(self._mm)
+        pos = _HEADER.size + -(-source_len // 4) * 4
+        tables = []
+        for length in (self._n_terms + 1, self._n_terms, self._n_descriptors + 1):
+            tables.append(view[pos:pos + 4 * length].cast("I"))
+            pos += 4 * length
+        self._term_offsets, self._term_descriptors, self._desc_offsets = tables
+        self._term_blob = pos
+        self._desc_blob = pos + term_blob_len
+
+    def _term_at(self, i: int) -> bytes:
+        return self._mm[self._term_blob + self._term_offsets[i]:self._term_blob + self._term_offsets[i + 1]]
+
+    def _find(self, key: bytes) -> int:
+        """Index of the first term >= key in the sorted table."""
+        lo, hi = 0, self._n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _descriptor(self, i: int) -> Dict[str, Any]:
+        raw = self._mm[self._desc_blob + self._desc_offsets[i]:self._desc_blob + self._desc_offsets[i + 1]]
+        ui, name, *entry_terms = raw.decode("utf-8").split(_FIELD_SEP)
+        return {"ui": ui, "name": name, "entry_terms": entry_terms}
+
+    def lookup(self, term: str) -> Dict[str, Any] | None:
+        """Return the descriptor (ui, name, entry_terms) a name or entry term belongs to."""
+        key = normalize_term(term).encode("utf-8")
+        i = self._find(key)
+        if i < self._n_terms and self._term_at(i) == key:
+            return self._descriptor(self._term_descriptors[i])
+        return None
+
+    def match(self, words: List[str]) -> List[Tuple[int, int, Dict[str, Any] | None]]:
+        """
+        Segment normalized words into the longest MeSH terms they contain.
+
+        Returns:
+            list of (start, end, descriptor) spans covering the words in order;
+            descriptor is None for words that are not part of any term.
+        """
+        spans: List[Tuple[int, int, Dict[str, Any] | None]] = []
+        start = 0
+        while start < len(words):
+            best_end, best = start + 1, None
+            end = start + 1
+            while end <= min(len(words), start + self._max_words):
+                key = " ".join(words[start:end]).encode("utf-8")
+                i = self._find(key)
+                term = self._term_at(i) if i < self._n_terms else b""
+                if term == key:
+                    best_end, best = end, self._term_descriptors[i]
+                # The first term >= key starts with "key " only if some longer term does.
+                elif not term.startswith(key + b" "):
+                    break
+                end += 1
+            spans.append((start, best_end, self._descriptor(best) if best is not None else None))
+            start = best_end
+        return spans
+
+    def _clause(self, descriptor: Dict[str, Any]) -> str:
+        # Permuted and inverted forms ("Neoplasms, Lung") only make sense as headings.
+        synonyms = [t for t in descriptor["entry_terms"] if "," not in t][:self.max_synonyms]
+        parts = [f'"{descriptor["name"]}"[mesh]'] + [f'"{term}"[tiab]' for term in synonyms]
+        return f"({' OR '.join(parts)})" if len(parts) > 1 else parts[0]
+
+    def _expand(self, query: str) -> Tuple[str, List[str]]:
+        pieces: List[str] = []
+        headings: List[str] = []
+        run: List[str] = []
+
+        def flush() -> None:
+            words: List[str] = []
+            owners: List[int] = []
+            for position, token in enumerate(run):
+                for word in normalize_term(token).split():
+                    words.append(word)
+                    owners.append(position)
+
+            def plain_text(start: int, end: int) -> str:
+                # Unmatched words are written back as the user typed them when they
+                # cover whole tokens, e.g. "T2DM" rather than "t2dm".
+                first, last = owners[start], owners[end - 1]
+                if (start == 0 or owners[start - 1] != first) and (end == len(words) or owners[end] != last):
+                    return " ".join(run[first:last + 1])
+                return " ".join(words[start:end])
+
+            # Consecutive unmatched words stay one phrase; the pieces are AND-ed explicitly.
+            expanded: List[str] = []
+            plain_start = None
+            for start, end, descriptor in self.match(words) + [(len(words), len(words), {})]:
+                if descriptor is None:
+                    plain_start = start if plain_start is None else plain_start
+                    continue
+                if plain_start is not None:
+                    expanded.append(plain_text(plain_start, start))
+                    plain_start = None
+                if descriptor:
+                    expanded.append(self._clause(descriptor))
+                    if descriptor["name"] not in headings:
+                        headings.append(descriptor["name"])
+            if expanded:
+                pieces.append(" AND ".join(expanded))
+            run.clear()
+
+        for token in _QUERY_TOKEN_RE.findall(query):
+            if "[" in token and not token.startswith('"'):
+                # "type 2 diabetes mellitus[mesh]" is one tagged phrase, kept as written.
+                pieces.append(" ".join(run + [token]))
+                run.clear()
+            elif token in ("(", ")", "AND", "OR", "NOT") or token.startswith('"'):
+                flush()
+                pieces.append(token)
+            else:
+                run.append(token)
+        flush()
+        return " ".join(pieces).replace("( ", "(").replace(" )", ")"), headings
+
+    def expand_query(self, query: str) -> str:
+        """
+        Map the plain words of a PubMed query to MeSH headings plus synonym OR-clauses.
+
+        Each run of untagged words is segmented into the longest MeSH names or entry
+        terms it contains, and each match becomes ("Heading"[mesh] OR "synonym"[tiab] ...).
+        Words with no MeSH match, quoted phrases, field-tagged phrases, parentheses and
+        boolean operators are kept as written, so already-enhanced queries pass through.
+        A field tag covers every word back to the previous operator, parenthesis or
+        quoted phrase, as in PubMed: "type 2 diabetes mellitus[mesh]" is left alone.
+
+        Example:
+            expand_query("metformin type 2 diabetes")
+            -> '("Metformin"[mesh] OR "Dimethylbiguanidine"[tiab] OR "Glucophage"[tiab]) AND
+                ("Diabetes Mellitus, Type 2"[mesh] OR "Type 2 Diabetes Mellitus"[tiab] OR ...)'
+        """
+        return self._expand(query)[0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "source": self.source_path,
+            "terms": self._n_terms,
+            "descriptors": self._n_descriptors,
+        }
+
+    def close(self) -> None:
+        self._term_offsets.release()
+        self._term_descriptors.release()
+        self._desc_offsets.release()
+        self._mm.close()
+
+
+_index: MeshIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_mesh_index() -> MeshIndex:
+    """
+    Return the process-wide MeSH index stored at MESH_INDEX_PATH.
+
+    The index is built from MESH_XML_PATH (a MeSH descriptor dump, e.g. desc2025.xml
+    from nlm.nih.gov), or from the bundled sample vocabulary when that is not set, and
+    is rebuilt whenever it was built from another file or an older version of this one.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                settings = get_settings().cache
+                path = settings.mesh_index_path or DEFAULT_INDEX_PATH
+                source = settings.mesh_xml_path or SAMPLE_MESH_XML
+                index = _open_current_index(path, source)
+                if index is None:
+                    build_mesh_index(source, path)
+                    index = MeshIndex(path)
+                _index = index
+    return _index
+
+
+def _open_current_index(path: str, xml_path: str) -> MeshIndex | None:
+    """Open the index at path if it was built from the current version of xml_path, else return None."""
+    if not os.path.exists(path):
+        return None
+    try:
+        index = MeshIndex(path)
+    except ValueError:
+        return None
+    if not os.path.exists(xml_path):
+        return index  # the dump was removed after the build: keep using what it produced
+    if (index.source_path, index.source_mtime_ns) != _source_stamp(xml_path):
+        index.close()
+        return None
+    return index
+
+
+def expand_mesh_query(query: str) -> Dict[str, Any]:
+    """
+    Expand a biomedical search query with MeSH headings and synonyms from the local MeSH index.
+
+    Runs locally in microseconds and always gives the same answer for the same query.
+
+    Args:
+        query (str): Plain-language or PubMed query, e.g. "metformin type 2 diabetes".
+
+    Returns:
+        dict: Contains:
+            - query (str): The PubMed query with ("Heading"[mesh] OR "synonym"[tiab]) clauses.
+            - mesh_terms (list of str): MeSH headings that were recognised in the query.
+    """
+    expanded, headings = get_mesh_index()._expand(query)
+    return {"query": expanded, "mesh_terms": headings}
+
+if __name__ == "__main__":
+    # python -m medical_agent_bot.tools.mesh_index desc2025.xml [index_path]
+    if len(sys.argv) < 2:
+        sys.exit("usage: python -m medical_agent_bot.tools.mesh_index <descYYYY.xml> [index_path]")
+    target = sys.argv[2] if len(sys.argv) > 2 else (get_settings().cache.mesh_index_path or DEFAULT_INDEX_PATH)
+    print(build_mesh_index(sys.argv[1], os.path.expanduser(target)))
@@ -0,0 +1,269 @@
+"""Two-tier cache (in-memory LRU in front of SQLite) for PubMed searches and article records."""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from ..config import get_settings
+from .article import Article
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "medical_search_pro", "pubmed_cache.sqlite3")
+
+SEARCH_NAMESPACE = "search"
+RECORD_NAMESPACE = "record:v2"
+RESULT_SET_NAMESPACE = "result_set"
+
+# Search results change as PubMed indexes new articles; article records almost never do.
+DEFAULT_SEARCH_TTL = 60 * 60
+DEFAULT_RECORD_TTL = 30 * 24 * 60 * 60
+# A result set only has to outlive the conversation that produced it.
+DEFAULT_RESULT_SET_TTL = 24 * 60 * 60
+# Expired entries are kept this much longer, to fall back on while PubMed is unreachable.
+DEFAULT_STALE_GRACE = 7 * 24 * 60 * 60
+
+# Values are stored as JSON; namespaces listed here are decoded back into objects.
+_DECODERS: Dict[str, Callable[[Any], Any]] = {RECORD_NAMESPACE: Article.from_dict}
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, Article):
+        return value.to_dict()
+    raise TypeError(f"Cannot cache a {type(value).__name__}")
+
+
+class PubMedCache:
+    """
+    Cache of query -> PMID list, PMID -> parsed record and result set ID -> PMID list entries.
+
+    Lookups hit a bounded in-process LRU first and fall back to a local SQLite store,
+    promoting disk hits into memory. The memory tier is bounded by entry count and the
+    disk tier by total payload bytes; both evict least-recently-used entries first.
+    Expired entries are misses, but stay on disk for stale_grace more seconds: lookups
+    with allow_stale=True still return them, for use while PubMed is unreachable.
+
+    Args:
+        path (str): SQLite file path, or ":memory:" for a process-local store.
+        memory_entries (int): Maximum number of entries held in the LRU.
+        max_disk_bytes (int): Maximum total size of cached payloads on disk.
+        search_ttl (float): Lifetime of query -> PMID list entries, in seconds.
+        record_ttl (float): Lifetime of PMID -> record entries, in seconds.
+        result_set_ttl (float): Lifetime of result set ID -> PMID list entries, in seconds.
+        stale_grace (float): Seconds expired entries are kept for allow_stale lookups.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        memory_entries: int = 2048,
+        max_disk_bytes: int = 64 * 1024 * 1024,
+        search_ttl: float = DEFAULT_SEARCH_TTL,
+        record_ttl: float = DEFAULT_RECORD_TTL,
+        result_set_ttl: float = DEFAULT_RESULT_SET_TTL,
+        stale_grace: float = DEFAULT_STALE_GRACE,
+    ):
+        self.memory_entries = memory_entries
+        self.stale_grace = stale_grace
+        self.max_disk_bytes = max_disk_bytes
+        self.ttls = {SEARCH_NAMESPACE: search_ttl, RECORD_NAMESPACE: record_ttl, RESULT_SET_NAMESPACE: result_set_ttl}
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0}
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+
+    # -- generic tiered access -------------------------------------------------
+
+    def _remember(self, mkey: Tuple[str, str], expires_at: float, value: Any) -> None:
+        self._memory[mkey] = (expires_at, value)
+        self._memory.move_to_end(mkey)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def get_many(self, namespace: str, keys: Iterable[str], allow_stale: bool = False) -> Dict[str, Any]:
+        """
+        Return {key: value} for every key that is cached and not expired.
+
+        With allow_stale=True, entries that expired less than stale_grace seconds ago
+        are returned too (only from disk, and without being promoted into memory).
+        """
+        now = time.time()
+        found: Dict[str, Any] = {}
+        with self._lock:
+            disk_keys = []
+            decode = _DECODERS.get(namespace)
+            for key in keys:
+                mkey = (namespace, key)
+                entry = self._memory.get(mkey)
+                if entry is not None and entry[0] > now:
+                    self._memory.move_to_end(mkey)
+                    found[key] = entry[1]
+                    self._counters["memory_hits"] += 1
+                else:
+                    if entry is not None:
+                        del self._memory[mkey]
+                    disk_keys.append(key)
+
+            for start in range(0, len(disk_keys), 500):
+                chunk = disk_keys[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT key, value, expires_at FROM entries WHERE namespace = ? "
+                    f"AND key IN ({','.join('?' * len(chunk))})",
+                    (namespace, *chunk),
+                ).fetchall()
+                for key, raw, expires_at in rows:
+                    fresh = expires_at > now
+                    if not fresh and not (allow_stale and expires_at + self.stale_grace > now):
+                        continue
+                    value = json.loads(raw)
+                    if decode is not None:
+                        value = decode(value)
+                    found[key] = value
+                    if fresh:
+                        self._remember((namespace, key), expires_at, value)
+                        self._counters["disk_hits"] += 1
+                    else:
+                        self._counters["stale_hits"] += 1
+                hit_keys = [row[0] for row in rows if row[2] > now]
+                if hit_keys:
+                    self._db.execute(
+                        f"UPDATE entries SET accessed_at = ? WHERE namespace = ? "
+                        f"AND key IN ({','.join('?' * len(hit_keys))})",
+                        (now, namespace, *hit_keys),
+                    )
+                self._db.execute(
+                    f"DELETE FROM entries WHERE namespace = ? AND expires_at <= ? "
+                    f"AND key IN ({','.join('?' * len(chunk))})",
+                    (namespace, now - self.stale_grace, *chunk),
+                )
+            self._counters["misses"] += len(disk_keys) - sum(1 for k in disk_keys if k in found)
+        return found
+
+    def put_many(self, namespace: str, items: Dict[str, Any]) -> None:
+        """Store {key: value} pairs with the namespace's TTL in both tiers."""
+        if not items:
+            return
+        now = time.time()
+        expires_at = now + self.ttls[namespace]
+        rows = []
+        with self._lock:
+            for key, value in items.items():
+                raw = json.dumps(value, separators=(",", ":"), default=_encode)
+                rows.append((namespace, key, raw, len(raw), expires_at, now))
+                self._remember((namespace, key), expires_at, value)
+            self._db.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """Drop rows past their stale grace, then least-recently-used rows until under max_disk_bytes."""
+        self._db.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time() - self.stale_grace,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        # Trim to 90% so that a full cache does not evict on every write.
+        target = self.max_disk_bytes * 0.9
+        doomed = []
+        for namespace, key, size in self._db.execute(
+            "SELECT namespace, key, size FROM entries ORDER BY accessed_at"
+        ):
+            if total <= target:
+                break
+            doomed.append((namespace, key))
+            total -= size
+        self._db.executemany("DELETE FROM entries WHERE namespace = ? AND key = ?", doomed)
+        self._counters["evictions"] += len(doomed)
+
+    # -- PubMed-specific helpers -----------------------------------------------
+
+    @staticmethod
+    def search_key(query: str, max_results: int) -> str:
+        return f"{max_results}:{' '.join(query.split())}"
+
+    def get_search(self, query: str, max_results: int, allow_stale: bool = False) -> List[str] | None:
+        """Return the cached PMID list for a query, or None on a miss."""
+        key = self.search_key(query, max_results)
+        return self.get_many(SEARCH_NAMESPACE, [key], allow_stale).get(key)
+
+    def put_search(self, query: str, max_results: int, pmids: List[str]) -> None:
+        self.put_many(SEARCH_NAMESPACE, {self.search_key(query, max_results): list(pmids)})
+
+    def get_records(self, pmids: Iterable[str], allow_stale: bool = False) -> Dict[str, Article]:
+        """Return {pmid: article} for the PMIDs that are cached."""
+        return self.get_many(RECORD_NAMESPACE, pmids, allow_stale)
+
+    def put_records(self, records: Dict[str, Article]) -> None:
+        self.put_many(RECORD_NAMESPACE, records)
+
+    def get_result_set(self, result_set_id: str) -> List[str] | None:
+        """Return the PMID list stored under a result set ID, or None on a miss."""
+        return self.get_many(RESULT_SET_NAMESPACE, [result_set_id]).get(result_set_id)
+
+    def put_result_set(self, result_set_id: str, pmids: List[str]) -> None:
+        self.put_many(RESULT_SET_NAMESPACE, {result_set_id: list(pmids)})
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and current tier sizes."""
+        with self._lock:
+            disk_entries, disk_bytes = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            lookups = self._counters["memory_hits"] + self._counters["disk_hits"] + self._counters["misses"]
+            hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+            return {
+                **self._counters,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "disk_bytes": disk_bytes,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM entries")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_cache: PubMedCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_pubmed_cache() -> PubMedCache:
+    """Return the process-wide cache, stored at PUBMED_CACHE_PATH when set."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                settings = get_settings().cache
+                _cache = PubMedCache(
+                    path=settings.pubmed_path or DEFAULT_CACHE_PATH,
+                    memory_entries=settings.pubmed_memory_entries,
+                    max_disk_bytes=settings.pubmed_max_disk_bytes,
+                    stale_grace=settings.pubmed_stale_grace,
+                )
+    return _cache
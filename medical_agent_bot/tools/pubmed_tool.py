@@ -1,27 +1,373 @@
-import os, time, textwrap, requests, xml.etree.ElementTree as ET
-from typing import List, Dict, Any
-from dotenv import load_dotenv
+import os, asyncio, threading
 import csv
-import io
+from dataclasses import replace
+from typing import TYPE_CHECKING, List, Dict, Any, Coroutine, Iterable, Iterator, Set, Tuple, TypeVar
+import httpx
+from ..config import get_settings
+from .eutils_client import get_eutils_client
+from .article import Article, as_articles
+from .article_export import save_arrow_file, save_jsonl_file, save_parquet_file
+from .article_index import get_article_index
+from .circuit_breaker import CircuitOpenError
+from .compaction import DEFAULT_TOKEN_BUDGET, compact_records
+from .csv_stream import article_rows, iter_csv_chunks, write_csv
+from .evidence_extractor import build_evidence_matrix
+from .pubmed_cache import get_pubmed_cache
+from .pubmed_xml import aiter_pubmed_articles, iter_pubmed_articles
+from .relevance import deduplicate
+from .result_sets import RESULT_SET_STATE_KEY, save_result_set
+from .telemetry import get_tracer
 
-load_dotenv()
+if TYPE_CHECKING:
+    from google.adk.tools import ToolContext
 
-def _qp(base: Dict[str, Any]) -> Dict[str, Any]:
-    """Inject api_key only when present."""
-    return {**base, **({"api_key": get_ncbi_api_key()} if get_ncbi_api_key() else {})}
+T = TypeVar("T")
 
+EVIDENCE_MATRIX_STATE_KEY = "prefilled_evidence_matrix"
 
-def _strip(elem: ET.Element | None) -> str:
-    """Flatten nested XML text, return '' if elem is None."""
-    return "".join(elem.itertext()).strip() if elem is not None else ""
+# E-utilities failures the search degrades around (stale cache, esummary metadata).
+_NCBI_ERRORS = (httpx.HTTPError, CircuitOpenError)
 
+# Until this many efetches have been timed, a slow efetch is hedged after a fixed delay;
+# after that, at their 95th percentile (but never sooner than the floor).
+_HEDGE_MIN_SAMPLES = 20
+_DEFAULT_HEDGE_AFTER = 2.0
+_MIN_HEDGE_AFTER = 0.1
 
-def _first_n_words(txt: str, n: int = 250) -> str:
-    return " ".join(txt.split()[:n])
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
 
 
-def pubmed_to_pmc_full_text_search(query: str, max_results: int = 10) -> List[Dict[str, Any]]:
-   
+def _run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Coroutines run on one long-lived background event loop, so the pooled async
+    HTTP client bound to that loop is reused across calls, and this works whether
+    or not the caller is itself inside a running loop.
+    """
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="pubmed-tool-loop", daemon=True).start()
+                _loop = loop
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+
+async def _search_pmids(query: str, max_results: int) -> List[str]:
+    """Run esearch and return the matching PMIDs."""
+    search_resp = await get_eutils_client().aget("esearch", {
+        "db": "pubmed",
+        "term": query,
+        "retmax": max_results,
+        "retmode": "json"
+    })
+    return search_resp.json().get("esearchresult", {}).get("idlist", [])
+
+
+async def _efetch_records(ids: str) -> Dict[str, Article]:
+    """Stream efetch XML and return {pmid: article}, parsing one article at a time."""
+    with get_tracer().span("pubmed.efetch_parse") as span:
+        fetch_resp = await get_eutils_client().aget("efetch", {"db": "pubmed", "id": ids, "retmode": "xml"}, stream=True)
+
+        async def counted_chunks():
+            async for chunk in fetch_resp.aiter_bytes():
+                span.add("bytes", len(chunk))
+                yield chunk
+
+        try:
+            records = {
+                record.pmid: record
+                async for record in aiter_pubmed_articles(counted_chunks())
+            }
+        finally:
+            await fetch_resp.aclose()
+        span.set_attribute("articles", len(records))
+        return records
+
+
+def _efetch_hedge_delay() -> float | None:
+    """Seconds after which a slow efetch is hedged, or None when hedging is off."""
+    search = get_settings().search
+    if not search.hedge_efetch:
+        return None
+    if search.efetch_hedge_after is not None:
+        return search.efetch_hedge_after
+    observed = get_tracer().histogram("pubmed.efetch_parse")
+    if observed.count < _HEDGE_MIN_SAMPLES:
+        return _DEFAULT_HEDGE_AFTER
+    return max(observed.percentile(95) / 1000, _MIN_HEDGE_AFTER)
+
+
+async def _hedged_efetch(ids: str) -> Dict[str, Article]:
+    """
+    Run _efetch_records, racing a second identical request when the first is slow.
+
+    If the first efetch is still running after the hedge delay, a second one is sent
+    (unless efetch's circuit is open) and the first to succeed wins; the other is
+    cancelled. Counted as pubmed.efetch.hedged, and pubmed.efetch.hedge_won when the
+    second request wins.
+    """
+    delay = _efetch_hedge_delay()
+    if delay is None:
+        return await _efetch_records(ids)
+
+    tracer = get_tracer()
+    tasks = [asyncio.ensure_future(_efetch_records(ids))]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done and not get_eutils_client().breaker_for("efetch").is_open:
+            tracer.increment("pubmed.efetch.hedged")
+            tasks.append(asyncio.ensure_future(_efetch_records(ids)))
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not tasks[0]:
+                        tracer.increment("pubmed.efetch.hedge_won")
+                    return task.result()
+        # Every request failed: raise the first one's error.
+        return tasks[0].result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _apply_esummary(records: Dict[str, Article], articles_data: Dict[str, Any]) -> None:
+    """Overlay esummary metadata onto efetch records (legacy 'esummary' retrieval mode)."""
+    for pmid, record in records.items():
+        summary = articles_data.get(pmid)
+        if not summary:
+            continue
+        meta = Article.from_esummary(summary)
+        records[pmid] = replace(
+            record,
+            title=meta.title or record.title,
+            authors=meta.authors,
+            journal=meta.journal or record.journal,
+            published_date=meta.published_date or record.published_date,
+        )
+
+
+async def _fetch_records(pmids: List[str]) -> Dict[str, Article]:
+    """
+    Fetch full records for PMIDs, returning {pmid: article}.
+
+    The efetch PubmedArticle XML carries title, authors, journal, date and every
+    abstract section, so by default one efetch round trip is enough. Setting
+    PUBMED_RETRIEVAL_MODE=esummary also requests esummary concurrently and takes
+    the citation metadata from it; if esummary fails, the efetch metadata is kept
+    (counted as pubmed.esummary.failed). A slow efetch is hedged (see _hedged_efetch).
+    """
+    ids = ",".join(pmids)
+    if get_settings().search.retrieval_mode != "esummary":
+        return await _hedged_efetch(ids)
+
+    summary_resp, records = await asyncio.gather(
+        get_eutils_client().aget("esummary", {"db": "pubmed", "id": ids, "retmode": "json"}),
+        _hedged_efetch(ids),
+        return_exceptions=True,
+    )
+    if isinstance(records, BaseException):
+        raise records
+    try:
+        if isinstance(summary_resp, BaseException):
+            raise summary_resp
+        summaries = summary_resp.json()["result"]
+    except (*_NCBI_ERRORS, ValueError, KeyError) as e:
+        get_tracer().increment("pubmed.esummary.failed")
+        print(f"PubMed esummary failed ({e}); using the efetch metadata")
+    else:
+        _apply_esummary(records, summaries)
+    return records
+
+
+async def _fetch_records_degraded(pmids: List[str], error: Exception) -> Tuple[Dict[str, Article], Set[str]]:
+    """
+    Stand-in records for PMIDs that efetch failed to deliver.
+
+    Earlier copies come first: expired entries still in the cache's stale grace period,
+    then the local article index. The remaining PMIDs get esummary metadata without an
+    abstract. Each path is counted on the tracer under pubmed.degraded.*.
+
+    Returns:
+        tuple: ({pmid: article} for whatever was found, PMIDs with metadata only).
+
+    Raises:
+        Exception: The original efetch error, when nothing at all was found.
+    """
+    tracer = get_tracer()
+    records = get_pubmed_cache().get_records(pmids, allow_stale=True)
+    records.update(get_article_index().get_records(pmid for pmid in pmids if pmid not in records))
+    if records:
+        tracer.increment("pubmed.degraded.stale_records", len(records))
+
+    metadata_only: Set[str] = set()
+    rest = [pmid for pmid in pmids if pmid not in records]
+    if rest:
+        try:
+            summary_resp = await get_eutils_client().aget(
+                "esummary", {"db": "pubmed", "id": ",".join(rest), "retmode": "json"}
+            )
+            summaries = summary_resp.json()["result"]
+        except (*_NCBI_ERRORS, ValueError, KeyError) as e:
+            print(f"PubMed esummary fallback failed: {e}")
+        else:
+            for pmid in rest:
+                summary = summaries.get(pmid)
+                if isinstance(summary, dict) and "error" not in summary:
+                    records[pmid] = Article.from_esummary(summary)
+                    metadata_only.add(pmid)
+            if metadata_only:
+                tracer.increment("pubmed.degraded.esummary_only", len(metadata_only))
+
+    if not records:
+        raise error
+    if len(records) < len(pmids):
+        tracer.increment("pubmed.degraded.partial")
+    print(
+        f"PubMed efetch failed ({error}); using {len(records) - len(metadata_only)} earlier copies and "
+        f"{len(metadata_only)} abstract-less summaries for {len(pmids)} articles"
+    )
+    return records, metadata_only
+
+
+async def load_pubmed_records(pmids: List[str]) -> Tuple[Dict[str, Article], Set[str]]:
+    """
+    Return {pmid: article} for pmids, from the cache where possible and efetch otherwise.
+
+    If efetch fails, earlier copies of the records or their esummary metadata (without
+    abstracts) stand in, so one NCBI failure does not lose the whole result set. The
+    stand-ins are not cached, so the next load fetches them properly.
+
+    Returns:
+        tuple: ({pmid: article}, PMIDs that only have esummary metadata).
+    """
+    cache = get_pubmed_cache()
+    with get_tracer().span("pubmed.load_records", requested=len(pmids)) as span:
+        records = cache.get_records(pmids)
+        missing = [pmid for pmid in pmids if pmid not in records]
+        span.set_attributes(cache_hits=len(records), fetched=len(missing))
+        metadata_only: Set[str] = set()
+        if missing:
+            try:
+                fetched = await _fetch_records(missing)
+            except _NCBI_ERRORS as e:
+                fetched, metadata_only = await _fetch_records_degraded(missing, e)
+                span.set_attributes(degraded=True, metadata_only=len(metadata_only))
+            else:
+                cache.put_records(fetched)
+            records.update(fetched)
+        return records, metadata_only
+
+
+async def search_pubmed_records(query: str, max_results: int = 10) -> List[Article]:
+    """
+    Return parsed articles for a query, ranked by relevance and without near-duplicates.
+
+    This is the search pipeline behind pubmed_to_pmc_full_text_search_async, minus
+    compaction and formatting, for callers that need the full records.
+
+    Raises:
+        httpx.HTTPError: If an E-utilities request fails and no fallback applies.
+        CircuitOpenError: If NCBI is failing fast and no fallback applies.
+    """
+    records, _ = await _search_pubmed_records(query, max_results)
+    return records
+
+
+async def _search_pubmed_records(query: str, max_results: int) -> Tuple[List[Article], Set[str]]:
+    """search_pubmed_records, also returning the PMIDs that only have esummary metadata."""
+    with get_tracer().span("pubmed.search", max_results=max_results) as span:
+        records, metadata_only = await _run_search(query, max_results)
+        span.set_attribute("articles", len(records))
+        return records, metadata_only
+
+
+async def _run_search(query: str, max_results: int) -> Tuple[List[Article], Set[str]]:
+    cache = get_pubmed_cache()
+    index = get_article_index()
+
+    # Step 0: Optionally answer from the local corpus without calling NCBI
+    if get_settings().search.local_first:
+        local = index.search(query, max_results)
+        if len(local) >= max_results:
+            return [record for record, _ in local], set()
+
+    # Step 1: Search PubMed for article IDs (short-lived cache entry per query)
+    with get_tracer().span("pubmed.esearch") as span:
+        pmids = cache.get_search(query, max_results)
+        span.set_attribute("cache_hit", pmids is not None)
+        if pmids is None:
+            try:
+                pmids = await _search_pmids(query, max_results)
+            except _NCBI_ERRORS as e:
+                # Fall back on an expired result for the same query, if one is left.
+                pmids = cache.get_search(query, max_results, allow_stale=True)
+                if pmids is None:
+                    raise
+                get_tracer().increment("pubmed.degraded.stale_search")
+                span.set_attribute("stale", True)
+                print(f"PubMed esearch failed ({e}); using earlier results for {query!r}")
+            else:
+                cache.put_search(query, max_results, pmids)
+        span.set_attribute("pmids", len(pmids))
+
+    if not pmids:
+        print(f"No results found for query: {query}")
+        print("Try using MeSH terms, e.g.: 'cancer[mesh] AND treatment[mesh]'")
+        return [], set()
+
+    # Step 2: Reuse cached records and fetch only the missing PMIDs
+    records, metadata_only = await load_pubmed_records(pmids)
+
+    # Step 3: Grow the local index (not with abstract-less stand-ins), re-rank NCBI's
+    # date order by relevance and collapse near-duplicates (errata, reprints, republished abstracts)
+    with get_tracer().span("pubmed.rank"):
+        unindexed = set(records) - metadata_only - index.contains(records)
+        if unindexed:
+            index.add_records(records[pmid] for pmid in unindexed)
+        ranked = deduplicate(index.rerank(query, [records[pmid] for pmid in pmids if pmid in records]))
+        return ranked, metadata_only & {record.pmid for record in ranked}
+
+
+def finalize_articles(
+    records: List[Article],
+    tool_context: "ToolContext | None" = None,
+    metadata_only: Iterable[str] = (),
+) -> List[Dict[str, Any]]:
+    """
+    Fit the result set into the token budget and render it in the tool's schema.
+
+    The compaction report (token counts and articles trimmed) is recorded on the
+    pubmed.finalize span, and the tokens saved are added to the tracer counters.
+    When called as an agent tool, the rule-based evidence matrix for the full (not
+    compacted) records is also stored in session state for the evidence builder, and
+    the records are saved as a result set whose ID is stored for send_email; the
+    metadata_only PMIDs (esummary stand-ins) are saved by PMID only.
+    """
+    with get_tracer().span("pubmed.finalize", articles=len(records)) as span:
+        if tool_context is not None:
+            tool_context.state[EVIDENCE_MATRIX_STATE_KEY] = build_evidence_matrix(records)
+            tool_context.state[RESULT_SET_STATE_KEY] = save_result_set(records, metadata_only)
+        compacted, report = compact_records(records, get_settings().search.token_budget or DEFAULT_TOKEN_BUDGET)
+        for key, value in report.items():
+            span.set_attribute(key, value)
+        tracer = get_tracer()
+        tracer.increment("pubmed.compaction.tokens_saved", report["tokens_saved"])
+        tracer.increment("pubmed.compaction.articles_trimmed", report["articles_trimmed"])
+        span.set_attribute("returned", len(compacted))
+        return [record.to_result() for record in compacted]
+
+
+async def pubmed_to_pmc_full_text_search_async(
+    query: str,
+    max_results: int = 10,
+    tool_context: "ToolContext | None" = None,
+) -> List[Dict[str, Any]]:
     """
     Search the most recent biomedical literature on PubMed using a keyword query, and return up to max_results of the latest articles, including publications from 2025 where available.
     Each article includes structured metadata and an abstract summary for easy integration and analysis.
@@ -33,10 +379,13 @@ def pubmed_to_pmc_full_text_search(query: str, max_results: int = 10) -> List[Di
       - published_date: Date of publication (str, may be partial)
       - summary: Abstract text if available (str)
       - url: Link to article on PubMed (str)
+      - pmid: PubMed identifier (str)
 
     Args:
         query (str): Search term for PubMed (can use keywords, phrases, MeSH, Boolean, etc).
         max_results (int): Maximum number of articles to return (default: 10).
+        tool_context (ToolContext): Supplied by the agent runtime; used to store the
+            pre-extracted evidence matrix in session state.
 
     Returns:
         List[dict]: Each dict contains:
@@ -46,139 +395,202 @@ def pubmed_to_pmc_full_text_search(query: str, max_results: int = 10) -> List[Di
             - published_date (str)
             - summary (str)
             - url (str)
+            - pmid (str)
 
     Notes:
         - Uses the NCBI E-utilities API with your NCBI API key if provided.
         - Handles no-result and error cases gracefully (returns empty list).
+        - If NCBI fails after the search step, earlier copies of the articles or their
+          esummary metadata (summary "No abstract available") are returned instead;
+          a failed search falls back on recent cached results for the same query.
+        - Search results and article records are cached locally, so repeated queries
+          and already-seen PMIDs skip the network.
+        - Metadata and every abstract section come from a single streamed efetch request,
+          made without blocking the event loop.
+        - Results are re-ranked by BM25 relevance to the query using a local index of
+          every article fetched so far, and near-duplicate articles are dropped.
+        - Abstracts are trimmed to fit PUBMED_TOKEN_BUDGET (Results/Conclusions kept first).
+        - A rule-based evidence matrix (study type, population, intervention, comparator,
+          outcomes, link) is saved to state['prefilled_evidence_matrix'], and the ID of the
+          full result set to state['result_set_id'] for send_email.
         - For best results, use precise queries, e.g. 'diabetes mellitus[mesh] AND genetics[mesh]'.
         - Abstracts may be missing for some articles.
         -
     
     Example:
-        articles = pubmed_to_pmc_full_text_search("cancer immunotherapy", max_results=5)
+        articles = await pubmed_to_pmc_full_text_search_async("cancer immunotherapy", max_results=5)
 
     This function is suitable for LLMs, tools, or agents that need to retrieve recent PubMed literature with summaries and structured metadata.
     """
     try:
-        api_key = os.getenv("NCBI_API_KEY")
-    except ValueError:
-        print("No NCBI API key found. Proceeding without key (rate limits apply).")
-        api_key = None
+        records, metadata_only = await _search_pubmed_records(query, max_results)
+        return finalize_articles(records, tool_context, metadata_only)
 
-    # Step 1: Search PubMed
-    search_params = {
-        "db": "pubmed",
-        "term": query,
-        "retmax": max_results,
-        "retmode": "json"
-    }
-    if api_key:
-        search_params["api_key"] = api_key
+    except _NCBI_ERRORS as e:
+        print(f"Error connecting to PubMed: {e}")
+        return []
+    except Exception as e:
+        print(f"Error processing results: {e}")
+        return []
+
+
+def pubmed_to_pmc_full_text_search(query: str, max_results: int = 10) -> List[Dict[str, Any]]:
+    """
+    Blocking wrapper around pubmed_to_pmc_full_text_search_async for synchronous callers.
+
+    Args:
+        query (str): Search term for PubMed (can use keywords, phrases, MeSH, Boolean, etc).
+        max_results (int): Maximum number of articles to return (default: 10).
+
+    Returns:
+        List[dict]: Same article dicts as pubmed_to_pmc_full_text_search_async.
+    """
+    return _run_sync(pubmed_to_pmc_full_text_search_async(query, max_results))
+
+
+def fetch_pubmed_records(pmids: List[str]) -> Dict[str, Article]:
+    """
+    Blocking wrapper around load_pubmed_records for synchronous callers.
+
+    Args:
+        pmids (list of str): PubMed IDs to load.
 
+    Returns:
+        dict: {pmid: article} for the PMIDs that could be loaded (empty if PubMed is unreachable).
+    """
     try:
-        # Get article IDs
-        search_resp = requests.get(
-            "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi",
-            params=search_params,
-            timeout=30
-        )
-        search_resp.raise_for_status()
-        pmids = search_resp.json().get("esearchresult", {}).get("idlist", [])
+        records, _ = _run_sync(load_pubmed_records(pmids))
+    except _NCBI_ERRORS as e:
+        print(f"Error connecting to PubMed: {e}")
+        return {}
+    return records
 
-        if not pmids:
-            print(f"No results found for query: {query}")
-            print("Try using MeSH terms, e.g.: 'cancer[mesh] AND treatment[mesh]'")
-            return []
 
-        # Step 2: Get article details
-        summary_params = {
-            "db": "pubmed",
-            "id": ",".join(pmids),
-            "retmode": "json"
-        }
-        if api_key:
-            summary_params["api_key"] = api_key
-
-        summary_resp = requests.get(
-            "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi",
-            params=summary_params,
-            timeout=10
-        )
-        summary_resp.raise_for_status()
-        articles_data = summary_resp.json()["result"]
+def search_local_articles(query: str, max_results: int = 10) -> List[Dict[str, Any]]:
+    """
+    Search only the local index of previously fetched PubMed articles, ranked by BM25.
+
+    No request is sent to NCBI, so this is instant but limited to articles that earlier
+    searches have already retrieved.
+
+    Args:
+        query (str): Keywords to search for in article titles and abstracts.
+        max_results (int): Maximum number of articles to return (default: 10).
+
+    Returns:
+        List[dict]: Articles in the same schema as pubmed_to_pmc_full_text_search.
+    """
+    return [record.to_result() for record, _ in get_article_index().search(query, max_results)]
+
+
+def pubmed_bulk_search(
+    query: str,
+    max_records: int | None = None,
+    batch_size: int = 500,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every article matching a query, for large pulls such as systematic reviews.
+
+    The search is stored on the E-utilities History server (usehistory=y) and records
+    are then fetched in retstart/retmax batches via POST using the returned WebEnv and
+    query_key, so no PMID list is ever sent in a URL. Each batch is stream-parsed and
+    yielded one article at a time, which keeps memory flat no matter how many records
+    match.
+
+    Args:
+        query (str): Search term for PubMed.
+        max_records (int | None): Stop after this many articles (default: all matches).
+        batch_size (int): Records requested per efetch call (NCBI allows up to 10,000).
+
+    Yields:
+        dict: Articles in the same schema as pubmed_to_pmc_full_text_search.
+
+    Raises:
+        requests.exceptions.RequestException: If an E-utilities request fails.
+        CircuitOpenError: If NCBI is failing fast.
+    """
+    client = get_eutils_client()
+    cache = get_pubmed_cache()
+
+    search = client.post("esearch", {
+        "db": "pubmed",
+        "term": query,
+        "usehistory": "y",
+        "retmax": 0,
+        "retmode": "json"
+    }).json().get("esearchresult", {})
+    total = int(search.get("count", 0))
+    if max_records is not None:
+        total = min(total, max_records)
 
-        # Step 3: Get abstracts
-        fetch_params = {
+    for retstart in range(0, total, batch_size):
+        fetch_resp = client.post("efetch", {
             "db": "pubmed",
-            "id": ",".join(pmids),
+            "query_key": search["querykey"],
+            "WebEnv": search["webenv"],
+            "retstart": retstart,
+            "retmax": min(batch_size, total - retstart),
             "retmode": "xml"
-        }
-        if api_key:
-            fetch_params["api_key"] = api_key
-
-        fetch_resp = requests.get(
-            "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi",
-            params=fetch_params,
-            timeout=10
-        )
-        fetch_resp.raise_for_status()
-
-        # Parse XML for abstracts
-        root = ET.fromstring(fetch_resp.text)
-        abstracts = {}
-        for article in root.findall(".//PubmedArticle"):
-            pmid = article.find(".//PMID")
-            abstract = article.find(".//Abstract/AbstractText")
-            if pmid is not None and abstract is not None:
-                abstracts[pmid.text] = abstract.text
-
-        # Format results
-        results = []
-        for pmid in pmids:
-            article = articles_data[pmid]
-            results.append({
-                "title": article.get("title", "").rstrip("."),
-                "authors": [a.get("name", "") for a in article.get("authors", [])[:3]],
-                "journal": article.get("source", ""),
-                "published_date": article.get("pubdate", ""),
-                "summary": abstracts.get(pmid, "No abstract available"),
-                "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/",
-            })
-
-        return results
-
-    except requests.exceptions.RequestException as e:
-        print(f"Error connecting to PubMed: {e}")
-        return []
-    except Exception as e:
-        print(f"Error processing results: {e}")
-        return []
+        }, stream=True)
+        try:
+            fetch_resp.raw.decode_content = True
+            batch = {}
+            for record in iter_pubmed_articles(fetch_resp.raw):
+                batch[record.pmid] = record
+                yield record.to_result()
+            cache.put_records(batch)
+            get_article_index().add_records(batch.values())
+        finally:
+            fetch_resp.close()
+
 
-def articles_to_csv(articles: List[Dict[str, Any]]) -> str:
+def articles_to_csv(articles: Iterable[Article | Dict[str, Any]]) -> str:
     """
-    Convert a list of article dicts to a CSV string.
+    Convert articles (Article objects or article dicts) to a CSV string.
     """
-    if not articles:
-        return ""
-    output = io.StringIO()
-    writer = csv.DictWriter(
-        output,
-        fieldnames=["title", "authors", "journal", "published_date", "summary", "url"],
-        extrasaction='ignore'
-    )
-    writer.writeheader()
-    for article in articles:
-        row = article.copy()
-        row["authors"] = ", ".join(row.get("authors", []))
-        writer.writerow(row)
-    return output.getvalue()
+    rows = article_rows(as_articles(articles))
+    return "".join(chunk.decode("utf-8") for chunk in iter_csv_chunks(rows, quoting=csv.QUOTE_MINIMAL))
 
 
-def save_csv_file(articles: List[Dict[str, Any]], filename: str = "search_results.csv") -> str:
+def save_csv_file(articles: Iterable[Article | Dict[str, Any]], filename: str = "search_results.csv") -> str:
     """
     Save articles as a CSV file and return the file path.
+
+    Rows are streamed to disk in chunks, so articles can be a generator such as
+    pubmed_bulk_search(...) and memory stays flat however many records it yields.
+    """
+    return write_csv(filename, article_rows(as_articles(articles)), quoting=csv.QUOTE_MINIMAL)
+
+
+def save_articles_file(
+    articles: Iterable[Article | Dict[str, Any]],
+    filename: str = "search_results.parquet",
+    file_format: str | None = None,
+) -> str:
+    """
+    Save articles in a CSV, JSONL, Parquet or Arrow file and return the file path.
+
+    Args:
+        articles (iterable of Article or dict): Articles as returned by the search functions; a
+            generator such as pubmed_bulk_search(...) is written batch by batch.
+        filename (str): Output path.
+        file_format (str): "csv", "jsonl", "parquet" or "arrow"; inferred from the
+            filename extension when omitted.
+
+    Returns:
+        str: The absolute path of the written file.
+
+    JSONL, Parquet and Arrow use a typed schema: PMID as an integer, authors as a
+    list of strings and the publication date parsed to a date. Parquet and Arrow
+    need the optional pyarrow dependency.
     """
-    csv_content = articles_to_csv(articles)
-    with open(filename, "w", encoding="utf-8", newline='') as f:
-        f.write(csv_content)
-    return os.path.abspath(filename)
\ No newline at end of file
+    file_format = (file_format or os.path.splitext(filename)[1].lstrip(".")).lower()
+    if file_format == "csv":
+        return save_csv_file(articles, filename)
+    if file_format in ("jsonl", "ndjson"):
+        return save_jsonl_file(articles, filename)
+    if file_format == "parquet":
+        return save_parquet_file(articles, filename)
+    if file_format in ("arrow", "feather", "ipc"):
+        return save_arrow_file(articles, filename)
+    raise ValueError(f"Unsupported export format: {file_format!r} (expected csv, jsonl, parquet or arrow)")
@@ -0,0 +1,76 @@
+"""Streaming parsers for efetch PubmedArticleSet XML."""
+import io
+import xml.etree.ElementTree as ET
+from typing import AsyncIterable, BinaryIO, Iterator
+
+from .article import Article
+
+# Record elements of a PubmedArticleSet: journal articles and NCBI Bookshelf entries.
+RECORD_TAGS = frozenset({"PubmedArticle", "PubmedBookArticle"})
+
+
+def parse_pubmed_article(article: ET.Element) -> Article:
+    """Build an Article from one <PubmedArticle> or <PubmedBookArticle> element."""
+    return Article.from_pubmed_xml(article)
+
+
+def iter_pubmed_articles(source: BinaryIO | bytes) -> Iterator[Article]:
+    """
+    Yield parsed articles one at a time from a PubmedArticleSet byte stream.
+
+    The stream is consumed incrementally with iterparse, and every record
+    (<PubmedArticle> or <PubmedBookArticle>) is cleared (and detached from the root) once parsed, so memory stays bounded by
+    a single article regardless of how many the response holds.
+
+    Args:
+        source: A binary file-like object (e.g. a raw HTTP response body) or bytes.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    context = ET.iterparse(source, events=("start", "end"))
+    _, root = next(context)
+    for event, elem in context:
+        if event == "end" and elem.tag in RECORD_TAGS:
+            yield parse_pubmed_article(elem)
+            elem.clear()
+            root.clear()
+
+
+class PubmedArticleStreamParser:
+    """
+    Push-style counterpart of iter_pubmed_articles for chunked (e.g. async) bodies.
+
+    Feed raw byte chunks as they arrive; each call yields the articles completed by
+    that chunk, with the same per-article element clearing.
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root: ET.Element | None = None
+
+    def _drain(self) -> Iterator[Article]:
+        for event, elem in self._parser.read_events():
+            if self._root is None:
+                self._root = elem
+            elif event == "end" and elem.tag in RECORD_TAGS:
+                yield parse_pubmed_article(elem)
+                elem.clear()
+                self._root.clear()
+
+    def feed(self, chunk: bytes) -> Iterator[Article]:
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> Iterator[Article]:
+        self._parser.close()
+        return self._drain()
+
+
+async def aiter_pubmed_articles(chunks: AsyncIterable[bytes]) -> AsyncIterable[Article]:
+    """Yield parsed articles from an async iterator of raw PubmedArticleSet byte chunks."""
+    parser = PubmedArticleStreamParser()
+    async for chunk in chunks:
+        for article in parser.feed(chunk):
+            yield article
+    for article in parser.close():
+        yield article
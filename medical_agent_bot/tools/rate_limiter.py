@@ -0,0 +1,116 @@
+"""Process-wide token-bucket rate limiter for NCBI E-utilities requests."""
+import asyncio
+import threading
+import time
+from typing import Any, Dict
+
+from ..config import get_settings
+
+# NCBI allows 3 requests/second without an API key and 10 with one.
+NCBI_RATE_WITHOUT_KEY = 3.0
+NCBI_RATE_WITH_KEY = 10.0
+
+
+class TokenBucketRateLimiter:
+    """
+    Token bucket shared by every thread and coroutine in the process.
+
+    Callers never fail: each acquire reserves the next free slot under a short lock and
+    then waits outside the lock until that slot arrives. Because slots are handed out in
+    the order acquire is called, waiters are served first-come, first-served, and the
+    bucket may run into "debt" that later callers wait off.
+
+    Args:
+        rate (float): Sustained requests per second.
+        capacity (float): Maximum burst size. The default of 1 spaces requests evenly,
+            which keeps NCBI's per-second window from ever seeing more than `rate` calls.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        self._acquired = 0
+        self._delayed = 0
+        self._waiting = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+            self._acquired += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            if wait:
+                self._delayed += 1
+                self._waiting += 1
+            return wait
+
+    def _release_waiter(self) -> None:
+        with self._lock:
+            self._waiting -= 1
+
+    def acquire(self) -> float:
+        """Block the calling thread until a request may be sent; return the time waited."""
+        wait = self._reserve()
+        if wait:
+            try:
+                time.sleep(wait)
+            finally:
+                self._release_waiter()
+        return wait
+
+    async def acquire_async(self) -> float:
+        """Coroutine version of acquire that yields to the event loop while waiting."""
+        wait = self._reserve()
+        if wait:
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self._release_waiter()
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue-wait metrics accumulated since the limiter was created."""
+        with self._lock:
+            return {
+                "rate_per_second": self.rate,
+                "acquired": self._acquired,
+                "delayed": self._delayed,
+                "waiting": self._waiting,
+                "total_wait_seconds": self._total_wait,
+                "mean_wait_seconds": self._total_wait / self._acquired if self._acquired else 0.0,
+                "max_wait_seconds": self._max_wait,
+            }
+
+
+_limiter: TokenBucketRateLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def get_ncbi_rate_limiter() -> TokenBucketRateLimiter:
+    """
+    Return the process-wide NCBI limiter: 10 rps with NCBI_API_KEY set, 3 rps otherwise.
+
+    NCBI_RATE_LIMIT overrides the rate, for local stand-in servers that have no quota.
+    """
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                ncbi = get_settings().ncbi
+                rate = NCBI_RATE_WITH_KEY if ncbi.api_key else NCBI_RATE_WITHOUT_KEY
+                _limiter = TokenBucketRateLimiter(ncbi.rate_limit or rate)
+    return _limiter
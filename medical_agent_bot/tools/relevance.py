@@ -0,0 +1,176 @@
+"""NumPy-vectorized relevance ranking and near-duplicate removal for fetched articles."""
+import zlib
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from .article import Article
+from .article_index import tokenize
+
+# Hashed feature space. Vectors are kept sparse, so the width costs nothing per article;
+# at 2**18 buckets two distinct terms of a batch's vocabulary rarely share one, which
+# keeps unrelated abstracts from looking alike.
+DEFAULT_N_FEATURES = 2 ** 18
+
+# Articles at or above this cosine similarity are treated as the same work
+# (errata, reprints, conference abstracts republished as papers).
+DEFAULT_DUPLICATE_THRESHOLD = 0.9
+
+# Width of the dense, folded copy of the vectors used to find duplicate candidates.
+_PREFILTER_FEATURES = 2 ** 10
+
+_BLOCK_ROWS = 1024
+
+
+class SparseVectors(NamedTuple):
+    """Rows of a sparse matrix as (row, column, value) triplets, sorted by row then column."""
+
+    rows: np.ndarray
+    cols: np.ndarray
+    values: np.ndarray
+    n_rows: int
+
+
+def _record_text(record: Article) -> str:
+    return f"{record.title} {' '.join(section.text for section in record.abstract_sections)}"
+
+
+def _term_counts(texts: Sequence[str], n_features: int) -> SparseVectors:
+    """Hash tokens of each text into n_features buckets and count them per text."""
+    columns: Dict[str, int] = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    for row, text in enumerate(texts):
+        for token in tokenize(text):
+            col = columns.get(token)
+            if col is None:
+                # crc32 rather than hash(): the built-in is salted per process.
+                col = columns[token] = zlib.crc32(token.encode("utf-8")) % n_features
+            rows.append(row)
+            cols.append(col)
+    flat = np.asarray(rows, dtype=np.int64) * n_features + np.asarray(cols, dtype=np.int64)
+    cells, counts = np.unique(flat, return_counts=True)
+    return SparseVectors(cells // n_features, cells % n_features, counts.astype(np.float32), len(texts))
+
+
+def _row_norms(vectors: SparseVectors) -> np.ndarray:
+    return np.sqrt(np.bincount(vectors.rows, weights=vectors.values ** 2, minlength=vectors.n_rows))
+
+
+def tfidf_vectors(texts: Sequence[str], n_features: int = DEFAULT_N_FEATURES) -> Tuple[SparseVectors, np.ndarray]:
+    """
+    Build L2-normalised hashed TF-IDF vectors for a batch of texts.
+
+    Term frequencies are log-scaled and weighted by smoothed IDF over the batch.
+
+    Returns:
+        (vectors, idf): the sparse vectors and the float32 IDF weights of all
+        n_features buckets, which are needed to project a query into the same space.
+    """
+    counts = _term_counts(texts, n_features)
+    df = np.bincount(counts.cols, minlength=n_features)
+    idf = (np.log((1 + len(texts)) / (1 + df)) + 1).astype(np.float32)
+    values = np.log1p(counts.values) * idf[counts.cols]
+    norms = _row_norms(counts._replace(values=values))[counts.rows]
+    np.divide(values, norms, out=values, where=norms > 0)
+    return counts._replace(values=values.astype(np.float32)), idf
+
+
+def _query_vector(query: str, idf: np.ndarray) -> np.ndarray:
+    counts = _term_counts([query], idf.shape[0])
+    vector = np.zeros(idf.shape[0], dtype=np.float32)
+    vector[counts.cols] = np.log1p(counts.values) * idf[counts.cols]
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _sparse_dot(vectors: SparseVectors, indptr: np.ndarray, a: int, b: int) -> float:
+    cols_a, cols_b = vectors.cols[indptr[a]:indptr[a + 1]], vectors.cols[indptr[b]:indptr[b + 1]]
+    _, in_a, in_b = np.intersect1d(cols_a, cols_b, assume_unique=True, return_indices=True)
+    values = vectors.values
+    return float(np.dot(values[indptr[a] + in_a], values[indptr[b] + in_b]))
+
+
+def _duplicate_parents(vectors: SparseVectors, threshold: float) -> Dict[int, np.ndarray]:
+    """
+    Map each row to the earlier rows it is a near-duplicate of.
+
+    Candidates come from a dense copy folded into _PREFILTER_FEATURES columns, compared
+    block by block. Folding adds up non-negative weights, so it can only raise a dot
+    product: every true duplicate is a candidate, and each candidate is then confirmed
+    with its exact similarity.
+    """
+    folded = np.bincount(
+        vectors.rows * _PREFILTER_FEATURES + vectors.cols % _PREFILTER_FEATURES,
+        weights=vectors.values,
+        minlength=vectors.n_rows * _PREFILTER_FEATURES,
+    ).astype(np.float32).reshape(vectors.n_rows, _PREFILTER_FEATURES)
+    indptr = np.searchsorted(vectors.rows, np.arange(vectors.n_rows + 1))
+    parents: Dict[int, List[int]] = {}
+    for start in range(0, vectors.n_rows, _BLOCK_ROWS):
+        block = folded[start:start + _BLOCK_ROWS]
+        # Only rows before the block's last row can be earlier duplicates.
+        sims = block @ folded[:start + block.shape[0]].T
+        hits_row, hits_col = np.nonzero(sims >= threshold - 1e-4)  # float32 rounding slack
+        earlier = hits_col < hits_row + start
+        for row, col in zip(hits_row[earlier] + start, hits_col[earlier]):
+            if _sparse_dot(vectors, indptr, row, col) >= threshold:
+                parents.setdefault(int(row), []).append(int(col))
+    return {row: np.asarray(cols) for row, cols in parents.items()}
+
+
+def deduplicate(
+    records: List[Article],
+    threshold: float = DEFAULT_DUPLICATE_THRESHOLD,
+    n_features: int = DEFAULT_N_FEATURES,
+) -> List[Article]:
+    """
+    Drop near-duplicate records, keeping the first of each group in the given order.
+
+    Two records are near-duplicates when the cosine similarity of their TF-IDF vectors
+    is at least threshold. A record is dropped only if it duplicates a record that was
+    kept, so the result depends on nothing but the input order.
+    """
+    if len(records) < 2:
+        return list(records)
+    vectors, _ = tfidf_vectors([_record_text(r) for r in records], n_features)
+    parents = _duplicate_parents(vectors, threshold)
+    keep = np.ones(len(records), dtype=bool)
+    for row in sorted(parents):
+        if keep[parents[row]].any():
+            keep[row] = False
+    return [record for record, kept in zip(records, keep) if kept]
+
+
+def rank_by_similarity(
+    query: str,
+    records: List[Article],
+    n_features: int = DEFAULT_N_FEATURES,
+) -> List[Tuple[Article, float]]:
+    """
+    Return (record, cosine score) pairs ordered by similarity to the query.
+
+    Ties keep the incoming order, and scores are rounded so that ordering does not
+    depend on floating-point noise from the BLAS backend.
+    """
+    if not records:
+        return []
+    vectors, idf = tfidf_vectors([_record_text(r) for r in records], n_features)
+    query_vector = _query_vector(query, idf)
+    scores = np.bincount(
+        vectors.rows, weights=vectors.values * query_vector[vectors.cols], minlength=vectors.n_rows
+    )
+    scores = np.round(scores, 6)
+    order = np.argsort(-scores, kind="stable")
+    return [(records[i], float(scores[i])) for i in order]
+
+
+def rank_and_deduplicate(
+    query: str,
+    records: List[Article],
+    threshold: float = DEFAULT_DUPLICATE_THRESHOLD,
+    n_features: int = DEFAULT_N_FEATURES,
+) -> List[Article]:
+    """Order records by similarity to the query, then collapse near-duplicates."""
+    ranked = [record for record, _ in rank_by_similarity(query, records, n_features)]
+    return deduplicate(ranked, threshold, n_features)
@@ -0,0 +1,72 @@
+"""HTML rendering of the emailed literature package from string.Template files read once per process."""
+import functools
+import os
+from html import escape
+from string import Template
+from typing import Iterable
+
+from .article import Article
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+
+@functools.lru_cache(maxsize=None)
+def load_template(name: str) -> Template:
+    """
+    Read a string.Template ($name placeholders) from the templates directory, cached
+    after the first call. Values are substituted as given, so callers pass strings that
+    are already escaped.
+    """
+    with open(os.path.join(TEMPLATE_DIR, name), encoding="utf-8") as f:
+        return Template(f.read())
+
+
+def render_articles(articles: Iterable[Article]) -> str:
+    """Render the Articles section: one HTML-escaped block per article, numbered from 1."""
+    render_article = load_template("article.html").substitute
+    blocks = []
+    for number, article in enumerate(articles, start=1):
+        links_html = "<br>".join(
+            f'<a href="{escape(url)}" target="_blank">{escape(text, False)}</a>'
+            for text, url in article.display_links
+        )
+        blocks.append(render_article({
+            "number": str(number),
+            "title": escape(article.title or "Untitled", False),
+            "authors": escape(", ".join(article.authors) or "Unknown", False),
+            "journal": escape(article.journal or "Not specified", False),
+            "published_date": escape(article.published_date or "Not available", False),
+            "summary": escape(article.abstract or "No summary available", False),
+            "links": links_html or "No links available",
+        }))
+    return "".join(blocks)
+
+
+def render_synthesis(synthesis: str | None) -> str:
+    """Escape the synthesis and turn its ## / ### headings into <h4> / <h5>; other lines rely on pre-wrap."""
+    lines = []
+    for line in (synthesis or "No synthesis provided.").splitlines():
+        if line.startswith("## "):
+            lines.append(f"<h4>{escape(line[3:], False)}</h4>")
+        elif line.startswith("### "):
+            lines.append(f"<h5>{escape(line[4:], False)}</h5>")
+        else:
+            lines.append(escape(line, False))
+    return "\n".join(lines)
+
+
+def render(articles: Iterable[Article], synthesis: str | None) -> str:
+    """
+    Render the complete HTML body of a literature package email.
+
+    Args:
+        articles (iterable of Article): The articles to list.
+        synthesis (str): Narrative synthesis in Markdown.
+
+    Returns:
+        str: The HTML document, with every article and synthesis field HTML-escaped.
+    """
+    return load_template("literature_package.html").substitute({
+        "articles": render_articles(articles),
+        "synthesis": render_synthesis(synthesis),
+    })
@@ -0,0 +1,57 @@
+"""Fetched article lists kept in the PubMed cache and referenced from session state by ID."""
+import hashlib
+from typing import Iterable, List
+
+from .article import Article
+from .article_index import get_article_index
+from .pubmed_cache import get_pubmed_cache
+
+# Session state key holding the ID of the most recent search's result set.
+RESULT_SET_STATE_KEY = "result_set_id"
+
+
+def result_set_id(pmids: Iterable[str]) -> str:
+    """Stable ID for an ordered PMID list, so saving the same results twice reuses one entry."""
+    return "rs-" + hashlib.sha1(",".join(pmids).encode("utf-8")).hexdigest()[:16]
+
+
+def save_result_set(records: List[Article], metadata_only: Iterable[str] = ()) -> str:
+    """
+    Store records as a result set and return its ID.
+
+    The full records go into the PubMed record cache (they usually are already) and
+    the ordered PMID list under the ID, so session state only has to carry the ID.
+    Records in metadata_only are esummary stand-ins from an NCBI outage: only their
+    PMIDs are saved, so they are fetched in full once NCBI is back.
+    """
+    skip = set(metadata_only)
+    pmids = [record.pmid for record in records if record.pmid]
+    cache = get_pubmed_cache()
+    cache.put_records({record.pmid: record for record in records if record.pmid and record.pmid not in skip})
+    set_id = result_set_id(pmids)
+    cache.put_result_set(set_id, pmids)
+    return set_id
+
+
+def load_result_set(set_id: str) -> List[Article] | None:
+    """
+    Return the full records of a result set in their saved order, or None if the ID is unknown or expired.
+
+    Records evicted from the cache since the set was saved are read back from the
+    local article index, and any still missing (such as stand-ins saved during an
+    outage) are fetched from PubMed again.
+    """
+    cache = get_pubmed_cache()
+    pmids = cache.get_result_set(set_id)
+    if pmids is None:
+        return None
+    records = cache.get_records(pmids)
+    missing = [pmid for pmid in pmids if pmid not in records]
+    if missing:
+        records.update(get_article_index().get_records(missing))
+        missing = [pmid for pmid in missing if pmid not in records]
+    if missing:
+        # pubmed_tool imports this module, so it is imported here instead.
+        from .pubmed_tool import fetch_pubmed_records
+        records.update(fetch_pubmed_records(missing))
+    return [records[pmid] for pmid in pmids if pmid in records]
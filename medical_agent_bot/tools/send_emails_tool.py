@@ -1,14 +1,37 @@
-import os
-import csv
-import re
-import smtplib
-from typing import List, Dict, Union
-from io import StringIO
+import queue
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, List, Dict, Union
 from datetime import datetime, timezone
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
+from ..config import get_settings
+from .article import Article, as_articles
+from .csv_stream import csv_attachment, dict_rows, is_markdown_table, iter_csv_chunks, markdown_table_rows
+from .report_renderer import render, render_articles
+from .result_sets import RESULT_SET_STATE_KEY, load_result_set
+from .telemetry import get_tracer
+
+# email.mime, smtplib (via smtp_delivery) and google.adk are imported where they are
+# used, so loading the tools does not pay for them until an email is actually sent.
+if TYPE_CHECKING:
+    from email.mime.multipart import MIMEMultipart
+    from google.adk.tools import ToolContext
+
+def csv_rows(data: Union[str, List[List], List[Dict]]) -> Iterator[List] | None:
+    """
+    Return an iterator over the CSV rows of a Markdown table, list of lists, or list of dicts.
+    For Markdown, extracts URLs from links. Returns None for anything else.
+    """
+    if not data:
+        return None
+    # Handle Markdown table as string input
+    if isinstance(data, str):
+        return markdown_table_rows(data) if is_markdown_table(data) else None
+    # Handle list of dicts (headers in order of first appearance)
+    if isinstance(data, list) and all(isinstance(row, dict) for row in data):
+        return dict_rows(data)
+    # Handle list of lists/tuples
+    if isinstance(data, list) and all(isinstance(row, (list, tuple)) for row in data):
+        return iter(data)
+    return None
+
 
 def generate_csv_string(data: Union[str, List[List], List[Dict]]) -> str:
     """
@@ -17,246 +40,170 @@ def generate_csv_string(data: Union[str, List[List], List[Dict]]) -> str:
     """
     if not data:
         return "No data available"
-    
-    output = StringIO()
-
-    # Handle Markdown table as string input
-    if isinstance(data, str):
-        lines = [line.strip() for line in data.strip().split('\n')]
-        # Check for Markdown table format
-        if lines and lines[0].startswith('|') and lines[0].endswith('|'):
-            rows = []
-            link_re = re.compile(r'\[.*?\]\((.*?)\)')
-            for line in lines:
-                if not (line.startswith('|') and line.endswith('|')):
-                    continue
-                # Skip separator lines
-                cells = [cell.strip() for cell in line[1:-1].split('|')]
-                if all(set(cell) <= set('-: ') for cell in cells if cell):
-                    continue
-                processed = [
-                    (link_re.search(cell).group(1) if link_re.search(cell) else cell)
-                    for cell in cells
-                ]
-                rows.append(processed)
-            if rows:
-                csv.writer(output, quoting=csv.QUOTE_ALL).writerows(rows)
-                return output.getvalue()
-        return data
-
-    # Handle list of dicts
-    if isinstance(data, list) and data and all(isinstance(row, dict) for row in data):
-        # Gather unique headers in order of first appearance
-        headers = []
-        seen = set()
-        for d in data:
-            for key in d:
-                if key not in seen:
-                    headers.append(key)
-                    seen.add(key)
-        writer = csv.DictWriter(output, fieldnames=headers, quoting=csv.QUOTE_ALL)
-        writer.writeheader()
-        writer.writerows(data)
-        return output.getvalue()
-    
-    # Handle list of lists/tuples
-    if isinstance(data, list) and data and all(isinstance(row, (list, tuple)) for row in data):
-        csv.writer(output, quoting=csv.QUOTE_ALL).writerows(data)
-        return output.getvalue()
-
-    # Fallback: write whatever was passed
-    return str(data)
+    rows = csv_rows(data)
+    if rows is None:
+        # Fallback: write whatever was passed
+        return data if isinstance(data, str) else str(data)
+    csv_text = "".join(chunk.decode("utf-8") for chunk in iter_csv_chunks(rows))
+    return csv_text or (data if isinstance(data, str) else str(data))
 
 def build_articles_html(articles: List[dict]) -> str:
     """
     Build the HTML content for the articles section.
     """
-    html = []
-    # link_re removed as direct URLs are used from art.get('url')
-    for idx, art in enumerate(articles):
-        # Authors formatting
-        authors_data = art.get('authors', 'Unknown') # Key changed to lowercase 'authors'
-        authors_text = 'Unknown'
-        if isinstance(authors_data, list):
-            authors_text = ', '.join(str(author).strip() for author in authors_data if str(author).strip())
-            if not authors_text: # Handle list of empty strings or only whitespace strings
-                authors_text = 'Unknown'
-        elif isinstance(authors_data, str) and authors_data.strip():
-            authors_text = authors_data.strip()
-        # Ensure authors_text defaults to 'Unknown' if not properly set above
-        if not authors_text or authors_text.isspace():
-             authors_text = 'Unknown'
-        
-        # Links formatting - Try 'links' key first, then 'url' key
-        links_html_parts = []
-        processed_urls = set()  # To avoid duplicate links
-
-        # Check 'links' key (expected to be a list of markdown links)
-        links_list_data = art.get('links', [])
-        if isinstance(links_list_data, list):
-            for item in links_list_data:
-                if not isinstance(item, str):
-                    continue
-                # Handle markdown link format: [text](url)
-                match = re.search(r'\[(.*?)\]\((https?://[^\s)]+)\)', item)
-                if match:
-                    link_text, url = match.groups()
-                    if url not in processed_urls:
-                        links_html_parts.append(f'<a href="{url}" target="_blank">{link_text}</a>')
-                        processed_urls.add(url)
-                # Also check if it's a plain URL
-                elif item.startswith('http') and item not in processed_urls:
-                    links_html_parts.append(f'<a href="{item}" target="_blank">{item}</a>')
-                    processed_urls.add(item)
-        
-        # Check 'url' key (could be a single string or a list of markdown links)
-        url_data = art.get('url')
-        if isinstance(url_data, str):
-            # Handle single markdown link
-            match = re.search(r'\[(.*?)\]\((https?://[^\s)]+)\)', url_data)
-            if match:
-                link_text, url = match.groups()
-                if url not in processed_urls:
-                    links_html_parts.append(f'<a href="{url}" target="_blank">{link_text}</a>')
-                    processed_urls.add(url)
-            # Handle plain URL
-            elif url_data.startswith('http') and url_data not in processed_urls:
-                links_html_parts.append(f'<a href="{url_data}" target="_blank">{url_data}</a>')
-                processed_urls.add(url_data)
-        elif isinstance(url_data, list):
-            for item in url_data:
-                if not isinstance(item, str):
-                    continue
-                # Handle markdown link format
-                match = re.search(r'\[(.*?)\]\((https?://[^\s)]+)\)', item)
-                if match:
-                    link_text, url = match.groups()
-                    if url not in processed_urls:
-                        links_html_parts.append(f'<a href="{url}" target="_blank">{link_text}</a>')
-                        processed_urls.add(url)
-                # Handle plain URL
-                elif item.startswith('http') and item not in processed_urls:
-                    links_html_parts.append(f'<a href="{item}" target="_blank">{item}</a>')
-                    processed_urls.add(item)
-
-        links_html_display = '<br>'.join(links_html_parts) if links_html_parts else 'No links available'
-
-        html.append(f"""
-        <div class="article">
-            <h4>ARTICLE #{idx + 1}</h4>
-            <div class="article-field"><strong>Title:</strong> {art.get('title', 'Untitled')}</div>
-            <div class="article-field"><strong>Authors:</strong> {authors_text}</div>
-            <div class="article-field"><strong>Journal:</strong> {art.get('journal', 'Not specified')}</div>
-            <div class="article-field"><strong>Publication Date:</strong> {art.get('published_date', 'Not available')}</div>
-            <div class="article-field"><strong>Summary:</strong>
-                <div class="summary">{art.get('summary', 'No summary available')}</div>
-            </div>
-            <div class="article-links"><strong>Links:</strong><br>{links_html_display}</div>
-        </div>
-        """)
-    return ''.join(html)
+    return render_articles(as_articles(articles))
 
 def send_email(
     synthesis: str,
-    csv_data: str,  
-    fetched_articles: list[dict],  
-    recipient_email: str
+    csv_data: str,
+    recipient_email: str,
+    tool_context: "ToolContext | None" = None,
 ) -> str:
     """
-       1. synthesis: 
-    2. csv: The evidence matrix/metrics as a CSV string
-    3. fetched_articles: A list of article dictionaries
-    4. recipient_email: The email address of the recipient from the collect_email_tool
-    
+    1. synthesis: The narrative synthesis in Markdown
+    2. csv_data: The evidence matrix as a CSV string or Markdown table
+    3. recipient_email: The email address of the recipient from the collect_email_tool
+
+    The articles are not passed in: they are the full records of the most recent search,
+    read from the result set referenced in session state.
+
     Your job:
     1. Compose an email that includes:
        - A heading/title
        - An "Articles" section that lists each article with its title, authors, journal, publication date, summary, and links
-       from the fetched_articles list 
        - A "Synthesis" section that displays the synthesis text in a styled box
        - The evidence matrix attached as a CSV file
-    2. Send the email using SMTP settings from environment variables:
+    2. Queue the email for background delivery using SMTP settings from environment variables:
        - SMTP_USER (required)
        - SMTP_PASSWORD (required)
        - SMTP_HOST (default: smtp.gmail.com)
        - SMTP_PORT (default: 587)
-    3. Return "Email sent successfully." if the email is sent, otherwise return an error description.
+    3. Return "Email queued for delivery. Delivery ID: <id>" once the email is queued, otherwise
+       return an error description. Use get_email_delivery_status with the delivery ID to check
+       whether it has been sent.
     """
-    # Load SMTP settings from environment
-    SMTP_USER = os.getenv("SMTP_USER")
-    SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
-    SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
-    SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
+    articles: List[Article] = []
+    set_id = tool_context.state.get(RESULT_SET_STATE_KEY) if tool_context is not None else None
+    if set_id:
+        loaded = load_result_set(set_id)
+        if loaded is None:
+            return "Error: the fetched articles have expired. Please run the search again."
+        articles = loaded
+    return send_literature_package(synthesis, csv_data, articles, recipient_email)
 
-    if not SMTP_USER or not SMTP_PASSWORD:
-        return "Error: SMTP_USER and SMTP_PASSWORD must be set in environment variables."
 
-    # Prepare CSV
-    final_csv = generate_csv_string(csv_data)
-    if not final_csv or final_csv.strip() == "No data available":
-        final_csv = None
+def build_literature_message(
+    synthesis: str,
+    csv_data: Union[str, List[List], List[Dict]],
+    articles: Iterable[Article | Dict[str, Any]],
+    sender: str,
+    recipient_email: str,
+) -> "MIMEMultipart":
+    """
+    Assemble the literature package email: HTML articles and synthesis, evidence matrix as CSV.
+
+    Args:
+        synthesis (str): Narrative synthesis in Markdown.
+        csv_data: Evidence matrix as a Markdown table, CSV string, list of lists or list of dicts.
+        articles (iterable of Article or dict): The articles to list.
+        sender (str): From address.
+        recipient_email (str): Recipient address.
+
+    Returns:
+        MIMEMultipart: The message, ready to send.
+    """
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
 
     # Email headers
     now = datetime.now(timezone.utc).strftime("%Y-%m-%d")
     msg = MIMEMultipart()
     msg['Subject'] = f"Literature Package – {now} (UTC)"
-    msg['From'] = SMTP_USER
+    msg['From'] = sender
     msg['To'] = recipient_email
 
-    # Prepare synthesis: replace Markdown headings with HTML, relying on pre-wrap for other formatting
-    synthesis_text = synthesis or "No synthesis provided."
-    synthesis_lines = synthesis_text.splitlines()
-    formatted_lines = []
-    for line in synthesis_lines:
-        if line.startswith('## '):
-            formatted_lines.append(f"<h4>{line[3:]}</h4>")
-        elif line.startswith('### '):
-            formatted_lines.append(f"<h5>{line[4:]}</h5>")
+    tracer = get_tracer()
+
+    # Email HTML body (templates are compiled once; all fields are HTML-escaped)
+    with tracer.span("email.render_html") as span:
+        articles = list(as_articles(articles))
+        html = render(articles, synthesis)
+        msg.attach(MIMEText(html, "html"))
+        span.set_attributes(articles=len(articles), html_chars=len(html))
+
+    # Attach CSV (if present), streamed from the rows straight into the base64 payload
+    with tracer.span("email.attach_csv") as span:
+        rows = csv_rows(csv_data)
+        if rows is not None:
+            chunks = iter_csv_chunks(rows)
+        elif isinstance(csv_data, str) and csv_data.strip():
+            chunks = [csv_data.encode("utf-8")]
         else:
-            formatted_lines.append(line) # Keep other lines as is, pre-wrap will handle newlines
-    formatted_synthesis = '\n'.join(formatted_lines)
+            chunks = []
+        part = csv_attachment(chunks, "evidence_matrix.csv")
+        if part is not None:
+            msg.attach(part)
+            span.set_attribute("base64_bytes", len(part.get_payload()))
+    return msg
+
 
-    # Email HTML body
-    html = f"""
-    <html>
-    <head>
-        <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; max-width: 800px; margin: 0 auto; padding: 20px; }}
-            h2 {{ color: #2c5282; margin-bottom: 20px; }}
-            h3 {{ color: #2d3748; margin-top: 25px; }}
-            .synthesis {{ background-color: #f7fafc; padding: 20px; border-radius: 5px; margin: 20px 0; white-space: pre-wrap; }}
-            .article {{ margin: 20px 0; padding: 15px; background-color: #f8f9fa; border-left: 4px solid #4a5568; }}
-            .article-field strong {{ color: #4a5568; }}
-            .article-links {{ margin-top: 10px; }}
-            .summary {{ background-color: #fff; padding: 10px; margin-top: 10px; border-left: 2px solid #718096; }}
-        </style>
-    </head>
-    <body>
-        <h2>Literature Package</h2>
-        <h3>Articles</h3>
-        {build_articles_html(fetched_articles)}
-        <h3>Synthesis</h3>
-        <div class="synthesis">{formatted_synthesis}</div>
-        <p>See attachment for the structured evidence matrix.</p>
-    </body>
-    </html>
+def send_literature_package(
+    synthesis: str,
+    csv_data: Union[str, List[List], List[Dict]],
+    articles: Iterable[Article | Dict[str, Any]],
+    recipient_email: str,
+) -> str:
     """
-    msg.attach(MIMEText(html, "html"))
+    Build the literature package email and queue it for delivery.
+
+    Args:
+        synthesis (str): Narrative synthesis in Markdown.
+        csv_data: Evidence matrix as a Markdown table, CSV string, list of lists or list of dicts.
+        articles (iterable of Article or dict): The articles to list.
+        recipient_email (str): Recipient address.
 
-    # Attach CSV (if present)
-    if final_csv:
-        part = MIMEBase('text', 'csv')
-        part.set_payload(final_csv.encode('utf-8'))
-        encoders.encode_base64(part)
-        part.add_header('Content-Disposition', 'attachment', filename="evidence_matrix.csv")
-        msg.attach(part)
+    Returns:
+        str: "Email queued for delivery. Delivery ID: <id>", or an error description.
+    """
+    smtp = get_settings().smtp
+    if not smtp.has_credentials:
+        return "Error: SMTP_USER and SMTP_PASSWORD must be set in environment variables."
+
+    from .smtp_delivery import get_email_delivery_queue
+
+    msg = build_literature_message(synthesis, csv_data, articles, smtp.user, recipient_email)
+
+    # Hand off to the background delivery queue (pooled SMTP connections, retries)
+    with get_tracer().span("email.queue") as span:
+        try:
+            delivery_id = get_email_delivery_queue().submit(msg)
+        except queue.Full:
+            span.end("queue full")
+            return "Error: too many emails are waiting to be sent. Please try again in a few minutes."
+        except Exception as e:
+            span.end(e)
+            return f"Error: {e}"
+        span.set_attribute("delivery_id", delivery_id)
+    return f"Email queued for delivery. Delivery ID: {delivery_id}"
+
+
+def get_email_delivery_status(delivery_id: str) -> Dict[str, Any]:
+    """
+    Look up the delivery status of an email queued by send_email.
+
+    Args:
+        delivery_id (str): The Delivery ID returned by send_email.
+
+    Returns:
+        dict: Contains:
+            - status (str): "queued", "sending", "retrying", "sent", "failed", or "unknown".
+            - recipient (str): The recipient address.
+            - attempts (int): Delivery attempts made so far.
+            - error (str | None): The last delivery error, if any.
+    """
+    from .smtp_delivery import get_email_delivery_queue
 
-    # Send via SMTP
-    try:
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USER, SMTP_PASSWORD)
-            server.send_message(msg)
-        return "Email sent successfully."
-    except Exception as e:
-        return f"Error: {e}"
+    status = get_email_delivery_queue().status(delivery_id.strip())
+    if status is None:
+        return {"status": "unknown", "recipient": "", "attempts": 0, "error": f"No email with delivery ID {delivery_id}"}
+    return {key: status[key] for key in ("status", "recipient", "attempts", "error")}
@@ -0,0 +1,420 @@
+"""Background email delivery: pooled, authenticated SMTP connections behind a bounded retry queue."""
+import atexit
+import heapq
+import itertools
+import queue
+import smtplib
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from email.message import Message
+from typing import Any, Dict, Iterator, List, Tuple
+
+from ..config import get_settings
+from .telemetry import Span, current_span, get_tracer
+
+QUEUED = "queued"
+SENDING = "sending"
+RETRYING = "retrying"
+SENT = "sent"
+FAILED = "failed"
+
+# SMTP replies in this range are temporary (RFC 5321 4yz) and worth retrying.
+_TRANSIENT_CODES = range(400, 500)
+
+
+def is_transient_error(error: Exception) -> bool:
+    """True for failures a later attempt may fix: 4xx replies, dropped connections, network errors."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code in _TRANSIENT_CODES for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code in _TRANSIENT_CODES
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    # Every SMTPException is an OSError; the remaining ones (no AUTH or STARTTLS support,
+    # no usable login method) come from the server's setup and recur on every attempt.
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    return isinstance(error, OSError)
+
+
+class SMTPConnectionPool:
+    """
+    Pool of logged-in SMTP connections that are reused across messages.
+
+    A connection is opened (connect, STARTTLS, login) only when no idle one is
+    available, and handed back after each message instead of being closed. Idle
+    connections older than max_idle seconds are checked with NOOP before reuse,
+    since servers drop them after a few minutes.
+
+    Args:
+        host (str): SMTP server host.
+        port (int): SMTP server port.
+        user (str | None): Login user; no AUTH when empty.
+        password (str | None): Login password.
+        size (int): Maximum number of open connections.
+        starttls (bool): Upgrade connections with STARTTLS before logging in.
+        timeout (float): Socket timeout for connect and commands, in seconds.
+        max_idle (float): Idle time after which a connection is checked before reuse.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str | None = None,
+        password: str | None = None,
+        size: int = 2,
+        starttls: bool = True,
+        timeout: float = 30.0,
+        max_idle: float = 60.0,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.size = size
+        self.starttls = starttls
+        self.timeout = timeout
+        self.max_idle = max_idle
+
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []
+        self._counters = {"opened": 0, "reused": 0, "discarded": 0}
+
+    def _open(self) -> smtplib.SMTP:
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                conn.starttls()
+            if self.user:
+                conn.login(self.user, self.password or "")
+        except Exception:
+            conn.close()
+            raise
+        with self._lock:
+            self._counters["opened"] += 1
+        return conn
+
+    @staticmethod
+    def _quit(conn: smtplib.SMTP) -> None:
+        try:
+            conn.quit()
+        except Exception:
+            conn.close()
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, released_at = self._idle.pop()
+            if time.monotonic() - released_at < self.max_idle:
+                with self._lock:
+                    self._counters["reused"] += 1
+                return conn
+            try:
+                if conn.noop()[0] == 250:
+                    with self._lock:
+                        self._counters["reused"] += 1
+                    return conn
+            except Exception:
+                pass
+            self._discard(conn)
+        return self._open()
+
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        """
+        Borrow a connection for the duration of the block.
+
+        If the block raises, the connection is reset and returned to the pool when the
+        server rejected the message (it is still usable), and closed otherwise.
+        """
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+        except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+            self._reset_or_discard(conn)
+            raise
+        except Exception:
+            if conn is not None:
+                self._discard(conn)
+            raise
+        else:
+            with self._lock:
+                self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def _discard(self, conn: smtplib.SMTP) -> None:
+        conn.close()
+        with self._lock:
+            self._counters["discarded"] += 1
+
+    def _reset_or_discard(self, conn: smtplib.SMTP | None) -> None:
+        if conn is None:
+            return
+        try:
+            conn.rset()
+        except Exception:
+            self._discard(conn)
+            return
+        with self._lock:
+            self._idle.append((conn, time.monotonic()))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._counters, "idle": len(self._idle), "size": self.size}
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._quit(conn)
+
+
+class EmailDeliveryQueue:
+    """
+    Bounded queue of outgoing messages, delivered by worker threads through a pool.
+
+    submit() only records the message and returns a delivery id, so callers never
+    wait on the SMTP server. Failed attempts with a transient cause are retried with
+    exponential backoff up to max_attempts; permanent rejections fail at once. Every
+    message has a status (queued, sending, retrying, sent, failed) that can be looked
+    up by id until it ages out of the last status_history entries.
+
+    Args:
+        pool (SMTPConnectionPool): Connections used to send.
+        max_pending (int): Maximum number of messages not yet sent or failed.
+        workers (int): Delivery threads (defaults to the pool size).
+        max_attempts (int): Attempts per message, including the first.
+        backoff_factor (float): Delay before retry n is backoff_factor * 2 ** (n - 1) seconds.
+        status_history (int): Finished messages whose status is kept for lookup.
+    """
+
+    def __init__(
+        self,
+        pool: SMTPConnectionPool,
+        max_pending: int = 100,
+        workers: int | None = None,
+        max_attempts: int = 4,
+        backoff_factor: float = 2.0,
+        status_history: int = 1000,
+    ):
+        self.pool = pool
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.status_history = status_history
+
+        self._cond = threading.Condition()
+        self._messages: Dict[str, Message] = {}
+        self._ready: deque = deque()
+        self._delayed: List[Tuple[float, int, str]] = []
+        self._sequence = itertools.count()
+        self._statuses: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Span current when each message was submitted, so send attempts join its trace.
+        self._trace_parents: Dict[str, Span | None] = {}
+        self._counters = {"submitted": 0, "sent": 0, "failed": 0, "retries": 0, "rejected": 0}
+        self._closed = False
+
+        self._workers = [
+            threading.Thread(target=self._work, name=f"email-delivery-{i}", daemon=True)
+            for i in range(workers or pool.size)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, message: Message) -> str:
+        """
+        Queue a message for delivery and return its delivery id.
+
+        Raises:
+            queue.Full: If max_pending messages are already waiting.
+            RuntimeError: If the queue has been closed.
+        """
+        delivery_id = uuid.uuid4().hex
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("email delivery queue is closed")
+            if len(self._messages) >= self.max_pending:
+                self._counters["rejected"] += 1
+                raise queue.Full(f"{len(self._messages)} emails are already waiting for delivery")
+            self._messages[delivery_id] = message
+            self._trace_parents[delivery_id] = current_span()
+            self._ready.append(delivery_id)
+            self._statuses[delivery_id] = {
+                "id": delivery_id,
+                "status": QUEUED,
+                "recipient": message.get("To", ""),
+                "attempts": 0,
+                "error": None,
+                "updated_at": time.time(),
+            }
+            self._counters["submitted"] += 1
+            self._cond.notify()
+        return delivery_id
+
+    def status(self, delivery_id: str) -> Dict[str, Any] | None:
+        """Return a copy of a message's delivery status, or None if the id is unknown."""
+        with self._cond:
+            entry = self._statuses.get(delivery_id)
+            return dict(entry) if entry is not None else None
+
+    def wait(self, delivery_id: str, timeout: float | None = None) -> Dict[str, Any] | None:
+        """Block until the message is sent or has failed (or timeout), then return its status."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while delivery_id in self._messages:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            entry = self._statuses.get(delivery_id)
+            return dict(entry) if entry is not None else None
+
+    def _update(self, delivery_id: str, **fields: Any) -> None:
+        self._statuses[delivery_id].update(fields, updated_at=time.time())
+
+    def _next(self) -> str | None:
+        """Wait for the next message that is due, or return None once closed and drained."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                while self._delayed and self._delayed[0][0] <= now:
+                    self._ready.append(heapq.heappop(self._delayed)[2])
+                if self._ready:
+                    delivery_id = self._ready.popleft()
+                    self._update(delivery_id, status=SENDING)
+                    return delivery_id
+                if self._closed and not self._messages:
+                    return None
+                self._cond.wait(self._delayed[0][0] - now if self._delayed else None)
+
+    def _work(self) -> None:
+        while True:
+            delivery_id = self._next()
+            if delivery_id is None:
+                return
+            with self._cond:
+                message = self._messages[delivery_id]
+                attempt = self._statuses[delivery_id]["attempts"] + 1
+                self._update(delivery_id, attempts=attempt)
+                parent = self._trace_parents.get(delivery_id)
+            span = get_tracer().start_span(
+                "smtp.send", {"delivery_id": delivery_id, "attempt": attempt}, parent=parent
+            )
+            try:
+                with self.pool.connection() as conn:
+                    conn.send_message(message)
+            except Exception as e:
+                span.end(e)
+                self._failed(delivery_id, attempt, e)
+            else:
+                span.end()
+                with self._cond:
+                    del self._messages[delivery_id]
+                    self._trace_parents.pop(delivery_id, None)
+                    self._update(delivery_id, status=SENT, error=None)
+                    self._counters["sent"] += 1
+                    self._trim_history()
+                    self._cond.notify_all()
+
+    def _failed(self, delivery_id: str, attempt: int, error: Exception) -> None:
+        with self._cond:
+            if attempt < self.max_attempts and is_transient_error(error):
+                due = time.monotonic() + self.backoff_factor * 2 ** (attempt - 1)
+                heapq.heappush(self._delayed, (due, next(self._sequence), delivery_id))
+                self._update(delivery_id, status=RETRYING, error=str(error))
+                self._counters["retries"] += 1
+            else:
+                del self._messages[delivery_id]
+                self._trace_parents.pop(delivery_id, None)
+                self._update(delivery_id, status=FAILED, error=str(error))
+                self._counters["failed"] += 1
+                self._trim_history()
+                print(f"Email delivery {delivery_id} failed after {attempt} attempt(s): {error}")
+            self._cond.notify_all()
+
+    def _trim_history(self) -> None:
+        finished = len(self._statuses) - len(self._messages)
+        for delivery_id in list(self._statuses):
+            if finished <= self.status_history:
+                break
+            if delivery_id not in self._messages:
+                del self._statuses[delivery_id]
+                finished -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                **self._counters,
+                "pending": len(self._messages),
+                "scheduled_retries": len(self._delayed),
+                "pool": self.pool.stats(),
+            }
+
+    def close(self, timeout: float | None = None) -> None:
+        """
+        Stop accepting messages, deliver what is pending, then close the pool.
+
+        Args:
+            timeout (float | None): Seconds to wait for pending messages in total;
+                messages still undelivered after that are reported and dropped.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for worker in self._workers:
+            worker.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+        with self._cond:
+            pending = len(self._messages)
+        if pending:
+            print(f"Email delivery stopped with {pending} message(s) undelivered")
+        self.pool.close()
+
+
+_queue: EmailDeliveryQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def get_email_delivery_queue() -> EmailDeliveryQueue:
+    """
+    Return the process-wide delivery queue, configured from the SMTP settings.
+
+    SMTP_HOST, SMTP_PORT, SMTP_USER and SMTP_PASSWORD select the server;
+    SMTP_STARTTLS=0 disables STARTTLS (e.g. for a local test server),
+    SMTP_POOL_SIZE sets the number of connections, EMAIL_WORKERS the delivery
+    threads (one per connection by default), and EMAIL_QUEUE_SIZE bounds the
+    number of undelivered messages.
+
+    The worker threads are daemons, so at interpreter exit the queue is closed
+    and given up to EMAIL_FLUSH_TIMEOUT seconds to deliver what is still pending.
+    """
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                settings = get_settings()
+                smtp = settings.smtp
+                pool = SMTPConnectionPool(
+                    host=smtp.host,
+                    port=smtp.port,
+                    user=smtp.user,
+                    password=smtp.password,
+                    size=smtp.pool_size,
+                    starttls=smtp.starttls,
+                    timeout=smtp.timeout,
+                )
+                _queue = EmailDeliveryQueue(
+                    pool, max_pending=smtp.queue_size, workers=settings.concurrency.email_workers
+                )
+                atexit.register(_queue.close, smtp.flush_timeout)
+    return _queue
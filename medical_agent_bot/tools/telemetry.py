@@ -0,0 +1,465 @@
+"""Lightweight tracing: spans with attributes, per-stage latency histograms and offline exporters."""
+import bisect
+import contextlib
+import contextvars
+import functools
+import inspect
+import json
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence
+
+from ..config import get_settings
+
+DEFAULT_SPANS_PATH = os.path.join(os.path.expanduser("~"), ".cache", "medical_search_pro", "spans.jsonl")
+
+# Upper bucket bounds in milliseconds, roughly log-spaced from cache lookups and
+# per-article parsing up to minute-long LLM turns; the last bucket is open-ended.
+DEFAULT_BUCKETS_MS = (
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500,
+    1000, 2500, 5000, 10000, 30000, 60000,
+)
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+
+class Span:
+    """
+    One timed operation, in the OpenTelemetry shape: name, trace/span/parent IDs,
+    start time, duration, attributes and a status.
+
+    Spans are created by Tracer.span() or Tracer.start_span() and finished with end().
+    """
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "start_time", "duration_ms",
+        "attributes", "status", "error", "_tracer", "_start",
+    )
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent_id: str | None, attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_time = time.time()
+        self.duration_ms: float | None = None
+        self.attributes = attributes
+        self.status = STATUS_OK
+        self.error: str | None = None
+        self._tracer = tracer
+        self._start = time.perf_counter()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add(self, key: str, amount: float = 1) -> None:
+        """Increment a numeric attribute, such as a byte or retry counter."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def end(self, error: BaseException | str | None = None) -> None:
+        """Finish the span (once), recording an error status if one is given."""
+        if self.duration_ms is not None:
+            return
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+        if error is not None:
+            self.status = STATUS_ERROR
+            self.error = error if isinstance(error, str) else f"{type(error).__name__}: {error}"
+        self._tracer._finish(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": dict(self.attributes),
+        }
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram with count, sum, min and max.
+
+    Percentiles are estimated by linear interpolation inside the bucket that holds
+    them, so memory stays constant however many observations are recorded.
+    """
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.bounds = tuple(buckets_ms)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value_ms: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds, value_ms)] += 1
+            self.count += 1
+            self.sum += value_ms
+            self.min = min(self.min, value_ms)
+            self.max = max(self.max, value_ms)
+
+    def percentile(self, q: float) -> float:
+        """Estimated q-th percentile (0-100) in milliseconds, 0.0 when empty."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = q / 100 * self.count
+            seen = 0
+            for index, bucket_count in enumerate(self.counts):
+                if bucket_count and seen + bucket_count >= rank:
+                    lower = self.bounds[index - 1] if index > 0 else 0.0
+                    upper = self.bounds[index] if index < len(self.bounds) else self.max
+                    lower, upper = max(lower, self.min), min(upper, self.max)
+                    return lower + (upper - lower) * (rank - seen) / bucket_count
+                seen += bucket_count
+            return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total, low, high = self.count, self.sum, self.min, self.max
+        return {
+            "count": count,
+            "mean_ms": total / count if count else 0.0,
+            "min_ms": low if count else 0.0,
+            "max_ms": high,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+        }
+
+
+class InMemorySpanExporter:
+    """Keeps the most recent finished spans in memory, for tests and ad-hoc inspection."""
+
+    def __init__(self, max_spans: int = 10_000):
+        self._spans: deque = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, span: Dict[str, Any]) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self, name: str | None = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [span for span in self._spans if name is None or span["name"] == name]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class JsonFileSpanExporter:
+    """Appends every finished span as one JSON line to a file; works fully offline."""
+
+    def __init__(self, path: str = DEFAULT_SPANS_PATH):
+        self.path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, span: Dict[str, Any]) -> None:
+        line = json.dumps(span, default=str, separators=(",", ":")) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+_current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """
+    Creates spans, tracks the current span per task, feeds a histogram per span name
+    and hands finished spans to the exporters. Named counters record how often
+    paths without a span of their own fire (fallbacks, hedges, rejected calls).
+
+    A span started while another is current becomes its child and shares its trace
+    ID; contextvars carry the current span into asyncio tasks and worker threads
+    started with contextvars.copy_context() or asyncio.to_thread.
+
+    Args:
+        exporters (iterable): Objects with an export(span_dict) method.
+        buckets_ms (sequence): Histogram bucket bounds in milliseconds.
+    """
+
+    def __init__(self, exporters: Iterable[Any] = (), buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.exporters = list(exporters)
+        self.buckets_ms = tuple(buckets_ms)
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def start_span(
+        self,
+        name: str,
+        attributes: Dict[str, Any] | None = None,
+        parent: Span | None = None,
+        trace_id: str | None = None,
+    ) -> Span:
+        """Start a span without making it current; the caller must end() it."""
+        parent = parent if parent is not None else _current_span.get()
+        if parent is not None:
+            return Span(self, name, parent.trace_id, parent.span_id, dict(attributes or {}))
+        return Span(self, name, trace_id or secrets.token_hex(16), None, dict(attributes or {}))
+
+    @contextlib.contextmanager
+    def span(self, name: str, trace_id: str | None = None, **attributes: Any) -> Iterator[Span]:
+        """
+        Run the with-block in a new current span, ended (with any exception recorded) on exit.
+
+        Without a current span, the span starts a new trace, with trace_id if given.
+        """
+        span = self.start_span(name, attributes, trace_id=trace_id)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except GeneratorExit:
+            # A generator running in the span was closed before it finished: not an error.
+            raise
+        except BaseException as e:
+            span.end(e)
+            raise
+        finally:
+            _reset_current_span(token)
+            span.end()
+
+    def traced(self, name: str | None = None) -> Callable:
+        """Decorator running each call of a function or coroutine function in a span."""
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__qualname__
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(span_name):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def histogram(self, name: str) -> Histogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram(self.buckets_ms))
+        return histogram
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def counters(self) -> Dict[str, int]:
+        """Return every named counter."""
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def _finish(self, span: Span) -> None:
+        self.histogram(span.name).observe(span.duration_ms)
+        if self.exporters:
+            record = span.to_dict()
+            for exporter in self.exporters:
+                try:
+                    exporter.export(record)
+                except Exception as e:
+                    print(f"Error exporting span {span.name}: {e}")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return a latency summary (count, mean, min, max, p50/p95/p99) per span name."""
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {name: histogram.snapshot() for name, histogram in sorted(histograms.items())}
+
+    def reset(self) -> None:
+        """Drop all histograms and counters (exporters are kept)."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+def current_span() -> Span | None:
+    """Return the span the caller is running in, if any."""
+    return _current_span.get()
+
+
+def _reset_current_span(token: contextvars.Token) -> None:
+    _reset_context(_current_span, token)
+
+
+def _reset_context(var: contextvars.ContextVar, token: contextvars.Token) -> None:
+    try:
+        var.reset(token)
+    except ValueError:
+        # Ended from a different context than it was started in (e.g. an async
+        # generator finalised by another task), which never had the span as current.
+        pass
+
+
+def _exporters_from_settings() -> List[Any]:
+    settings = get_settings().telemetry
+    exporters: List[Any] = []
+    for name in settings.exporters:
+        if name == "memory":
+            exporters.append(InMemorySpanExporter())
+        elif name == "json":
+            exporters.append(JsonFileSpanExporter(settings.json_path or DEFAULT_SPANS_PATH))
+    return exporters
+
+
+_tracer: Tracer | None = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer, exporting to the TELEMETRY_EXPORTERS list (memory, json)."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer(_exporters_from_settings())
+    return _tracer
+
+
+# -- ADK agents ---------------------------------------------------------------
+#
+# Every agent run is one agent.<name> span, opened and closed around the agent's
+# _run_async_impl, with the invocation ID as trace ID so every stage of one request
+# lands in the same trace. Model and tool calls are traced with before/after callbacks
+# (LLM_CALLBACKS). Their open spans belong to the agent run they were opened in, not
+# to a process-wide table: any still open when the run ends (the model or a tool
+# raised, or the run was cancelled, so no after callback came) are ended with it, and
+# the current span is restored to the agent's.
+
+# Spans opened by model and tool callbacks in the current agent run, by call.
+_run_calls: contextvars.ContextVar[Dict[tuple, tuple] | None] = contextvars.ContextVar(
+    "telemetry_run_calls", default=None
+)
+
+
+def traced_agent(cls):
+    """
+    Class decorator for ADK agents: run each _run_async_impl call in an agent.<name> span.
+
+    The span is a with-block around the agent's events, so it is ended and the current
+    span restored however the run ends: finished, raised or cancelled. Model and tool
+    spans opened by LLM_CALLBACKS during the run are ended with it at the latest.
+    """
+    run_async_impl = cls._run_async_impl
+
+    @functools.wraps(run_async_impl)
+    async def _run_async_impl(self, ctx):
+        with get_tracer().span(f"agent.{self.name}", trace_id=ctx.invocation_id, agent=self.name):
+            calls: Dict[tuple, tuple] = {}
+            scope = _run_calls.set(calls)
+            error: BaseException | str = "agent run ended before the call finished"
+            try:
+                async with contextlib.aclosing(run_async_impl(self, ctx)) as events:
+                    async for event in events:
+                        yield event
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                # Newest first, so each reset restores the span that was current before it.
+                for key in reversed(list(calls)):
+                    _close(key, error)
+                _reset_context(_run_calls, scope)
+
+    cls._run_async_impl = _run_async_impl
+    return cls
+
+
+def _open(key: tuple, name: str, attributes: Dict[str, Any], trace_id: str) -> None:
+    calls = _run_calls.get()
+    if calls is None:
+        return  # not inside a traced_agent run: nothing would end a leftover span
+    span = get_tracer().start_span(name, attributes, trace_id=trace_id)
+    calls[key] = (span, _current_span.set(span))
+
+
+def _close(key: tuple, error: BaseException | str | None = None, **attributes: Any) -> Span | None:
+    calls = _run_calls.get()
+    entry = calls.pop(key, None) if calls is not None else None
+    if entry is None:
+        return None
+    span, token = entry
+    _reset_current_span(token)
+    span.set_attributes(**attributes)
+    span.end(error)
+    return span
+
+
+def before_model_callback(callback_context, llm_request) -> None:
+    _open(
+        ("model",),
+        f"llm.{callback_context.agent_name}",
+        {"agent": callback_context.agent_name, "model": getattr(llm_request, "model", None)},
+        callback_context.invocation_id,
+    )
+    return None
+
+
+def after_model_callback(callback_context, llm_response) -> None:
+    usage = getattr(llm_response, "usage_metadata", None)
+    _close(
+        ("model",),
+        prompt_tokens=getattr(usage, "prompt_token_count", None),
+        output_tokens=getattr(usage, "candidates_token_count", None),
+    )
+    return None
+
+
+def on_model_error_callback(callback_context, llm_request, error) -> None:
+    _close(("model",), error)
+    return None
+
+
+def _tool_key(tool, tool_context) -> tuple:
+    return ("tool", tool_context.function_call_id or tool.name)
+
+
+def before_tool_callback(tool, args, tool_context) -> None:
+    _open(
+        _tool_key(tool, tool_context),
+        f"tool.{tool.name}",
+        {"agent": tool_context.agent_name, "tool": tool.name},
+        tool_context.invocation_id,
+    )
+    return None
+
+
+def after_tool_callback(tool, args, tool_context, tool_response) -> None:
+    _close(_tool_key(tool, tool_context))
+    return None
+
+
+def on_tool_error_callback(tool, args, tool_context, error) -> None:
+    _close(_tool_key(tool, tool_context), error)
+    return None
+
+
+# Keyword arguments that trace a traced agent's model and tool calls: TracedLlmAgent(**LLM_CALLBACKS).
+# Outside a traced_agent run the callbacks record nothing.
+LLM_CALLBACKS = {
+    "before_model_callback": before_model_callback,
+    "after_model_callback": after_model_callback,
+    "on_model_error_callback": on_model_error_callback,
+    "before_tool_callback": before_tool_callback,
+    "after_tool_callback": after_tool_callback,
+    "on_tool_error_callback": on_tool_error_callback,
+}
@@ -0,0 +1,76 @@
+"""Shared fixtures: every test runs against fresh tool singletons and temporary storage."""
+import dataclasses
+
+import pytest
+
+from benchmarks.fake_eutils import FakeEUtilsServer, FixtureCorpus
+from medical_agent_bot import config
+from medical_agent_bot.tools import (
+    article_index,
+    eutils_client,
+    mesh_index,
+    pubmed_cache,
+    rate_limiter,
+    smtp_delivery,
+    telemetry,
+)
+
+# Module-level singletons that are built from the settings on first use.
+_SINGLETONS = (
+    (eutils_client, "_client"),
+    (rate_limiter, "_limiter"),
+    (pubmed_cache, "_cache"),
+    (article_index, "_index"),
+    (mesh_index, "_index"),
+    (smtp_delivery, "_queue"),
+    (telemetry, "_tracer"),
+)
+
+
+@pytest.fixture(autouse=True)
+def settings(tmp_path, monkeypatch):
+    """
+    Configure the tools with default settings, storage under tmp_path and no NCBI quota.
+
+    Tests that need other values call config.configure(dataclasses.replace(settings, ...))
+    before touching the tools.
+    """
+    monkeypatch.setattr(config, "_loaded", True)  # never read a developer's .env
+    for module, name in _SINGLETONS:
+        monkeypatch.setattr(module, name, None)
+    defaults = config.Settings()
+    test_settings = dataclasses.replace(
+        defaults,
+        ncbi=dataclasses.replace(defaults.ncbi, rate_limit=1000.0),
+        cache=dataclasses.replace(
+            defaults.cache,
+            pubmed_path=str(tmp_path / "pubmed_cache.sqlite3"),
+            article_index_path=str(tmp_path / "article_index.sqlite3"),
+            mesh_index_path=str(tmp_path / "mesh_index.bin"),
+        ),
+    )
+    monkeypatch.setattr(config, "_settings", test_settings)
+    return test_settings
+
+
+class OutageEUtilsServer(FakeEUtilsServer):
+    """FakeEUtilsServer that answers 503 for the endpoints listed in down."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.down = set()
+
+    def _draw(self, endpoint: str) -> tuple:
+        delay, error = super()._draw(endpoint)
+        return delay, 503 if endpoint in self.down else error
+
+
+@pytest.fixture
+def eutils(settings):
+    """A fake E-utilities server with 50 synthetic records, used by the tools without retries."""
+    with OutageEUtilsServer(FixtureCorpus.synthetic(50), latency_ms=0) as server:
+        config.configure(dataclasses.replace(
+            settings,
+            ncbi=dataclasses.replace(settings.ncbi, base_url=server.base_url, max_retries=0, breaker_reset=0.0),
+        ))
+        yield server
@@ -0,0 +1,31 @@
+import sys
+
+import pytest
+
+from medical_agent_bot.tools.article import AbstractSection, Article
+from medical_agent_bot.tools.article_export import save_parquet_file
+
+
+def _articles():
+    return [
+        Article(pmid=str(pmid), title=f"Trial {pmid}", abstract_sections=[AbstractSection("", "Results.")])
+        for pmid in (1, 2, 3)
+    ]
+
+
+def test_parquet_round_trip(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    path = save_parquet_file(_articles(), str(tmp_path / "articles.parquet"), batch_size=2)
+
+    table = pq.read_table(path)
+    assert table.column("pmid").to_pylist() == [1, 2, 3]
+    assert pq.ParquetFile(path).num_row_groups == 2
+
+
+def test_parquet_without_pyarrow_explains_the_extra(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    monkeypatch.setitem(sys.modules, "pyarrow.parquet", None)
+
+    with pytest.raises(ImportError, match=r"\[export\]"):
+        save_parquet_file(_articles(), str(tmp_path / "articles.parquet"))
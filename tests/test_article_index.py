@@ -0,0 +1,64 @@
+import pytest
+
+from medical_agent_bot.tools.article import AbstractSection, Article
+from medical_agent_bot.tools.article_index import ArticleIndex, tokenize
+
+
+def _article(pmid: str, title: str, abstract: str) -> Article:
+    return Article(pmid=pmid, title=title, abstract_sections=[AbstractSection("", abstract)])
+
+
+RECORDS = [
+    _article("1", "Metformin and weight gain", "Metformin reduced weight gain in adolescents."),
+    _article("2", "Exercise in type 2 diabetes", "Aerobic exercise improved glycemic control; metformin was continued."),
+    _article("3", "Statins after myocardial infarction", "Statins lowered cardiovascular mortality."),
+    _article("4", "Diet and diabetes", "A low carbohydrate diet lowered HbA1c in type 2 diabetes."),
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ArticleIndex(str(tmp_path / "index.sqlite3"))
+    assert index.add_records(RECORDS) == 4
+    yield index
+    index.close()
+
+
+def test_tokenize_drops_stopwords_and_query_syntax():
+    assert tokenize('Diabetes[mesh] OR "the Insulin"[tiab] a 2') == ["diabetes", "insulin"]
+
+
+def test_search_ranks_by_bm25(index):
+    ranked = index.search("metformin weight", limit=10)
+
+    assert [record.pmid for record, _ in ranked] == ["1", "2"]
+    assert ranked[0][1] > ranked[1][1] > 0
+    assert [record.pmid for record, _ in index.search("diabetes diet")] == ["4", "2"]
+    assert index.search("diabetes", limit=1)[0][0].pmid == "4"
+    assert index.search("pancreatitis") == []
+
+
+def test_rerank_orders_by_relevance_and_keeps_ties_in_order(index):
+    unseen = _article("9", "Metformin weight metformin", "Not indexed.")
+    records = [RECORDS[2], unseen, RECORDS[1], RECORDS[0]]
+
+    assert [record.pmid for record in index.rerank("metformin weight", records)] == ["1", "2", "3", "9"]
+
+
+def test_contains_and_get_records_round_trip(index, tmp_path):
+    assert index.contains(["1", "4", "7"]) == {"1", "4"}
+    assert index.get_records(["2", "7"]) == {"2": RECORDS[1]}
+    assert index.get_records([]) == {}
+
+    reopened = ArticleIndex(str(tmp_path / "index.sqlite3"))
+    assert reopened.stats()["documents"] == 4
+    assert reopened.get_records(["3"]) == {"3": RECORDS[2]}
+    reopened.close()
+
+
+def test_reindexing_a_record_replaces_its_terms(index):
+    index.add_records([_article("3", "Metformin weight metformin", "Metformin weight.")])
+
+    assert index.stats()["documents"] == 4
+    assert [record.pmid for record, _ in index.search("statins")] == []
+    assert index.search("metformin weight")[0][0].pmid == "3"
@@ -0,0 +1,52 @@
+import pytest
+
+from medical_agent_bot.config import Settings
+
+
+def test_defaults_without_environment():
+    assert Settings.from_env({}) == Settings()
+
+
+def test_values_are_parsed_and_typed():
+    settings = Settings.from_env({
+        "NCBI_API_KEY": " key ",
+        "NCBI_TIMEOUTS": "esearch=45, efetch=20",
+        "NCBI_MAX_RETRIES": "0",
+        "PUBMED_RETRIEVAL_MODE": "ESUMMARY",
+        "PUBMED_LOCAL_FIRST": "yes",
+        "SMTP_STARTTLS": "0",
+        "SMTP_TIMEOUT": "2.5",
+        "TELEMETRY_EXPORTERS": "json,memory,json",
+        "PUBMED_CACHE_PATH": "~/cache.sqlite3",
+    })
+
+    assert settings.ncbi.api_key == "key"
+    assert settings.ncbi.timeouts == {"esearch": 45.0, "efetch": 20.0}
+    assert settings.ncbi.max_retries == 0
+    assert settings.search.retrieval_mode == "esummary"
+    assert settings.search.local_first is True
+    assert settings.smtp.starttls is False
+    assert settings.smtp.timeout == 2.5
+    assert settings.telemetry.exporters == ("json", "memory")
+    assert not settings.cache.pubmed_path.startswith("~")
+
+
+def test_every_invalid_variable_is_reported():
+    with pytest.raises(ValueError) as error:
+        Settings.from_env({
+            "NCBI_POOL_SIZE": "0",
+            "NCBI_RATE_LIMIT": "fast",
+            "NCBI_TIMEOUTS": "elink=5",
+            "PUBMED_QUERY_VARIANTS": "4",
+            "PUBMED_EFETCH_HEDGE": "maybe",
+            "SMTP_PORT": "70000",
+            "TELEMETRY_EXPORTERS": "memory,zipkin",
+        })
+
+    message = str(error.value)
+    for name in (
+        "NCBI_POOL_SIZE", "NCBI_RATE_LIMIT", "NCBI_TIMEOUTS", "PUBMED_QUERY_VARIANTS",
+        "PUBMED_EFETCH_HEDGE", "SMTP_PORT", "TELEMETRY_EXPORTERS",
+    ):
+        assert f"{name}=" in message
+    assert "expected an integer between 1 and 3" in message
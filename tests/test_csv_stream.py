@@ -0,0 +1,46 @@
+import base64
+
+import pytest
+
+from medical_agent_bot.tools.csv_stream import csv_attachment, iter_csv_chunks, markdown_table_rows
+from medical_agent_bot.tools.send_emails_tool import build_literature_message, generate_csv_string
+
+# About 150 KB of CSV: more than two DEFAULT_CHUNK_SIZE chunks.
+TABLE = "\n".join(
+    ["| Study Type | Population | Key Outcome(s) | PubMed Link |", "|---|---|---|---|"]
+    + [
+        f"| RCT | n={i} adults, café “quoted” | HbA1c fell by {i / 10:.1f}% | "
+        f"[PubMed](https://pubmed.ncbi.nlm.nih.gov/{30000000 + i}/) |"
+        for i in range(1500)
+    ]
+)
+
+
+def _decoded(part) -> str:
+    return base64.b64decode(part.get_payload()).decode("utf-8")
+
+
+@pytest.mark.parametrize("chunk_size", [100, 64 * 1024])
+def test_attachment_decodes_to_the_csv_string(chunk_size):
+    expected = generate_csv_string(TABLE)
+    assert len(expected.encode("utf-8")) > 2 * 64 * 1024
+
+    part = csv_attachment(iter_csv_chunks(markdown_table_rows(TABLE), chunk_size=chunk_size), "matrix.csv")
+
+    assert _decoded(part) == expected
+    # Chunks are re-cut at 57 bytes, so every line but the last is a full 76-character line.
+    lines = part.get_payload().splitlines()
+    assert all(len(line) == 76 for line in lines[:-1]) and 0 < len(lines[-1]) <= 76
+    assert part.get_filename() == "matrix.csv"
+
+
+def test_literature_message_attaches_the_matrix():
+    msg = build_literature_message("Synthesis", TABLE, [], "from@example.org", "to@example.org")
+
+    [attachment] = [part for part in msg.walk() if part.get_filename() == "evidence_matrix.csv"]
+    assert _decoded(attachment) == generate_csv_string(TABLE)
+
+
+def test_no_chunks_means_no_attachment():
+    assert csv_attachment([], "matrix.csv") is None
+    assert csv_attachment([b""], "matrix.csv") is None
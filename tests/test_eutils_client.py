@@ -0,0 +1,157 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from medical_agent_bot.tools.circuit_breaker import CLOSED, HALF_OPEN
+from medical_agent_bot.tools.eutils_client import EUtilsClient
+from medical_agent_bot.tools.rate_limiter import TokenBucketRateLimiter
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self.server.connections.add(self.client_address)
+        self.server.requests.append(self.path)
+        body = b'{"esearchresult": {"idlist": ["1"]}}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.connections = set()
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(stub_server):
+    client = EUtilsClient(
+        base_url=f"http://127.0.0.1:{stub_server.server_port}",
+        api_key="test-key",
+        rate_limiter=TokenBucketRateLimiter(1000),
+    )
+    yield client
+    client.close()
+
+
+def test_blocking_calls_reuse_one_connection(client, stub_server):
+    for _ in range(5):
+        assert client.get("esearch", {"term": "x"}).json()["esearchresult"]["idlist"] == ["1"]
+
+    assert len(stub_server.requests) == 5
+    assert len(stub_server.connections) == 1
+    assert all("api_key=test-key" in path for path in stub_server.requests)
+
+
+def test_async_calls_reuse_one_connection(client, stub_server):
+    async def run():
+        for _ in range(5):
+            await client.aget("esearch", {"term": "x"})
+        await client.aclose()
+
+    asyncio.run(run())
+
+    assert len(stub_server.requests) == 5
+    assert len(stub_server.connections) == 1
+
+
+def test_retry_after_is_capped_at_max_backoff(stub_server, monkeypatch):
+    responses = iter([(503, {"Retry-After": "3600"}), (200, {})])
+
+    def do_GET(handler):
+        status, headers = next(responses)
+        handler.server.requests.append(handler.path)
+        handler.send_response(status)
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.send_header("Content-Length", "2")
+        handler.end_headers()
+        handler.wfile.write(b"{}")
+
+    monkeypatch.setattr(_StubHandler, "do_GET", do_GET)
+    sleeps = []
+    monkeypatch.setattr("medical_agent_bot.tools.eutils_client.time.sleep", sleeps.append)
+    client = EUtilsClient(
+        base_url=f"http://127.0.0.1:{stub_server.server_port}",
+        max_backoff=2.0,
+        rate_limiter=TokenBucketRateLimiter(1000),
+    )
+
+    assert client.get("esearch", {"term": "x"}).status_code == 200
+    assert sleeps == [2.0]
+    assert len(stub_server.requests) == 2
+    client.close()
+
+
+def test_backoff_delay_is_capped_at_max_backoff():
+    client = EUtilsClient(backoff_factor=0.5, max_backoff=5.0, rate_limiter=TokenBucketRateLimiter(1000))
+
+    assert [client.backoff_delay(attempt) for attempt in range(5)] == [0.5, 1.0, 2.0, 4.0, 5.0]
+
+
+def test_cancelled_half_open_trial_releases_the_breaker(stub_server, monkeypatch):
+    original_do_get = _StubHandler.do_GET
+
+    def slow_do_get(handler):
+        time.sleep(0.2)
+        original_do_get(handler)
+
+    monkeypatch.setattr(_StubHandler, "do_GET", slow_do_get)
+    client = EUtilsClient(
+        base_url=f"http://127.0.0.1:{stub_server.server_port}",
+        breaker_failures=1,
+        breaker_reset=0.3,
+        rate_limiter=TokenBucketRateLimiter(1000),
+    )
+    breaker = client.breaker_for("esearch")
+    breaker.record_failure()
+    time.sleep(0.3)
+    assert breaker.state == HALF_OPEN
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.aget("esearch", {"term": "x"}), timeout=0.05)
+        # The cancelled trial no longer blocks the next one, which closes the circuit.
+        assert (await client.aget("esearch", {"term": "x"})).status_code == 200
+        await client.aclose()
+
+    asyncio.run(run())
+    assert breaker.state == CLOSED
+    client.close()
+
+
+def test_streamed_error_response_releases_its_connection(client, stub_server, monkeypatch):
+    original_do_get = _StubHandler.do_GET
+
+    def do_get(handler):
+        if "missing" not in handler.path:
+            return original_do_get(handler)
+        handler.server.connections.add(handler.client_address)
+        handler.send_response(400)
+        handler.send_header("Content-Length", "11")
+        handler.end_headers()
+        handler.wfile.write(b"bad request")
+
+    monkeypatch.setattr(_StubHandler, "do_GET", do_get)
+
+    with pytest.raises(requests.exceptions.HTTPError) as raised:
+        client.get("efetch", {"id": "missing"}, stream=True)
+    assert client.get("esearch", {"term": "x"}).status_code == 200
+    assert len(stub_server.connections) == 1
+    assert raised.value.response.text == "bad request"
@@ -0,0 +1,93 @@
+from medical_agent_bot.tools.article import AbstractSection, Article
+from medical_agent_bot.tools.evidence_extractor import (
+    MATRIX_COLUMNS,
+    NOT_REPORTED,
+    build_evidence_matrix,
+    extract_evidence_row,
+)
+
+
+def test_structured_rct_abstract():
+    record = Article(
+        pmid="101",
+        title="Metformin versus placebo for weight gain in youth on antipsychotics",
+        publication_types=["Journal Article", "Randomized Controlled Trial"],
+        abstract_sections=[
+            AbstractSection("BACKGROUND", "Antipsychotics cause weight gain."),
+            AbstractSection("PARTICIPANTS", "A total of 1,204 adolescents aged 10 to 17 years. Recruited at 12 sites."),
+            AbstractSection("INTERVENTION", "Metformin 500 mg twice daily for 24 weeks."),
+            AbstractSection("MAIN OUTCOMES AND MEASURES", "Change in body mass index z score. Secondary: HbA1c."),
+            AbstractSection("RESULTS", "BMI z score fell by 0.1 with metformin."),
+        ],
+    )
+
+    row = extract_evidence_row(record)
+
+    assert row == {
+        "Study Type": "RCT",
+        "Population": "A total of 1,204 adolescents aged 10 to 17 years",
+        "Treatment / Intervention": "Metformin 500 mg twice daily for 24 weeks",
+        "Control / Comparator": "placebo",
+        "Key Outcome(s)": "Change in body mass index z score",
+        "PubMed Link": "[PubMed](https://pubmed.ncbi.nlm.nih.gov/101/)",
+    }
+
+
+def test_unstructured_abstract_falls_back_on_text_patterns():
+    record = Article(
+        pmid="102",
+        title="Statin use and dementia",
+        publication_types=["Journal Article"],
+        abstract_sections=[AbstractSection("", (
+            "In this pragmatic randomized trial of 3,412 older adults, "
+            "participants were randomized to receive atorvastatin or usual care for 5 years. "
+            "Statin use was associated with a 20% lower risk of dementia."
+        ))],
+    )
+
+    row = extract_evidence_row(record)
+
+    assert row["Study Type"] == "RCT"
+    assert row["Population"] == "n=3,412 older adults"
+    assert row["Treatment / Intervention"] == "atorvastatin"
+    assert row["Control / Comparator"] == "usual care"
+    assert row["Key Outcome(s)"] == "Statin use was associated with a 20% lower risk of dementia"
+
+
+def test_sample_size_from_n_equals():
+    record = Article(
+        pmid="103",
+        title="A cross-sectional survey of hospital staff",
+        abstract_sections=[AbstractSection("", "Burnout was measured (n = 850). Burnout was common.")],
+    )
+
+    row = extract_evidence_row(record)
+
+    assert row["Study Type"] == "Cross-sectional study"
+    assert row["Population"] == "n=850"
+    assert row["Key Outcome(s)"] == "Burnout was common"
+
+
+def test_record_without_abstract_is_not_reported():
+    record = Article(pmid="104", title="Editorial: the future of diabetes care")
+
+    row = extract_evidence_row(record)
+
+    assert row["PubMed Link"] == "[PubMed](https://pubmed.ncbi.nlm.nih.gov/104/)"
+    assert {column: row[column] for column in MATRIX_COLUMNS[:-1]} == dict.fromkeys(MATRIX_COLUMNS[:-1], NOT_REPORTED)
+
+
+def test_matrix_is_a_markdown_table_with_safe_cells():
+    record = Article(
+        pmid="105",
+        title="Trial",
+        abstract_sections=[AbstractSection("RESULTS", "HbA1c | fasting glucose both improved.")],
+    )
+
+    lines = build_evidence_matrix([record]).splitlines()
+
+    assert lines[0] == "| " + " | ".join(MATRIX_COLUMNS) + " |"
+    assert len(lines) == 3
+    assert lines[2].count("|") == len(MATRIX_COLUMNS) + 1
+    assert "HbA1c / fasting glucose both improved" in lines[2]
+    assert build_evidence_matrix([]).count("\n") == 1
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from benchmarks.import_budget import TARGETS, measure, profile
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.mark.parametrize("target", [target for target in TARGETS if target.forbidden], ids=lambda target: target.module)
+def test_import_does_not_load_optional_modules(target):
+    # A fresh interpreter, since this one has already imported everything.
+    script = (
+        f"import sys, {target.module}\n"
+        f"forbidden = {target.forbidden!r}\n"
+        "print(*(m for m in sys.modules if any(m == f or m.startswith(f + '.') for f in forbidden)))"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+
+    assert result.stdout.split() == []
+
+
+@pytest.mark.parametrize(
+    "target", [target for target in TARGETS if target.module != "medical_agent_bot.agent"], ids=lambda target: target.module
+)
+def test_import_time_is_within_budget(target, monkeypatch):
+    # Same measurement as benchmarks.import_budget, best of three fresh interpreters;
+    # the agent target (google.adk) is left to the benchmark.
+    monkeypatch.chdir(ROOT)
+    startup = {name for name, _, _ in profile("pass")}
+    best_ms = min(measure(target.module, startup)[0] for _ in range(3))
+
+    assert best_ms <= target.budget_ms
+
+
+def test_root_agent_is_built_on_first_access():
+    script = (
+        "import sys, medical_agent_bot\n"
+        "assert 'medical_agent_bot.agent' not in sys.modules\n"
+        "print(type(medical_agent_bot.root_agent).__name__)"
+    )
+    pytest.importorskip("google.adk")
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "TracedSequentialAgent"
@@ -0,0 +1,90 @@
+import dataclasses
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from medical_agent_bot import config
+from medical_agent_bot.tools import mesh_index
+from medical_agent_bot.tools.mesh_index import SAMPLE_MESH_XML, MeshIndex, build_mesh_index
+
+
+@pytest.fixture(scope="module")
+def mesh(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("mesh") / "mesh_index.bin")
+    build_mesh_index(SAMPLE_MESH_XML, path)
+    index = MeshIndex(path)
+    yield index
+    index.close()
+
+
+def test_plain_words_map_to_headings_and_synonyms(mesh):
+    query, headings = mesh._expand("metformin type 2 diabetes")
+
+    assert headings == ["Metformin", "Diabetes Mellitus, Type 2"]
+    assert query.startswith('("Metformin"[mesh] OR "Dimethylbiguanidine"[tiab]')
+    assert ') AND ("Diabetes Mellitus, Type 2"[mesh] OR ' in query
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "type 2 diabetes mellitus[mesh] AND metformin[mesh]",
+        "metformin type 2 diabetes[tiab]",
+        "(type 2 diabetes[tiab] OR insulin resistance[mesh]) AND metformin[mesh]",
+        '"type 2 diabetes"[tiab] NOT review[pt]',
+    ],
+)
+def test_tagged_phrases_pass_through(mesh, query):
+    assert mesh._expand(query) == (query, [])
+
+
+def test_only_untagged_phrases_are_expanded(mesh):
+    query, headings = mesh._expand("type 2 diabetes mellitus[mesh] AND metformin")
+
+    assert headings == ["Metformin"]
+    assert query == (
+        'type 2 diabetes mellitus[mesh] AND ("Metformin"[mesh] OR "Dimethylbiguanidine"[tiab] OR "Glucophage"[tiab])'
+    )
+
+
+def test_unmatched_words_keep_their_spelling(mesh):
+    query, _ = mesh._expand("T2DM (metformin)")
+
+    assert query.startswith("T2DM (")
+
+
+def test_index_is_rebuilt_when_the_source_changes(settings, tmp_path):
+    custom_xml = tmp_path / "desc.xml"
+    custom_xml.write_text(
+        "<DescriptorRecordSet><DescriptorRecord><DescriptorUI>D000001</DescriptorUI>"
+        "<DescriptorName><String>Calcimycin</String></DescriptorName>"
+        "<ConceptList><Concept><TermList><Term><String>A-23187</String></Term></TermList></Concept></ConceptList>"
+        "</DescriptorRecord></DescriptorRecordSet>"
+    )
+    assert mesh_index.get_mesh_index().lookup("metformin") is not None
+    mesh_index._index.close()
+    mesh_index._index = None
+
+    config.configure(dataclasses.replace(
+        settings, cache=dataclasses.replace(settings.cache, mesh_xml_path=str(custom_xml))
+    ))
+    index = mesh_index.get_mesh_index()
+
+    assert index.source_path == str(custom_xml)
+    assert index.lookup("A 23187")["ui"] == "D000001"
+    assert index.lookup("metformin") is None
+    index.close()
+
+
+def test_concurrent_builds_do_not_share_a_temp_file(tmp_path):
+    path = str(tmp_path / "mesh_index.bin")
+
+    with ThreadPoolExecutor(4) as pool:
+        counts = list(pool.map(lambda _: build_mesh_index(SAMPLE_MESH_XML, path), range(4)))
+
+    assert all(count == counts[0] for count in counts)
+    assert os.listdir(tmp_path) == ["mesh_index.bin"]
+    index = MeshIndex(path)
+    assert index.lookup("metformin")["name"] == "Metformin"
+    index.close()
@@ -0,0 +1,105 @@
+import pytest
+
+from medical_agent_bot.tools import pubmed_cache
+from medical_agent_bot.tools.article import AbstractSection, Article
+from medical_agent_bot.tools.pubmed_cache import PubMedCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(pubmed_cache.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = PubMedCache(str(tmp_path / "cache.sqlite3"), search_ttl=60, record_ttl=600, stale_grace=300)
+    yield cache
+    cache.close()
+
+
+def _article(pmid: str) -> Article:
+    return Article(pmid=pmid, title=f"Trial {pmid}", abstract_sections=[AbstractSection("RESULTS", "x" * 200)])
+
+
+def test_records_round_trip_through_both_tiers(cache):
+    cache.put_records({"1": _article("1"), "2": _article("2")})
+
+    assert cache.get_records(["1", "2", "3"]) == {"1": _article("1"), "2": _article("2")}
+    cache._memory.clear()
+    assert cache.get_records(["1"]) == {"1": _article("1")}
+    assert cache.get_records(["1"]) == {"1": _article("1")}
+
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (3, 1, 1)
+    assert stats["hit_rate"] == 4 / 5
+
+
+def test_entries_expire_after_their_namespace_ttl(cache, clock):
+    cache.put_search("metformin", 10, ["1", "2"])
+    cache.put_records({"1": _article("1")})
+
+    clock.now += 61
+    assert cache.get_search("metformin", 10) is None
+    assert cache.get_records(["1"]) == {"1": _article("1")}
+
+    clock.now += 600
+    assert cache.get_records(["1"]) == {}
+    assert cache.stats()["misses"] == 2
+
+
+def test_expired_entries_are_served_stale_within_the_grace_period(cache, clock):
+    cache.put_search("metformin", 10, ["1", "2"])
+
+    clock.now += 61
+    assert cache.get_search("metformin", 10) is None
+    assert cache.get_search("metformin", 10, allow_stale=True) == ["1", "2"]
+    assert cache.stats()["stale_hits"] == 1
+    # Stale hits are not promoted back into memory or made fresh again.
+    assert cache.get_search("metformin", 10) is None
+
+    clock.now += 300
+    assert cache.get_search("metformin", 10, allow_stale=True) is None
+    assert cache.stats()["disk_entries"] == 0
+
+
+def test_disk_tier_evicts_least_recently_used_down_to_90_percent(tmp_path, clock):
+    entry_bytes = len(pubmed_cache.json.dumps(_article("10").to_dict(), separators=(",", ":")))
+    cache = PubMedCache(str(tmp_path / "cache.sqlite3"), max_disk_bytes=entry_bytes * 10)
+    for pmid in range(10, 20):
+        clock.now += 1
+        cache.put_records({str(pmid): _article(str(pmid))})
+    clock.now += 1
+    cache._memory.clear()
+    assert cache.get_records(["10"])  # now the most recently used
+
+    clock.now += 1
+    cache.put_records({"20": _article("20")})
+
+    stats = cache.stats()
+    assert stats["disk_bytes"] <= entry_bytes * 9
+    assert stats["evictions"] == 2
+    cache._memory.clear()
+    assert sorted(cache.get_records(str(pmid) for pmid in range(10, 21))) == ["10"] + [str(p) for p in range(13, 21)]
+    cache.close()
+
+
+def test_memory_tier_is_bounded(tmp_path, clock):
+    cache = PubMedCache(str(tmp_path / "cache.sqlite3"), memory_entries=2)
+
+    cache.put_records({str(pmid): _article(str(pmid)) for pmid in range(3)})
+
+    stats = cache.stats()
+    assert (stats["memory_entries"], stats["disk_entries"], stats["evictions"]) == (2, 3, 1)
+    assert cache.get_records(["0"]) == {"0": _article("0")}
+    assert cache.stats()["disk_hits"] == 1
+    cache.close()
@@ -0,0 +1,67 @@
+import asyncio
+import dataclasses
+
+from medical_agent_bot import config
+from medical_agent_bot.tools import pubmed_tool, telemetry
+from medical_agent_bot.tools.article import AbstractSection, Article
+from medical_agent_bot.tools.article_index import get_article_index
+from medical_agent_bot.tools.pubmed_cache import get_pubmed_cache
+from medical_agent_bot.tools.telemetry import InMemorySpanExporter, Tracer
+
+
+def _article(pmid: str, n_words: int = 400) -> Article:
+    return Article(
+        pmid=pmid,
+        title=f"Trial {pmid}",
+        abstract_sections=[AbstractSection("RESULTS", " ".join(["glucose"] * n_words))],
+    )
+
+
+def test_finalize_records_compaction_report(settings, monkeypatch):
+    config.configure(dataclasses.replace(settings, search=dataclasses.replace(settings.search, token_budget=300)))
+    exporter = InMemorySpanExporter()
+    monkeypatch.setattr(telemetry, "_tracer", Tracer([exporter]))
+
+    results = pubmed_tool.finalize_articles([_article("1"), _article("2")])
+
+    [span] = exporter.spans("pubmed.finalize")
+    attributes = span["attributes"]
+    assert len(results) == 2
+    assert attributes["budget_tokens"] == 300
+    assert attributes["articles_trimmed"] == 2
+    assert attributes["tokens_saved"] == attributes["original_tokens"] - attributes["compacted_tokens"] > 0
+    assert telemetry.get_tracer().counters()["pubmed.compaction.tokens_saved"] == attributes["tokens_saved"]
+
+
+def test_esummary_failure_keeps_efetch_records(eutils, settings):
+    config.configure(dataclasses.replace(
+        config.get_settings(),
+        search=dataclasses.replace(settings.search, retrieval_mode="esummary"),
+    ))
+    pmids = eutils.corpus.pmids[:3]
+    eutils.down.add("esummary")
+
+    records, metadata_only = asyncio.run(pubmed_tool.load_pubmed_records(pmids))
+
+    assert sorted(records) == pmids
+    assert metadata_only == set()
+    assert all(record.abstract_sections for record in records.values())
+    assert telemetry.get_tracer().counters()["pubmed.esummary.failed"] == 1
+    assert eutils.stats()["efetch"] == 1
+
+
+def test_bulk_search_pages_through_the_history_server(eutils):
+    results = list(pubmed_tool.pubmed_bulk_search("metformin", max_records=12, batch_size=5))
+
+    expected = eutils.corpus.search("metformin", len(eutils.corpus.pmids))[:12]
+    assert [article["pmid"] for article in results] == expected
+    assert eutils.stats()["efetch"] == 3
+    assert sorted(get_pubmed_cache().get_records(expected)) == sorted(expected)
+    assert get_article_index().contains(expected) == set(expected)
+
+
+def test_bulk_search_without_max_records_fetches_every_match(eutils):
+    results = list(pubmed_tool.pubmed_bulk_search("statins", batch_size=20))
+
+    assert len(results) == len(eutils.corpus.pmids)
+    assert eutils.stats()["efetch"] == 3
@@ -0,0 +1,89 @@
+import asyncio
+
+from medical_agent_bot.tools.article import AbstractSection
+from medical_agent_bot.tools.pubmed_xml import aiter_pubmed_articles, iter_pubmed_articles
+
+ARTICLE_SET = b"""<?xml version="1.0" ?>
+<PubmedArticleSet>
+<PubmedArticle>
+  <MedlineCitation>
+    <PMID Version="1">31000001</PMID>
+    <Article>
+      <Journal>
+        <JournalIssue><PubDate><Year>2024</Year><Month>Mar</Month></PubDate></JournalIssue>
+        <Title>Diabetes Care</Title>
+        <ISOAbbreviation>Diabetes Care</ISOAbbreviation>
+      </Journal>
+      <ArticleTitle>Metformin in <i>youth</i></ArticleTitle>
+      <Abstract>
+        <AbstractText Label="RESULTS">HbA1c fell.</AbstractText>
+      </Abstract>
+      <AuthorList><Author><LastName>Smith</LastName><Initials>J</Initials></Author></AuthorList>
+      <PublicationTypeList><PublicationType>Randomized Controlled Trial</PublicationType></PublicationTypeList>
+    </Article>
+  </MedlineCitation>
+</PubmedArticle>
+<PubmedBookArticle>
+  <BookDocument>
+    <PMID Version="1">20301295</PMID>
+    <ArticleIdList><ArticleId IdType="bookaccession">NBK1116</ArticleId></ArticleIdList>
+    <Book>
+      <Publisher><PublisherName>University of Washington, Seattle</PublisherName></Publisher>
+      <BookTitle book="gene">GeneReviews</BookTitle>
+      <PubDate><Year>1993</Year></PubDate>
+      <AuthorList Type="editors"><Author><LastName>Adam</LastName><Initials>MP</Initials></Author></AuthorList>
+    </Book>
+    <ArticleTitle book="gene" part="alzheimer">Alzheimer Disease Overview</ArticleTitle>
+    <AuthorList Type="authors">
+      <Author><LastName>Bird</LastName><ForeName>Thomas D</ForeName><Initials>TD</Initials></Author>
+    </AuthorList>
+    <PublicationType UI="D016454">Review</PublicationType>
+    <Abstract>
+      <AbstractText Label="CLINICAL CHARACTERISTICS">Alzheimer disease is characterized by dementia.</AbstractText>
+      <AbstractText Label="DIAGNOSIS/TESTING">The diagnosis is clinical.</AbstractText>
+    </Abstract>
+  </BookDocument>
+  <PubmedBookData><PublicationStatus>ppublish</PublicationStatus></PubmedBookData>
+</PubmedBookArticle>
+<PubmedBookArticle>
+  <BookDocument>
+    <PMID Version="1">20821847</PMID>
+    <Book>
+      <BookTitle book="endotext">Endotext</BookTitle>
+      <AuthorList Type="editors"><Author><LastName>Feingold</LastName><Initials>KR</Initials></Author></AuthorList>
+    </Book>
+    <ContributionDate><Year>2000</Year><Month>02</Month></ContributionDate>
+  </BookDocument>
+</PubmedBookArticle>
+</PubmedArticleSet>
+"""
+
+
+def test_journal_and_book_articles_are_parsed():
+    article, chapter, book = iter_pubmed_articles(ARTICLE_SET)
+
+    assert (article.pmid, article.title, article.journal) == ("31000001", "Metformin in youth", "Diabetes Care")
+    assert chapter.pmid == "20301295"
+    assert chapter.title == "Alzheimer Disease Overview"
+    assert chapter.authors == ["Bird TD"]
+    assert chapter.journal == "GeneReviews"
+    assert chapter.published_date == "1993"
+    assert chapter.publication_types == ["Review"]
+    assert chapter.abstract_sections == [
+        AbstractSection("CLINICAL CHARACTERISTICS", "Alzheimer disease is characterized by dementia."),
+        AbstractSection("DIAGNOSIS/TESTING", "The diagnosis is clinical."),
+    ]
+    # A whole book: titled after the book, its editors as authors, dated by contribution.
+    assert (book.title, book.authors, book.published_date) == ("Endotext", ["Feingold KR"], "2000 02")
+    assert book.abstract_sections == []
+
+
+def test_stream_parser_yields_book_articles_from_chunks():
+    async def chunks():
+        for start in range(0, len(ARTICLE_SET), 64):
+            yield ARTICLE_SET[start:start + 64]
+
+    async def collect():
+        return [article async for article in aiter_pubmed_articles(chunks())]
+
+    assert [article.pmid for article in asyncio.run(collect())] == ["31000001", "20301295", "20821847"]
@@ -0,0 +1,36 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from benchmarks.stub_llm import StubLlm
+from medical_agent_bot.sub_agents import query_ingestor_agent
+from medical_agent_bot.sub_agents.query_ingestor_agent import med_query_ingestor
+
+
+def test_query_variants_are_stored_but_not_shown(monkeypatch):
+    monkeypatch.setattr(query_ingestor_agent._query_variant_writer, "model", StubLlm(role="ingestor"))
+    runner = InMemoryRunner(agent=med_query_ingestor, app_name="test")
+
+    async def run():
+        session = await runner.session_service.create_session(app_name="test", user_id="user")
+        events = [
+            event
+            async for event in runner.run_async(
+                user_id="user",
+                session_id=session.id,
+                new_message=types.Content(role="user", parts=[types.Part(text="metformin diabetes")]),
+            )
+        ]
+        session = await runner.session_service.get_session(app_name="test", user_id="user", session_id=session.id)
+        return events, session.state
+
+    events, state = asyncio.run(run())
+
+    assert json.loads(state["query_variants"])[0] == "metformin diabetes"
+    assert not [part.text for event in events if event.content for part in event.content.parts or [] if part.text]
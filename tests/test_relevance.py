@@ -0,0 +1,71 @@
+import zlib
+
+import numpy as np
+
+from medical_agent_bot.tools.article import AbstractSection, Article
+from medical_agent_bot.tools.relevance import (
+    DEFAULT_N_FEATURES,
+    deduplicate,
+    rank_by_similarity,
+    tfidf_vectors,
+)
+
+
+def _article(pmid: str, text: str) -> Article:
+    return Article(pmid=pmid, title="", abstract_sections=[AbstractSection("", text)])
+
+
+def _bucket(word: str, n_features: int) -> int:
+    return zlib.crc32(word.encode("utf-8")) % n_features
+
+
+def _colliding_words(n_words: int, n_features: int):
+    """Pairs of distinct words that share a bucket in n_features but not in DEFAULT_N_FEATURES."""
+    seen = {}
+    pairs = []
+    for i in range(200_000):
+        word = f"term{i}"
+        other = seen.setdefault(_bucket(word, n_features), word)
+        if other != word and _bucket(word, DEFAULT_N_FEATURES) != _bucket(other, DEFAULT_N_FEATURES):
+            pairs.append((other, word))
+            del seen[_bucket(word, n_features)]
+            if len(pairs) == n_words:
+                return pairs
+    raise AssertionError("not enough colliding words")
+
+
+def test_unrelated_texts_colliding_in_a_small_space_are_kept():
+    pairs = _colliding_words(30, 2 ** 10)
+    first = _article("1", " ".join(a for a, _ in pairs))
+    second = _article("2", " ".join(b for _, b in pairs))
+
+    assert deduplicate([first, second], n_features=2 ** 10) == [first]
+    assert deduplicate([first, second]) == [first, second]
+
+
+def test_near_duplicates_are_dropped_in_order():
+    text = "metformin lowers glucose in type 2 diabetes with few adverse events " * 3
+    records = [
+        _article("1", text),
+        _article("2", "statins reduce cardiovascular events in older adults"),
+        _article("3", text + " erratum"),
+    ]
+
+    assert [r.pmid for r in deduplicate(records)] == ["1", "2"]
+
+
+def test_vectors_are_normalised_and_ranked_by_query():
+    texts = [
+        "insulin therapy for type 1 diabetes",
+        "statins and cardiovascular mortality",
+        "insulin pumps compared with injections in diabetes",
+    ]
+    vectors, idf = tfidf_vectors(texts)
+    dense = np.zeros((vectors.n_rows, DEFAULT_N_FEATURES), dtype=np.float32)
+    dense[vectors.rows, vectors.cols] = vectors.values
+
+    ranked = rank_by_similarity("insulin diabetes", [_article(str(i), t) for i, t in enumerate(texts)])
+
+    assert np.allclose(np.linalg.norm(dense, axis=1), 1.0)
+    assert [record.pmid for record, _ in ranked] == ["0", "2", "1"]
+    assert ranked[-1][1] == 0.0
@@ -0,0 +1,20 @@
+from medical_agent_bot.tools.article import AbstractSection, Article
+from medical_agent_bot.tools.report_renderer import render
+
+
+def test_fields_are_escaped_and_substituted():
+    article = Article(
+        pmid="123",
+        title="Costs in $USD & outcomes",
+        authors=["Doe J"],
+        abstract_sections=[AbstractSection("RESULTS", "Mortality fell (p<0.05).")],
+    )
+
+    html = render([article], "## Key Findings\nA <b>strong</b> effect")
+
+    assert "Costs in $USD &amp; outcomes" in html
+    assert "(p&lt;0.05)" in html
+    assert "<h4>Key Findings</h4>" in html
+    assert "A &lt;b&gt;strong&lt;/b&gt; effect" in html
+    assert "https://pubmed.ncbi.nlm.nih.gov/123/" in html
+    assert "$articles" not in html and "$synthesis" not in html
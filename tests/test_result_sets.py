@@ -0,0 +1,29 @@
+import asyncio
+from types import SimpleNamespace
+
+from medical_agent_bot.tools import pubmed_tool
+from medical_agent_bot.tools.pubmed_cache import get_pubmed_cache
+from medical_agent_bot.tools.result_sets import RESULT_SET_STATE_KEY, load_result_set
+
+
+def test_esummary_stand_ins_are_not_cached(eutils):
+    tool_context = SimpleNamespace(state={})
+
+    async def search():
+        return await pubmed_tool.pubmed_to_pmc_full_text_search_async("metformin", 5, tool_context)
+
+    eutils.down.add("efetch")
+    during_outage = asyncio.run(search())
+    pmids = [article["pmid"] for article in during_outage]
+    set_id = tool_context.state[RESULT_SET_STATE_KEY]
+
+    assert len(pmids) == 5
+    assert all(article["summary"] == "No abstract available" for article in during_outage)
+    assert get_pubmed_cache().get_records(pmids) == {}
+
+    eutils.down.clear()
+    saved = load_result_set(set_id)
+
+    assert [record.pmid for record in saved] == pmids
+    assert all(record.abstract_sections for record in saved)
+    assert all(article["summary"] != "No abstract available" for article in asyncio.run(search()))
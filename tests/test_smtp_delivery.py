@@ -0,0 +1,152 @@
+import os
+import smtplib
+import socket
+import subprocess
+import sys
+import textwrap
+from email.message import EmailMessage
+from pathlib import Path
+
+import pytest
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+from medical_agent_bot.tools.smtp_delivery import (
+    FAILED,
+    SENT,
+    EmailDeliveryQueue,
+    SMTPConnectionPool,
+    is_transient_error,
+)
+
+
+class _Handler:
+    """Accepts every message, after refusing the first `refusals` recipients with `reply`."""
+
+    def __init__(self, reply: str = "", refusals: int = 0):
+        self.reply = reply
+        self.refusals = refusals
+        self.messages = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if self.refusals:
+            self.refusals -= 1
+            return self.reply
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope.content)
+        return "250 Message accepted"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    def start(handler: _Handler):
+        controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=_free_port())
+        controller.start()
+        controllers.append(controller)
+        return controller
+
+    controllers = []
+    yield start
+    for controller in controllers:
+        controller.stop()
+
+
+def _message(to: str = "reader@example.com") -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "bot@example.com"
+    message["To"] = to
+    message["Subject"] = "Evidence matrix"
+    message.set_content("Attached.")
+    return message
+
+
+def _queue(controller) -> EmailDeliveryQueue:
+    pool = SMTPConnectionPool(controller.hostname, controller.port, starttls=False, size=1, timeout=5)
+    return EmailDeliveryQueue(pool, backoff_factor=0.01)
+
+
+def test_messages_are_delivered_over_one_connection(smtp_server):
+    handler = _Handler()
+    delivery = _queue(smtp_server(handler))
+
+    ids = [delivery.submit(_message()) for _ in range(3)]
+
+    assert [delivery.wait(i, timeout=10)["status"] for i in ids] == [SENT] * 3
+    assert len(handler.messages) == 3
+    assert delivery.stats()["pool"]["opened"] == 1
+    delivery.close(timeout=5)
+
+
+def test_transient_refusal_is_retried(smtp_server):
+    handler = _Handler("451 4.3.0 Try again later", refusals=1)
+    delivery = _queue(smtp_server(handler))
+
+    status = delivery.wait(delivery.submit(_message()), timeout=10)
+
+    assert status["status"] == SENT
+    assert status["attempts"] == 2
+    delivery.close(timeout=5)
+
+
+def test_permanent_refusal_fails_at_once(smtp_server):
+    handler = _Handler("550 5.1.1 Mailbox unavailable", refusals=10)
+    delivery = _queue(smtp_server(handler))
+
+    status = delivery.wait(delivery.submit(_message()), timeout=10)
+
+    assert status["status"] == FAILED
+    assert status["attempts"] == 1
+    assert handler.messages == []
+    delivery.close(timeout=5)
+
+
+@pytest.mark.parametrize(
+    "error, transient",
+    [
+        (smtplib.SMTPNotSupportedError("STARTTLS extension not supported by server."), False),
+        (smtplib.SMTPException("No suitable authentication method found."), False),
+        (smtplib.SMTPAuthenticationError(535, b"Bad credentials"), False),
+        (smtplib.SMTPSenderRefused(451, b"Try later", "bot@example.com"), True),
+        (smtplib.SMTPServerDisconnected("Connection unexpectedly closed"), True),
+        (ConnectionRefusedError(), True),
+    ],
+)
+def test_is_transient_error(error, transient):
+    assert is_transient_error(error) is transient
+
+
+def test_pending_messages_are_flushed_at_exit(smtp_server, tmp_path):
+    handler = _Handler()
+    controller = smtp_server(handler)
+    # Submit and exit straight away: only the atexit flush can deliver the message.
+    script = textwrap.dedent(
+        f"""
+        from email.message import EmailMessage
+        from medical_agent_bot.tools.smtp_delivery import get_email_delivery_queue
+
+        message = EmailMessage()
+        message["To"] = "reader@example.com"
+        message.set_content("Attached.")
+        get_email_delivery_queue().submit(message)
+        """
+    )
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(Path(__file__).resolve().parents[1]),
+        "SMTP_HOST": controller.hostname,
+        "SMTP_PORT": str(controller.port),
+        "SMTP_STARTTLS": "0",
+        "EMAIL_FLUSH_TIMEOUT": "10",
+    }
+    subprocess.run([sys.executable, "-c", script], cwd=tmp_path, env=env, check=True, timeout=30)
+
+    assert len(handler.messages) == 1
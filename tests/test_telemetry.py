@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from medical_agent_bot.tools import telemetry
+from medical_agent_bot.tools.telemetry import STATUS_ERROR, STATUS_OK, InMemorySpanExporter, Tracer
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = InMemorySpanExporter()
+    monkeypatch.setattr(telemetry, "_tracer", Tracer([exporter]))
+    return exporter
+
+
+def test_span_records_errors_and_restores_the_current_span(exporter):
+    tracer = telemetry.get_tracer()
+    with tracer.span("outer") as outer:
+        with pytest.raises(ValueError):
+            with tracer.span("inner"):
+                raise ValueError("boom")
+        assert telemetry.current_span() is outer
+
+    inner, outer_record = exporter.spans("inner")[0], exporter.spans("outer")[0]
+    assert inner["status"] == STATUS_ERROR and inner["parent_id"] == outer_record["span_id"]
+    assert outer_record["status"] == STATUS_OK
+    assert telemetry.current_span() is None
+
+
+class _Context:
+    invocation_id = "invocation-1"
+    agent_name = "failing"
+
+
+class _FailingAgent:
+    name = "failing"
+
+    async def _run_async_impl(self, ctx):
+        # A model call that never reports back, then a crash.
+        telemetry.before_model_callback(ctx, None)
+        yield "event"
+        raise RuntimeError("agent crashed")
+
+
+def test_traced_agent_ends_its_spans_when_the_agent_raises(exporter):
+    agent = telemetry.traced_agent(_FailingAgent)()
+
+    async def run():
+        events = []
+        with pytest.raises(RuntimeError):
+            async for event in agent._run_async_impl(_Context()):
+                events.append(event)
+        return events
+
+    assert asyncio.run(run()) == ["event"]
+    [agent_span] = exporter.spans("agent.failing")
+    [model_span] = exporter.spans("llm.failing")
+    assert agent_span["status"] == STATUS_ERROR and "agent crashed" in agent_span["error"]
+    assert agent_span["trace_id"] == "invocation-1"
+    assert model_span["status"] == STATUS_ERROR and model_span["parent_id"] == agent_span["span_id"]
+    assert "agent crashed" in model_span["error"]
+    assert telemetry.current_span() is None
+
+
+class _Tool:
+    name = "search"
+
+
+class _ToolContext(_Context):
+    function_call_id = "call-1"
+
+
+class _ToolErrorAgent:
+    name = "tools"
+
+    async def _run_async_impl(self, ctx):
+        # The tool raises between the before and after callbacks, which never run.
+        telemetry.before_tool_callback(_Tool(), {}, _ToolContext())
+        assert telemetry.current_span().name == "tool.search"
+        yield "event"
+        raise ConnectionError("tool failed")
+
+
+def test_exception_between_tool_callbacks_ends_the_tool_span(exporter):
+    agent = telemetry.traced_agent(_ToolErrorAgent)()
+
+    async def run():
+        with telemetry.get_tracer().span("request") as request:
+            with pytest.raises(ConnectionError):
+                async for _ in agent._run_async_impl(_Context()):
+                    pass
+            # The stale tool span is no longer current once the run has ended.
+            assert telemetry.current_span() is request
+
+    asyncio.run(run())
+    [tool_span] = exporter.spans("tool.search")
+    [agent_span] = exporter.spans("agent.tools")
+    assert tool_span["status"] == STATUS_ERROR and "tool failed" in tool_span["error"]
+    assert tool_span["parent_id"] == agent_span["span_id"]
+    assert telemetry.current_span() is None
+
+
+def test_cancelled_run_ends_open_call_spans(exporter):
+    started = asyncio.Event()
+
+    class _SlowToolAgent:
+        name = "slow"
+
+        async def _run_async_impl(self, ctx):
+            telemetry.before_tool_callback(_Tool(), {}, _ToolContext())
+            started.set()
+            await asyncio.sleep(10)
+            yield "never"
+
+    agent = telemetry.traced_agent(_SlowToolAgent)()
+
+    async def consume():
+        async for _ in agent._run_async_impl(_Context()):
+            pass
+
+    async def run():
+        task = asyncio.ensure_future(consume())
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    [tool_span] = exporter.spans("tool.search")
+    assert tool_span["status"] == STATUS_ERROR and "before the call finished" in tool_span["error"]
+    assert exporter.spans("agent.slow")
+
+
+def test_callbacks_outside_a_traced_run_record_nothing(exporter):
+    telemetry.before_tool_callback(_Tool(), {}, _ToolContext())
+    telemetry.after_tool_callback(_Tool(), {}, _ToolContext(), {})
+
+    assert exporter.spans("tool.search") == []
+    assert telemetry.current_span() is None